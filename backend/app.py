@@ -4,9 +4,6 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from extensions import init_app
 from config import config
-import logging
-from logging.handlers import RotatingFileHandler
-from flask_jwt_extended import JWTManager
 
 # Ajouter le dossier courant au PYTHONPATH
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,18 +17,6 @@ def creer_app(nom_config=None):
     app = Flask(__name__)
     app.config.from_object(config[nom_config])
     
-    # Configuration des logs
-    if not os.path.exists('logs'):
-        os.mkdir('logs')
-    file_handler = RotatingFileHandler('logs/app.log', maxBytes=10240, backupCount=10)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    ))
-    file_handler.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
-    app.logger.setLevel(logging.INFO)
-    app.logger.info('Application démarrée')
-    
     app.url_map.strict_slashes = False
     
     CORS(app, resources={
@@ -43,17 +28,16 @@ def creer_app(nom_config=None):
                 "https://oxycare-project-8cwy-lps37fklg-zaids-projects-769c53a1.vercel.app"
             ],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization", "Accept", "Origin", "X-Requested-With"],
-            "expose_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "Accept", "Origin", "X-Requested-With", "Idempotency-Key", "If-None-Match"],
+            "expose_headers": ["Content-Type", "Authorization", "Idempotent-Replayed", "ETag"],
             "supports_credentials": True,
             "max_age": 3600
         }
     })
     
+    # Extensions (dont la journalisation, à configurer avant le premier log)
     init_app(app)
-    
-    # Initialisation des extensions
-    JWTManager(app)
+    app.logger.info('Application démarrée')
     
     # Enregistrement des blueprints
     from routes.auth import auth_bp
@@ -63,6 +47,8 @@ def creer_app(nom_config=None):
     from routes.debug import debug_bp
     from routes.dispositifs import dispositifs_bp
     from routes.interventions import interventions_bp
+    from routes.sync import sync_bp
+    from routes.metriques import metriques_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(patients_bp, url_prefix='/api/patients')
@@ -71,6 +57,8 @@ def creer_app(nom_config=None):
     app.register_blueprint(debug_bp, url_prefix='/api/debug')
     app.register_blueprint(dispositifs_bp, url_prefix='/api/dispositifs') 
     app.register_blueprint(interventions_bp, url_prefix='/api/interventions') 
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(metriques_bp, url_prefix='/api/metrics')
     
     # Route de test pour vérifier la connexion
     @app.route('/api/health', methods=['GET'])
@@ -21,6 +21,70 @@ class Config:
     JWT_ERROR_MESSAGE_KEY = 'message'
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ['access', 'refresh']
+    # Verdicts de révocation gardés en mémoire (LRU) et relecture des révocations des autres processus (secondes)
+    JWT_CACHE_TAILLE = 10000
+    JWT_REVOCATION_INTERVALLE = 5
+    
+    # Cache par processus (id -> rôle, actif) des décorateurs admin_requis / technicien_requis
+    IDENTITE_CACHE_TTL = 60
+    
+    # Génération des documents PDF par lot
+    DOSSIER_DOCUMENTS = os.environ.get('DOSSIER_DOCUMENTS') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'documents')
+    DOCUMENTS_PROCESSUS = int(os.environ.get('DOCUMENTS_PROCESSUS', 0)) or None  # None : un par cœur
+    DOCUMENTS_LOT_MAX = 5000
+    DOCUMENTS_LOT_INACTIVITE_MAX = 600  # Secondes sans avancement après lesquelles un lot en cours est marqué échoué
+    
+    # Cache disque des fiches PDF (éviction des moins récemment utilisées au-delà de la taille max)
+    DOSSIER_CACHE_PDF = os.environ.get('DOSSIER_CACHE_PDF') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_pdf')
+    CACHE_PDF_TAILLE_MAX = int(os.environ.get('CACHE_PDF_TAILLE_MAX', 500 * 1024 * 1024))
+    
+    # Pièces jointes des interventions (contenu adressé par SHA-256, dédupliqué)
+    PIECES_JOINTES_STOCKAGE = 'fichiers'
+    DOSSIER_PIECES_JOINTES = os.environ.get('DOSSIER_PIECES_JOINTES') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pieces_jointes')
+    PIECES_JOINTES_TAILLE_MAX = 20 * 1024 * 1024
+    PIECES_JOINTES_TYPES = ['image/jpeg', 'image/png', 'image/webp', 'application/pdf']
+    SIGNATURE_FORMAT = 'PNG'  # PNG ou WEBP
+    SIGNATURE_LARGEUR_MAX = 600
+    VIGNETTE_TAILLE = 320  # Côté du carré dans lequel tient la vignette des images (px)
+    VIGNETTE_QUALITE = 80
+    VIGNETTES_THREADS = 2
+    VIGNETTES_CACHE_DUREE = 365 * 24 * 3600
+    
+    # Mises à jour d'interventions saisies hors ligne (POST /api/interventions/batch)
+    INTERVENTIONS_LOT_MAX = 200
+    
+    # Flux SSE des notifications : relecture de la table (autres processus) et durée max d'une connexion
+    # (à garder sous le --timeout de gunicorn, cf. Dockerfile)
+    NOTIFICATIONS_SSE_INTERVALLE = 5
+    NOTIFICATIONS_SSE_DUREE_MAX = 300
+    NOTIFICATIONS_SSE_RELECTURE = 10  # Secondes pendant lesquelles les ids sous le curseur sont relus (commits tardifs)
+    NOTIFICATIONS_SSE_TICKET_DUREE = 30  # Validité d'un ticket d'ouverture du flux (usage unique)
+    NOTIFICATIONS_SSE_FLUX_MAX = 8  # Flux simultanés par processus : les autres threads restent aux requêtes ordinaires
+    
+    # Requêtes POST/PUT/PATCH avec en-tête Idempotency-Key : réponses mémorisées pendant IDEMPOTENCE_TTL secondes
+    IDEMPOTENCE_TTL = 24 * 3600
+    IDEMPOTENCE_TAILLE_MAX = 64 * 1024
+    IDEMPOTENCE_BLUEPRINTS_EXCLUS = ['auth']  # Ne pas stocker de tokens
+    
+    # Journalisation (lignes JSON écrites hors du thread de la requête, rotation par taille)
+    LOG_FICHIER = os.path.join('logs', 'app.log')
+    LOG_TAILLE_MAX = 10 * 1024 * 1024
+    LOG_FICHIERS_CONSERVES = 5
+    LOG_CONSOLE = True
+    LOG_NIVEAU = 'INFO'
+    LOG_NIVEAUX = {
+        'werkzeug': 'INFO',
+        'sqlalchemy.engine': 'WARNING',
+        'PIL': 'INFO'
+    }
+    LOG_ECHANTILLONNAGE = 100  # Événements par ligne de liste : 1 sur N conservé
+    
+    # Journal des requêtes SQL lentes avec plan EXPLAIN (GET /api/debug/slow-queries), désactivé si None
+    REQUETES_LENTES_SEUIL_MS = float(os.environ['REQUETES_LENTES_SEUIL_MS']) if os.environ.get('REQUETES_LENTES_SEUIL_MS') else None
+    REQUETES_LENTES_TAILLE = 200
+    
+    # GET /api/metrics : si défini, le collecteur doit envoyer Authorization: Bearer <jeton>
+    METRIQUES_JETON = os.environ.get('METRIQUES_JETON')
     
     # Configuration CORS
     CORS_ORIGINS = ['http://localhost:3000']
@@ -30,6 +94,7 @@ class ConfigDeveloppement(Config):
     """Configuration de développement"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'mysql+pymysql://root:@localhost/oxycare_db'
+    LOG_NIVEAU = 'DEBUG'
     
 class ConfigProduction(Config):
     """Configuration de production"""
@@ -39,6 +104,7 @@ class ConfigProduction(Config):
 class ConfigTest(Config):
     """Configuration de test"""
     TESTING = True
+    LOG_CONSOLE = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'mysql+pymysql://root:@localhost/oxycare_test_db'
     
 # Dictionnaire des configurations
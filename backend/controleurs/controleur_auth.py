@@ -1,6 +1,8 @@
 from typing import Dict, Any, Tuple
 from flask import request, jsonify
+from flask_jwt_extended import decode_token
 from services.service_auth import ServiceAuth
+from services.service_jetons import ServiceJetons
 from schemas.schema_utilisateur import SchemaUtilisateur
 
 class ControleurAuth:
@@ -73,6 +75,28 @@ class ControleurAuth:
             'access_token': access_token
         }, 200
     
+    def deconnexion(self, claims: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """Endpoint pour révoquer le token courant (et le refresh token transmis dans le corps)"""
+        a_revoquer = [claims]
+        
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                refresh_claims = decode_token(refresh_token)
+            except Exception:
+                return {'message': 'Refresh token invalide'}, 400
+            if refresh_claims.get('sub') != claims.get('sub'):
+                return {'message': 'Refresh token invalide'}, 400
+            a_revoquer.append(refresh_claims)
+        
+        try:
+            for claims_jeton in a_revoquer:
+                ServiceJetons.revoquer(claims_jeton)
+        except Exception as e:
+            return {'message': f'Erreur lors de la déconnexion: {str(e)}'}, 500
+        
+        return {'message': 'Déconnexion réussie'}, 200
+    
     def obtenir_profil(self, utilisateur_id: int) -> Tuple[Dict[str, Any], int]:
         """Endpoint pour récupérer le profil de l'utilisateur connecté"""
         utilisateur = self.service_auth.depot_utilisateur.obtenir_par_id(utilisateur_id)
@@ -2,12 +2,13 @@ from typing import Dict, Any, Tuple
 from flask import request
 from services.service_patient import ServicePatient
 from schemas.schema_patient import SchemaPatient
+from utils.lecture_tabulaire import lire_lignes
+from utils.etag import avec_etag, calculer_etag, est_inchangee, reponse_inchangee
 import logging
 import traceback
 from extensions.base_donnees import db
 
 # Configuration du logging pour debug
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class ControleurPatient:
@@ -36,6 +37,11 @@ class ControleurPatient:
                 
             logger.info(f"Paramètres validés: page={page}, par_page={par_page}, recherche='{recherche}'")
             
+            # ETag : nombre et dernière modification des patients correspondants, avant toute sérialisation
+            etag = calculer_etag(*self.service_patient.obtenir_empreinte_patients(recherche))
+            if est_inchangee(etag):
+                return reponse_inchangee(etag)
+            
             # Appel du service
             logger.info("Appel du service patient...")
             try:
@@ -87,7 +93,7 @@ class ControleurPatient:
             }
             
             logger.info(f"Réponse finale préparée avec {len(donnees_serialisees)} éléments")
-            return response_data, 200
+            return avec_etag((response_data, 200), etag)
             
         except ValueError as ve:
             logger.error(f"Erreur de validation dans obtenir_patients: {str(ve)}\n{traceback.format_exc()}")
@@ -131,6 +137,14 @@ class ControleurPatient:
                     'message': 'ID patient invalide'
                 }, 400
                 
+            # Avec If-None-Match, seule la date de modification est lue tant que rien n'a changé
+            if request.if_none_match:
+                date_modification = self.service_patient.obtenir_date_modification_patient(patient_id)
+                if date_modification is not None:
+                    etag = calculer_etag(date_modification)
+                    if est_inchangee(etag):
+                        return reponse_inchangee(etag)
+            
             patient = self.service_patient.obtenir_patient_par_id(patient_id)
             
             if not patient:
@@ -139,11 +153,11 @@ class ControleurPatient:
                     'message': 'Patient non trouvé'
                 }, 404
             
-            return {
+            return avec_etag(({
                 'success': True,
                 'data': self.schema_patient.dump(patient),
                 'message': 'Patient récupéré avec succès'
-            }, 200
+            }, 200), calculer_etag(patient.date_modification))
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du patient {patient_id}: {str(e)}")
@@ -304,4 +318,49 @@ class ControleurPatient:
             return {
                 'success': False,
                 'message': f'Erreur lors de la recherche du patient: {str(e)}'
-            }, 500
\ No newline at end of file
+            }, 500
+    
+    def importer_patients(self) -> Tuple[Dict[str, Any], int]:
+        """Endpoint pour importer des patients depuis un fichier CSV ou XLSX"""
+        try:
+            fichier = request.files.get('fichier')
+            if not fichier:
+                return {
+                    'success': False,
+                    'message': 'Fichier requis (champ "fichier")'
+                }, 400
+            
+            taille_lot = request.args.get('taille_lot', 500, type=int)
+            if taille_lot < 1 or taille_lot > 5000:
+                taille_lot = 500
+            
+            try:
+                lignes = lire_lignes(fichier)
+            except ValueError as ve:
+                return {
+                    'success': False,
+                    'message': str(ve)
+                }, 400
+            
+            rapport = self.service_patient.importer_patients(lignes, taille_lot)
+            
+            if rapport.get('erreur_fichier'):
+                return {
+                    'success': False,
+                    'data': rapport,
+                    'message': f"Lecture du fichier interrompue: {rapport['erreur_fichier']} ({rapport['crees']} patients déjà importés)"
+                }, 400
+            
+            return {
+                'success': True,
+                'data': rapport,
+                'message': f"{rapport['crees']} patients importés, {len(rapport['erreurs'])} lignes rejetées"
+            }, 200
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'import des patients: {str(e)}\n{traceback.format_exc()}")
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f"Erreur lors de l'import des patients: {str(e)}"
+            }, 500
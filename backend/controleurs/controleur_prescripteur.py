@@ -3,6 +3,7 @@ from flask import request
 from modeles.prescripteur import Prescripteur
 from schemas.schema_prescripteur import SchemaPrescripteur
 from extensions.base_donnees import db
+from utils.etag import avec_etag, calculer_etag, empreinte_ensemble, est_inchangee, reponse_inchangee
 
 class ControleurPrescripteur:
     """Contrôleur pour les endpoints relatifs aux prescripteurs"""
@@ -13,15 +14,30 @@ class ControleurPrescripteur:
     
     def obtenir_prescripteurs(self) -> Tuple[Dict[str, Any], int]:
         """Endpoint pour récupérer tous les prescripteurs"""
+        # ETag : nombre et dernière modification des prescripteurs
+        etag = calculer_etag(*empreinte_ensemble(Prescripteur.query, Prescripteur.id, Prescripteur.date_modification))
+        if est_inchangee(etag):
+            return reponse_inchangee(etag)
+        
         prescripteurs = Prescripteur.query.all()
         
-        return {
+        return avec_etag(({
             'success': True,
             'data': self.schema_prescripteurs.dump(prescripteurs)
-        }, 200
+        }, 200), etag)
     
     def obtenir_prescripteur(self, prescripteur_id: int) -> Tuple[Dict[str, Any], int]:
         """Endpoint pour récupérer un prescripteur par son ID"""
+        # Avec If-None-Match, seule la date de modification est lue tant que rien n'a changé
+        if request.if_none_match:
+            date_modification = db.session.query(Prescripteur.date_modification).filter(
+                Prescripteur.id == prescripteur_id
+            ).scalar()
+            if date_modification is not None:
+                etag = calculer_etag(date_modification)
+                if est_inchangee(etag):
+                    return reponse_inchangee(etag)
+        
         prescripteur = Prescripteur.query.get(prescripteur_id)
         
         if not prescripteur:
@@ -30,10 +46,10 @@ class ControleurPrescripteur:
                 'message': 'Prescripteur non trouvé'
             }, 404
         
-        return {
+        return avec_etag(({
             'success': True,
             'data': self.schema_prescripteur.dump(prescripteur)
-        }, 200
+        }, 200), calculer_etag(prescripteur.date_modification))
     
     def creer_prescripteur(self) -> Tuple[Dict[str, Any], int]:
         """Endpoint pour créer un nouveau prescripteur"""
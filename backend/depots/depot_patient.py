@@ -1,6 +1,9 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Any, Set, Tuple
+from sqlalchemy import false, func
+from extensions.base_donnees import db
 from .depot_base import DepotBase
 from modeles.patient import Patient
+from .depot_recherche import DepotRecherche
 
 class DepotPatient(DepotBase[Patient]):
     """Dépôt pour les opérations sur les patients"""
@@ -16,20 +19,36 @@ class DepotPatient(DepotBase[Patient]):
         """Récupérer un patient par sa CIN"""
         return Patient.query.filter_by(cin=cin).first()
     
-    def obtenir_pagine_avec_recherche(self, page: int = 1, par_page: int = 10, recherche: str = '') -> Dict:
-        """Récupérer les patients avec pagination et recherche"""
+    def _requete_avec_recherche(self, recherche: str = ''):
+        """Requête des patients correspondant à la recherche, et son ordre de tri"""
         query = Patient.query
+        ordre = [Patient.date_creation.desc()]
         
         if recherche:
-            query = query.filter(
-                (Patient.code_patient.like(f'%{recherche}%')) |
-                (Patient.nom.like(f'%{recherche}%')) |
-                (Patient.prenom.like(f'%{recherche}%')) |
-                (Patient.telephone.like(f'%{recherche}%')) |
-                (Patient.cin.like(f'%{recherche}%'))
-            )
-        
-        pagination = query.order_by(Patient.date_creation.desc()).paginate(page=page, per_page=par_page)
+            # Index de recherche : préfixes de mots sans accents, les meilleurs scores d'abord
+            correspondances = DepotRecherche.correspondances('patient', recherche)
+            if correspondances is None:
+                # Aucun mot recherchable (ex. « - ») : aucun patient, et non tous les patients
+                return query.filter(false()), ordre
+            query = query.join(correspondances, correspondances.c.entite_id == Patient.id)
+            ordre.insert(0, correspondances.c.score.desc())
+        return query, ordre
+    
+    def obtenir_empreinte_recherche(self, recherche: str = '') -> Tuple:
+        """(nombre, dernier id, dernière date_modification) des patients correspondant à la recherche"""
+        query, _ = self._requete_avec_recherche(recherche)
+        return tuple(query.with_entities(
+            func.count(Patient.id), func.max(Patient.id), func.max(Patient.date_modification)
+        ).one())
+    
+    def obtenir_date_modification(self, patient_id: int):
+        """Date de modification d'un patient (None s'il n'existe pas)"""
+        return db.session.query(Patient.date_modification).filter(Patient.id == patient_id).scalar()
+    
+    def obtenir_pagine_avec_recherche(self, page: int = 1, par_page: int = 10, recherche: str = '') -> Dict:
+        """Récupérer les patients avec pagination et recherche"""
+        query, ordre = self._requete_avec_recherche(recherche)
+        pagination = query.order_by(*ordre).paginate(page=page, per_page=par_page)
         
         return {
             'elements': pagination.items,
@@ -37,4 +56,31 @@ class DepotPatient(DepotBase[Patient]):
             'pages': pagination.pages,
             'page': page,
             'par_page': par_page
-        }
\ No newline at end of file
+        }
+    
+    def obtenir_cles_existantes(self, cins: Set[str], codes: Set[str]) -> Tuple[Set[str], Set[str]]:
+        """CIN et codes patient déjà présents en base parmi ceux donnés (une seule requête)"""
+        conditions = []
+        if cins:
+            conditions.append(Patient.cin.in_(cins))
+        if codes:
+            conditions.append(Patient.code_patient.in_(codes))
+        if not conditions:
+            return set(), set()
+        
+        lignes = db.session.query(Patient.cin, Patient.code_patient).filter(db.or_(*conditions)).all()
+        return (
+            {cin for cin, _ in lignes if cin in cins},
+            {code for _, code in lignes if code in codes}
+        )
+    
+    def inserer_en_masse(self, lignes: List[Dict[str, Any]]) -> None:
+        """Insérer des patients sans passer par les objets ORM (sans commit) et renseigner leur 'id'"""
+        db.session.bulk_insert_mappings(Patient, lignes)
+        ids = dict(
+            db.session.query(Patient.code_patient, Patient.id).filter(
+                Patient.code_patient.in_([ligne['code_patient'] for ligne in lignes])
+            ).all()
+        )
+        for ligne in lignes:
+            ligne['id'] = ids[ligne['code_patient']]
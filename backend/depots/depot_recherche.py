@@ -0,0 +1,62 @@
+import re
+import unicodedata
+from typing import List, Optional
+from sqlalchemy import and_, case, false, func, select
+from extensions.base_donnees import db
+from modeles.terme_recherche import TermeRecherche
+
+class DepotRecherche:
+    """Dépôt pour les requêtes sur l'index de recherche (préfixes de mots, sans accents)"""
+    
+    @staticmethod
+    def normaliser(texte: Optional[str]) -> List[str]:
+        """Découpe un texte en mots (lettres et chiffres de toutes écritures : latin, arabe...),
+        sans accents ni casse"""
+        if not texte:
+            return []
+        decompose = unicodedata.normalize('NFKD', str(texte))
+        sans_accents = ''.join(c for c in decompose if not unicodedata.combining(c))
+        return [mot[:64] for mot in re.findall(r'[^\W_]+', sans_accents.casefold())]
+    
+    @staticmethod
+    def _prefixe(mot: str):
+        """Condition « terme commence par mot » sous forme d'intervalle, utilisable par l'index"""
+        borne_haute = mot[:-1] + chr(ord(mot[-1]) + 1)
+        return and_(TermeRecherche.terme >= mot, TermeRecherche.terme < borne_haute)
+    
+    @staticmethod
+    def correspondances(entite: str, recherche: str):
+        """
+        Sous-requête (entite_id, score) des entités dont les mots commencent par
+        chacun des mots recherchés. Un mot identique compte double dans le score.
+        Retourne None si la recherche ne contient aucun mot.
+        """
+        mots = list(dict.fromkeys(DepotRecherche.normaliser(recherche)))
+        if not mots:
+            return None
+        
+        conditions = [DepotRecherche._prefixe(mot) for mot in mots]
+        score = sum(
+            case((TermeRecherche.terme == mot, 2), (condition, 1), else_=0)
+            for mot, condition in zip(mots, conditions)
+        )
+        return db.session.query(
+            TermeRecherche.entite_id.label('entite_id'),
+            func.sum(score).label('score')
+        ).filter(
+            TermeRecherche.entite == entite,
+            db.or_(*conditions)
+        ).group_by(
+            TermeRecherche.entite_id
+        ).having(
+            and_(*[func.sum(case((condition, 1), else_=0)) > 0 for condition in conditions])
+        ).subquery()
+    
+    @staticmethod
+    def ids_correspondants(entite: str, recherche: str):
+        """Select des identifiants correspondants, pour un filtre IN (...).
+        Une recherche sans aucun mot (ex. « - » ou « % ») ne correspond à rien."""
+        sous_requete = DepotRecherche.correspondances(entite, recherche)
+        if sous_requete is None:
+            return select(TermeRecherche.entite_id).where(false())
+        return select(sous_requete.c.entite_id)
@@ -1,8 +1,10 @@
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from modeles.intervention import Intervention
+from modeles.patient import Patient
+from modeles.dispositif_medical import DispositifMedical
 from extensions.base_donnees import db
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, extract
 
 class InterventionDepot:
     @staticmethod
@@ -151,6 +153,81 @@ class InterventionDepot:
             'par_type': par_type
         }
     
+    @staticmethod
+    def compter_par_statut(technicien_id: Optional[int] = None) -> Dict[str, int]:
+        """Compte les interventions par statut (GROUP BY statut)"""
+        query = db.session.query(Intervention.statut, func.count(Intervention.id))
+        if technicien_id:
+            query = query.filter(Intervention.technicien_id == technicien_id)
+        return {statut: nombre for statut, nombre in query.group_by(Intervention.statut).all()}
+    
+    @staticmethod
+    def compter_par_mois(depuis: datetime, technicien_id: Optional[int] = None) -> Dict[tuple, int]:
+        """Compte les interventions créées depuis une date, par (année, mois)"""
+        annee = extract('year', Intervention.date_creation)
+        mois = extract('month', Intervention.date_creation)
+        query = db.session.query(annee, mois, func.count(Intervention.id)).filter(
+            Intervention.date_creation >= depuis
+        )
+        if technicien_id:
+            query = query.filter(Intervention.technicien_id == technicien_id)
+        lignes = query.group_by(annee, mois).all()
+        return {(int(a), int(m)): nombre for a, m, nombre in lignes}
+    
+    @staticmethod
+    def compter_par_technicien_et_statut() -> Dict[int, Dict[str, int]]:
+        """Compte les interventions par technicien puis par statut"""
+        lignes = db.session.query(
+            Intervention.technicien_id,
+            Intervention.statut,
+            func.count(Intervention.id)
+        ).group_by(Intervention.technicien_id, Intervention.statut).all()
+        
+        resultat = {}
+        for technicien_id, statut, nombre in lignes:
+            resultat.setdefault(technicien_id, {})[statut] = nombre
+        return resultat
+    
+    @staticmethod
+    def obtenir_agenda(
+        debut: datetime,
+        fin: datetime,
+        technicien_id: Optional[int] = None,
+        statuts: Optional[List[str]] = None
+    ) -> List[Any]:
+        """Interventions planifiées dans [debut, fin), avec les seules colonnes utiles à l'agenda.
+        Avec un technicien, la requête ne lit que l'index (technicien_id, date_planifiee, statut)."""
+        query = db.session.query(
+            Intervention.id,
+            Intervention.date_planifiee,
+            Intervention.statut,
+            Intervention.type_intervention,
+            Intervention.traitement,
+            Intervention.lieu,
+            Intervention.technicien_id,
+            Patient.id.label('patient_id'),
+            Patient.code_patient,
+            Patient.nom.label('patient_nom'),
+            Patient.prenom.label('patient_prenom'),
+            Patient.telephone.label('patient_telephone'),
+            Patient.adresse.label('patient_adresse'),
+            Patient.ville.label('patient_ville'),
+            DispositifMedical.id.label('dispositif_id'),
+            DispositifMedical.designation.label('dispositif_designation'),
+            DispositifMedical.numero_serie.label('dispositif_numero_serie')
+        ).outerjoin(Patient, Intervention.patient_id == Patient.id) \
+         .outerjoin(DispositifMedical, Intervention.dispositif_id == DispositifMedical.id)
+
+        if technicien_id:
+            query = query.filter(Intervention.technicien_id == technicien_id)
+        query = query.filter(
+            Intervention.date_planifiee >= debut,
+            Intervention.date_planifiee < fin
+        )
+        if statuts:
+            query = query.filter(Intervention.statut.in_(statuts))
+        return query.order_by(Intervention.date_planifiee, Intervention.id).all()
+    
     @staticmethod
     def obtenir_interventions_avec_filtres(
         statut: Optional[str] = None,
@@ -1,9 +1,31 @@
+from .journalisation import init_app as init_journalisation
 from .base_donnees import init_app as init_db
 from .jwt import init_app as init_jwt
 from .cors import init_app as init_cors
+from .statistiques import init_app as init_statistiques
+from .recherche import init_app as init_recherche
+from .cache_pdf import init_app as init_cache_pdf
+from .notifications import init_app as init_notifications
+from .sync import init_app as init_sync
+from .idempotence import init_app as init_idempotence
+from .identite import init_app as init_identite
+from .metriques import init_app as init_metriques
+from .requetes_lentes import init_app as init_requetes_lentes
+from .pieces_jointes import init_app as init_pieces_jointes
 
 def init_app(app):
     """Initialiser toutes les extensions"""
+    init_journalisation(app)
     init_db(app)
+    init_metriques(app)
+    init_requetes_lentes(app)
     init_jwt(app)
-    init_cors(app)
\ No newline at end of file
+    init_cors(app)
+    init_statistiques(app)
+    init_recherche(app)
+    init_cache_pdf(app)
+    init_notifications(app)
+    init_sync(app)
+    init_idempotence(app)
+    init_identite(app)
+    init_pieces_jointes(app)
@@ -0,0 +1,25 @@
+from sqlalchemy import event, inspect
+
+def _avant_modification(mapper, connection, target):
+    """Invalide le PDF en cache d'une intervention modifiée"""
+    from utils import cache_pdf
+    
+    etat = inspect(target)
+    if etat.attrs.rapport_pdf_url.history.has_changes():
+        return
+    modifiee = any(
+        etat.attrs[attribut.key].history.has_changes()
+        for attribut in mapper.column_attrs
+        if attribut.key not in ('rapport_pdf_url', 'date_modification')
+    )
+    fichier = cache_pdf.resoudre(target.rapport_pdf_url)
+    if modifiee and fichier:
+        cache_pdf.supprimer(fichier)
+        target.rapport_pdf_url = None
+
+def init_app(app):
+    """Brancher l'invalidation du cache des PDF d'intervention"""
+    from modeles.intervention import Intervention
+    
+    if not event.contains(Intervention, 'before_update', _avant_modification):
+        event.listen(Intervention, 'before_update', _avant_modification)
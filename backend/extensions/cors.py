@@ -8,7 +8,7 @@ def init_app(app):
                  resources={r"/api/*": {
                      "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],  # Origines spécifiques 
                      "methods": ["GET", "HEAD", "POST", "OPTIONS", "PUT", "PATCH", "DELETE"],
-                     "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
+                     "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Idempotency-Key", "If-None-Match"],
                      "supports_credentials": True,  # Important pour les cookies/auth
                  }},
                  # Ajouter ces options globales pour s'assurer que CORS est appliqué même en cas d'erreur
@@ -19,7 +19,7 @@ def init_app(app):
     cors_headers = {
         'Access-Control-Allow-Origin': 'http://localhost:3000',
         'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS, PATCH', 
-        'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With, Idempotency-Key, If-None-Match',
         'Access-Control-Allow-Credentials': 'true'
     }
     
@@ -0,0 +1,88 @@
+import click
+from datetime import timedelta
+from flask import g, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+METHODES = ('POST', 'PUT', 'PATCH')
+LONGUEUR_CLE_MAX = 255
+
+def _identite():
+    """Utilisateur du token s'il est valide, '' sinon (la route répondra elle-même 401)"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity() or ''
+    except Exception:
+        return ''
+
+def _empreinte_corps():
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        fichiers = sorted((nom, f.filename or '', f.content_length or 0) for nom, f in request.files.items(multi=True))
+        return sorted(request.form.items(multi=True)), fichiers
+    return request.get_data(),
+
+def init_app(app):
+    """Brancher la mémorisation des réponses des requêtes portant un en-tête Idempotency-Key"""
+    from services.service_idempotence import ServiceIdempotence, empreinte
+    
+    @app.before_request
+    def verifier_idempotence():
+        cle_client = request.headers.get('Idempotency-Key')
+        if not cle_client or request.method not in METHODES:
+            return None
+        if request.blueprint in app.config['IDEMPOTENCE_BLUEPRINTS_EXCLUS']:
+            return None
+        if len(cle_client) > LONGUEUR_CLE_MAX:
+            return jsonify({
+                'success': False,
+                'message': f'Idempotency-Key trop longue (max {LONGUEUR_CLE_MAX} caractères)'
+            }), 400
+        
+        cle = empreinte(_identite(), request.method, request.path, cle_client)
+        etat, reponse = ServiceIdempotence.reserver(
+            cle,
+            empreinte(*_empreinte_corps()),
+            timedelta(seconds=app.config['IDEMPOTENCE_TTL'])
+        )
+        if etat == 'differente':
+            return jsonify({
+                'success': False,
+                'message': 'Idempotency-Key déjà utilisée pour une autre requête'
+            }), 422
+        if etat == 'en_cours':
+            return jsonify({
+                'success': False,
+                'message': 'Une requête avec la même Idempotency-Key est en cours'
+            }), 409
+        if etat == 'terminee':
+            rejouee = make_response(reponse['corps'], reponse['statut_http'])
+            if reponse['type_contenu']:
+                rejouee.headers['Content-Type'] = reponse['type_contenu']
+            rejouee.headers['Idempotent-Replayed'] = 'true'
+            return rejouee
+        g.cle_idempotence = cle
+        return None
+    
+    @app.after_request
+    def memoriser_reponse(response):
+        cle = g.pop('cle_idempotence', None)
+        if cle is None:
+            return response
+        # Les erreurs serveur et les réponses en flux ou volumineuses ne sont pas mémorisées
+        if (response.status_code >= 500 or response.is_streamed or response.direct_passthrough
+                or (response.content_length or 0) > app.config['IDEMPOTENCE_TAILLE_MAX']):
+            ServiceIdempotence.liberer(cle)
+        else:
+            ServiceIdempotence.enregistrer(cle, response.status_code, response.content_type, response.get_data())
+        return response
+    
+    @app.teardown_request
+    def liberer_reservation(exception):
+        cle = g.pop('cle_idempotence', None)
+        if cle is not None:
+            ServiceIdempotence.liberer(cle)
+    
+    @app.cli.command('purger-idempotence')
+    def purger_idempotence():
+        """Supprime les clés d'idempotence expirées"""
+        nombre = ServiceIdempotence.purger()
+        click.echo(f"{nombre} clés d'idempotence supprimées")
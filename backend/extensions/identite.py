@@ -0,0 +1,23 @@
+from flask import g
+from sqlalchemy import event
+
+def _invalider(mapper, connection, target):
+    """Oublie l'identité en cache d'un utilisateur modifié ou supprimé"""
+    from utils.cache_identite import cache_identites
+    
+    cache_identites.invalider(target.id)
+
+def init_app(app):
+    """Configurer le cache des identités des décorateurs d'autorisation et son invalidation"""
+    from modeles.utilisateur import Utilisateur
+    from utils.cache_identite import cache_identites
+    
+    cache_identites.ttl = app.config['IDENTITE_CACHE_TTL']
+    if not event.contains(Utilisateur, 'after_update', _invalider):
+        event.listen(Utilisateur, 'after_update', _invalider)
+        event.listen(Utilisateur, 'after_delete', _invalider)
+    
+    @app.before_request
+    def oublier_identite():
+        # g peut survivre à la requête si un contexte d'application était déjà actif
+        g.pop('identite', None)
@@ -0,0 +1,116 @@
+import atexit
+import copy
+import itertools
+import json
+import logging
+import os
+import queue
+from collections import defaultdict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from flask import has_request_context, request
+
+# À passer en extra des événements émis pour chaque ligne d'une liste :
+# seul un événement sur LOG_ECHANTILLONNAGE par ligne de code est conservé
+ECHANTILLON = {'echantillon': True}
+
+# Attributs standard d'un LogRecord (les autres viennent de extra=...)
+_ATTRIBUTS_STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'requete'}
+
+_pipeline = {'ecouteur': None, 'gestionnaire': None}
+
+class FormateurJSON(logging.Formatter):
+    """Une ligne JSON par événement"""
+    
+    def format(self, record):
+        ligne = {
+            'horodatage': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'module': record.name,
+            'message': record.getMessage(),
+            'source': f"{record.pathname}:{record.lineno}",
+            'processus': record.process,
+            'thread': record.threadName
+        }
+        if getattr(record, 'requete', None):
+            ligne['requete'] = record.requete
+        for attribut, valeur in vars(record).items():
+            if attribut not in _ATTRIBUTS_STANDARD and attribut != 'echantillon':
+                ligne[attribut] = valeur
+        if record.exc_text:
+            ligne['exception'] = record.exc_text
+        return json.dumps(ligne, ensure_ascii=False, default=str)
+
+class FiltreEchantillonnage(logging.Filter):
+    """Ne laisse passer qu'un événement ECHANTILLON sur `taux` pour chaque ligne de code"""
+    
+    def __init__(self, taux):
+        super().__init__()
+        self.taux = max(1, taux)
+        self._compteurs = defaultdict(itertools.count)
+    
+    def filter(self, record):
+        if not getattr(record, 'echantillon', False) or self.taux == 1:
+            return True
+        return next(self._compteurs[(record.name, record.lineno)]) % self.taux == 0
+
+class GestionnaireFile(QueueHandler):
+    """Met les événements en file ; le formatage et l'écriture se font dans le thread du QueueListener"""
+    
+    def prepare(self, record):
+        # Figer ce qui dépend du thread appelant (arguments, exception, requête en cours)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if has_request_context():
+            record.requete = f"{request.method} {request.path}"
+        return record
+
+def _arreter():
+    if _pipeline['ecouteur'] is not None:
+        _pipeline['ecouteur'].stop()
+        _pipeline['ecouteur'] = None
+    if _pipeline['gestionnaire'] is not None:
+        logging.getLogger().removeHandler(_pipeline['gestionnaire'])
+        _pipeline['gestionnaire'] = None
+
+def init_app(app):
+    """Configurer la journalisation : file en mémoire vidée par un thread dédié vers un fichier JSON tournant"""
+    _arreter()
+    
+    destinations = []
+    fichier = app.config['LOG_FICHIER']
+    if fichier:
+        os.makedirs(os.path.dirname(fichier) or '.', exist_ok=True)
+        fichier_handler = RotatingFileHandler(
+            fichier,
+            maxBytes=app.config['LOG_TAILLE_MAX'],
+            backupCount=app.config['LOG_FICHIERS_CONSERVES'],
+            encoding='utf-8'
+        )
+        fichier_handler.setFormatter(FormateurJSON())
+        destinations.append(fichier_handler)
+    if app.config['LOG_CONSOLE']:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        destinations.append(console)
+    
+    file_attente = queue.SimpleQueue()
+    gestionnaire = GestionnaireFile(file_attente)
+    gestionnaire.addFilter(FiltreEchantillonnage(app.config['LOG_ECHANTILLONNAGE']))
+    ecouteur = QueueListener(file_attente, *destinations, respect_handler_level=True)
+    
+    racine = logging.getLogger()
+    racine.setLevel(app.config['LOG_NIVEAU'])
+    racine.addHandler(gestionnaire)
+    for nom, niveau in app.config['LOG_NIVEAUX'].items():
+        logging.getLogger(nom).setLevel(niveau)
+    
+    ecouteur.start()
+    _pipeline['ecouteur'] = ecouteur
+    _pipeline['gestionnaire'] = gestionnaire
+
+atexit.register(_arreter)
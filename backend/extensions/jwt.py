@@ -2,6 +2,19 @@ from flask_jwt_extended import JWTManager
 
 jwt = JWTManager()
 
+@jwt.token_in_blocklist_loader
+def verifier_revocation(jwt_header, jwt_payload):
+    """Refuse les tokens révoqués par une déconnexion : filtre de Bloom en mémoire d'abord,
+    la table (et le cache des verdicts) seulement si le jti y figure peut-être"""
+    from services.service_jetons import ServiceJetons
+    
+    return ServiceJetons.est_revoque(jwt_payload.get('jti'), jwt_payload.get('exp'))
+
 def init_app(app):
     """Initialiser l'extension JWT"""
-    jwt.init_app(app)
\ No newline at end of file
+    from services.service_jetons import ServiceJetons
+    from utils.cache_jetons import cache_jetons
+    
+    jwt.init_app(app)
+    cache_jetons.taille_max = app.config['JWT_CACHE_TAILLE']
+    ServiceJetons.intervalle = app.config['JWT_REVOCATION_INTERVALLE']
@@ -0,0 +1,82 @@
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+def _avant_execution(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metriques_debuts', []).append(time.perf_counter())
+
+def _apres_execution(conn, cursor, statement, parameters, context, executemany):
+    debuts = conn.info.get('metriques_debuts')
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+    if has_request_context() and 'metriques_sql' in g:
+        g.metriques_sql[0] += 1
+        g.metriques_sql[1] += duree
+
+def _erreur_execution(contexte_exception):
+    # L'instruction a échoué : after_cursor_execute ne sera pas appelé
+    connexion = contexte_exception.connection
+    if connexion is not None and connexion.info.get('metriques_debuts'):
+        connexion.info['metriques_debuts'].pop()
+
+def _emprunt(dbapi_connection, connection_record, connection_proxy):
+    from utils.metriques import metriques
+    metriques.incrementer('oxycare_pool_emprunts_total')
+
+def _restitution(dbapi_connection, connection_record):
+    from utils.metriques import metriques
+    metriques.incrementer('oxycare_pool_restitutions_total')
+
+def _connexion(dbapi_connection, connection_record):
+    from utils.metriques import metriques
+    metriques.incrementer('oxycare_pool_connexions_creees_total')
+
+def jauges_pool(engine):
+    """État courant du pool (les pools SQLite n'ont ni taille ni débordement)"""
+    pool = engine.pool
+    jauges = []
+    for nom, methode, aide in (
+        ('oxycare_pool_taille', 'size', 'Taille configurée du pool'),
+        ('oxycare_pool_connexions_empruntees', 'checkedout', 'Connexions actuellement empruntées'),
+        ('oxycare_pool_connexions_disponibles', 'checkedin', 'Connexions disponibles dans le pool'),
+        ('oxycare_pool_debordement', 'overflow', 'Connexions ouvertes au-delà de la taille du pool'),
+    ):
+        if hasattr(pool, methode):
+            jauges.append((nom, aide, 'gauge', getattr(pool, methode)()))
+    return jauges
+
+def init_app(app):
+    """Mesurer chaque requête (durée, taille, SQL) et le pool de connexions pour GET /api/metrics"""
+    from extensions.base_donnees import db
+    from utils.metriques import metriques
+    
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _avant_execution):
+        event.listen(engine, 'before_cursor_execute', _avant_execution)
+        event.listen(engine, 'after_cursor_execute', _apres_execution)
+        event.listen(engine, 'handle_error', _erreur_execution)
+        event.listen(engine, 'checkout', _emprunt)
+        event.listen(engine, 'checkin', _restitution)
+        event.listen(engine, 'connect', _connexion)
+    
+    @app.before_request
+    def demarrer_mesure():
+        g.metriques_debut = time.perf_counter()
+        g.metriques_sql = [0, 0.0]
+    
+    @app.after_request
+    def enregistrer_mesure(response):
+        debut = g.pop('metriques_debut', None)
+        if debut is None:
+            return response
+        sql_nombre, sql_duree = g.pop('metriques_sql', (0, 0.0))
+        # Gabarit de la règle plutôt que le chemin : nombre de séries borné
+        route = request.url_rule.rule if request.url_rule is not None else 'inconnue'
+        taille = None if response.is_streamed or response.direct_passthrough else response.content_length
+        metriques.observer_requete(
+            request.blueprint or '', route, request.method, response.status_code,
+            time.perf_counter() - debut, taille, sql_nombre, sql_duree
+        )
+        return response
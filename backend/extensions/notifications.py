@@ -0,0 +1,5 @@
+def init_app(app):
+    """Brancher la création des notifications sur les changements de statut"""
+    from services.service_notifications import ServiceNotifications
+    
+    ServiceNotifications.enregistrer_ecouteurs()
@@ -0,0 +1,18 @@
+import click
+
+def init_app(app):
+    """Configurer le stockage des pièces jointes et le déplacement des données en ligne des interventions"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    from utils.stockage_blobs import creer_stockage
+    
+    ServicePiecesJointes.stockage = creer_stockage(
+        app.config['PIECES_JOINTES_STOCKAGE'],
+        racine=app.config['DOSSIER_PIECES_JOINTES']
+    )
+    ServicePiecesJointes.enregistrer_ecouteurs()
+    
+    @app.cli.command('purger-pieces-jointes')
+    def purger_pieces_jointes():
+        """Supprime les fichiers de pièces jointes qui ne sont plus référencés"""
+        nombre = ServicePiecesJointes.purger_orphelins()
+        click.echo(f"{nombre} fichiers supprimés")
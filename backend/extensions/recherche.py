@@ -0,0 +1,14 @@
+import click
+
+def init_app(app):
+    """Brancher la mise à jour de l'index de recherche et sa commande de reconstruction"""
+    from services.service_recherche import ServiceRecherche
+    
+    ServiceRecherche.enregistrer_ecouteurs()
+    
+    @app.cli.command('reconstruire-index-recherche')
+    @click.option('--taille-lot', default=1000, show_default=True, help='Nombre de lignes lues par lot')
+    def reconstruire_index_recherche(taille_lot):
+        """Recalcule la table index_recherche à partir des tables sources"""
+        nombre = ServiceRecherche.reconstruire(taille_lot)
+        click.echo(f"{nombre} termes de recherche indexés")
@@ -0,0 +1,83 @@
+import time
+from flask import has_request_context, request
+from sqlalchemy import event
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Instructions dont le plan peut être demandé sans les exécuter, par dialecte
+EXPLICABLES = {
+    'sqlite': ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH'),
+    'mysql': ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE', 'WITH'),
+}
+PREFIXES_EXPLAIN = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'mysql': 'EXPLAIN ',
+}
+
+def expliquer(conn, instruction, parametres):
+    """Plan d'exécution (liste de lignes) de l'instruction, ou None si le dialecte ne s'y prête pas"""
+    dialecte = conn.dialect.name
+    if dialecte not in PREFIXES_EXPLAIN:
+        return None
+    if not instruction.lstrip().upper().startswith(EXPLICABLES[dialecte]):
+        return None
+    
+    # Curseur DBAPI brut : pas d'événements SQLAlchemy (donc pas de récursion), même transaction
+    curseur = conn.connection.cursor()
+    try:
+        curseur.execute(PREFIXES_EXPLAIN[dialecte] + instruction, parametres)
+        colonnes = [description[0] for description in curseur.description or ()]
+        return [dict(zip(colonnes, ligne)) for ligne in curseur.fetchall()]
+    except Exception as e:
+        return [{'erreur': str(e)}]
+    finally:
+        curseur.close()
+
+def _avant_execution(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('requetes_lentes_debuts', []).append(time.perf_counter())
+
+def _apres_execution(conn, cursor, statement, parameters, context, executemany):
+    from utils.requetes_lentes import journal_requetes_lentes
+    
+    debuts = conn.info.get('requetes_lentes_debuts')
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+    seuil = journal_requetes_lentes.seuil
+    if seuil is None or duree < seuil:
+        return
+    
+    route = 'hors requête'
+    if has_request_context():
+        regle = request.url_rule.rule if request.url_rule is not None else request.path
+        route = f"{request.method} {regle}"
+    # Pas d'EXPLAIN sur la connexion d'un résultat lu en flux (yield_per, stream_results) :
+    # avec pymysql, une nouvelle instruction abandonnerait les lignes non encore lues
+    en_flux = context is not None and context.execution_options.get('stream_results', False)
+    plan = None if executemany or en_flux else expliquer(conn, statement, parameters)
+    journal_requetes_lentes.ajouter(statement, parameters if not executemany else None, duree, route, plan)
+    logger.warning("Requête lente (%.1f ms) sur %s", duree * 1000, route)
+
+def _erreur_execution(contexte_exception):
+    connexion = contexte_exception.connection
+    if connexion is not None and connexion.info.get('requetes_lentes_debuts'):
+        connexion.info['requetes_lentes_debuts'].pop()
+
+def init_app(app):
+    """Enregistrer les instructions SQL plus lentes que REQUETES_LENTES_SEUIL_MS (désactivé si None)"""
+    from extensions.base_donnees import db
+    from utils.requetes_lentes import journal_requetes_lentes
+    
+    seuil_ms = app.config['REQUETES_LENTES_SEUIL_MS']
+    journal_requetes_lentes.redimensionner(app.config['REQUETES_LENTES_TAILLE'])
+    journal_requetes_lentes.seuil = seuil_ms / 1000 if seuil_ms is not None else None
+    if seuil_ms is None:
+        return
+    
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _avant_execution):
+        event.listen(engine, 'before_cursor_execute', _avant_execution)
+        event.listen(engine, 'after_cursor_execute', _apres_execution)
+        event.listen(engine, 'handle_error', _erreur_execution)
@@ -0,0 +1,14 @@
+import click
+
+def init_app(app):
+    """Brancher le cumul des statistiques journalières et sa commande de reconstruction"""
+    from services.service_statistiques import ServiceStatistiques
+    
+    ServiceStatistiques.enregistrer_ecouteurs()
+    
+    @app.cli.command('reconstruire-statistiques')
+    @click.option('--taille-lot', default=1000, show_default=True, help='Nombre de lignes lues par lot')
+    def reconstruire_statistiques(taille_lot):
+        """Recalcule la table stats_journalieres à partir des tables sources"""
+        nombre = ServiceStatistiques.reconstruire(taille_lot)
+        click.echo(f"{nombre} lignes de statistiques journalières recalculées")
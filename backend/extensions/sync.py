@@ -0,0 +1,5 @@
+def init_app(app):
+    """Brancher les traces de suppression de la synchronisation différentielle"""
+    from services.service_sync import ServiceSync
+    
+    ServiceSync.enregistrer_ecouteurs()
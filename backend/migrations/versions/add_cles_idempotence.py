@@ -0,0 +1,34 @@
+"""add cles_idempotence table
+
+Revision ID: add_cles_idempotence
+Revises: add_sync_suppressions
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_cles_idempotence'
+down_revision = 'add_sync_suppressions'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'cles_idempotence',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('cle', sa.String(64), nullable=False, unique=True),
+        sa.Column('empreinte_requete', sa.String(64), nullable=False),
+        sa.Column('statut_http', sa.Integer(), nullable=True),
+        sa.Column('type_contenu', sa.String(100), nullable=True),
+        sa.Column('corps', sa.LargeBinary(), nullable=True),
+        sa.Column('date_expiration', sa.DateTime(), nullable=False),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_cles_idempotence_date_expiration', 'cles_idempotence', ['date_expiration'])
+
+def downgrade():
+    op.drop_index('ix_cles_idempotence_date_expiration', table_name='cles_idempotence')
+    op.drop_table('cles_idempotence')
@@ -0,0 +1,27 @@
+"""add composite index for the technicians' agenda
+
+Revision ID: add_index_interventions_agenda
+Revises: add_lots_documents
+Create Date: 2026-10-17 19:00:00.000000
+
+GET /api/interventions/aujourdhui filtre sur technicien_id, une plage de
+date_planifiee puis le statut.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_index_interventions_agenda'
+down_revision = 'add_lots_documents'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_interventions_technicien_date_statut',
+        'interventions',
+        ['technicien_id', 'date_planifiee', 'statut']
+    )
+
+def downgrade():
+    op.drop_index('ix_interventions_technicien_date_statut', table_name='interventions')
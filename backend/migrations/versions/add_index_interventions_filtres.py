@@ -0,0 +1,34 @@
+"""add composite indexes for the intervention repository filters
+
+Revision ID: add_index_interventions_filtres
+Revises: add_vignettes_pieces_jointes
+Create Date: 2026-10-18 00:30:00.000000
+
+InterventionDepot filtre sur patient_id, dispositif_id, statut et des plages
+de date_planifiee, et trie par date_planifiee. technicien_id est déjà couvert
+par ix_interventions_technicien_date_statut. Vérifié par
+tests/unite/test_plans_requetes.py (EXPLAIN sans parcours complet).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_index_interventions_filtres'
+down_revision = 'add_vignettes_pieces_jointes'
+branch_labels = None
+depends_on = None
+
+INDEX = [
+    ('ix_interventions_patient_date', ['patient_id', 'date_planifiee']),
+    ('ix_interventions_dispositif_date', ['dispositif_id', 'date_planifiee']),
+    ('ix_interventions_statut_date', ['statut', 'date_planifiee']),
+    ('ix_interventions_date_planifiee', ['date_planifiee']),
+]
+
+def upgrade():
+    for nom, colonnes in INDEX:
+        op.create_index(nom, 'interventions', colonnes)
+
+def downgrade():
+    for nom, _ in reversed(INDEX):
+        op.drop_index(nom, table_name='interventions')
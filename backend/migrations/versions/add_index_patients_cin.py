@@ -0,0 +1,22 @@
+"""add index on patients.cin
+
+Revision ID: add_index_patients_cin
+Revises: add_index_recherche
+Create Date: 2026-10-17 11:00:00.000000
+
+L'import en masse vérifie les doublons de CIN par lots (cin IN (...)).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_index_patients_cin'
+down_revision = 'add_index_recherche'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_patients_cin', 'patients', ['cin'])
+
+def downgrade():
+    op.drop_index('ix_patients_cin', table_name='patients')
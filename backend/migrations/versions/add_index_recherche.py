@@ -0,0 +1,92 @@
+"""add index_recherche search table
+
+Revision ID: add_index_recherche
+Revises: add_stats_journalieres
+Create Date: 2026-10-17 10:00:00.000000
+
+La table est remplie à partir de patients, dispositifs_medicaux et utilisateurs
+(lecture par lots ordonnés par id) ; elle reste ensuite à jour par les écouteurs
+de services/service_recherche.py. Réparation : flask reconstruire-index-recherche.
+"""
+import re
+import unicodedata
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_index_recherche'
+down_revision = 'add_stats_journalieres'
+branch_labels = None
+depends_on = None
+
+TAILLE_LOT = 1000
+
+# Table source -> (entité, colonnes indexées, colonnes indexées aussi par suffixes),
+# figé à cette révision (CHAMPS et SOUS_CHAINES de services/service_recherche.py)
+SOURCES = {
+    'patients': ('patient', ['code_patient', 'nom', 'prenom', 'telephone', 'cin'], {'telephone', 'cin'}),
+    'dispositifs_medicaux': ('dispositif', ['designation', 'reference', 'numero_serie'], set()),
+    'utilisateurs': ('utilisateur', ['nom', 'prenom'], set()),
+}
+
+def _normaliser(texte):
+    if not texte:
+        return []
+    decompose = unicodedata.normalize('NFKD', str(texte))
+    sans_accents = ''.join(c for c in decompose if not unicodedata.combining(c))
+    return [mot[:64] for mot in re.findall(r'[^\W_]+', sans_accents.casefold())]
+
+def _termes(ligne, colonnes, sous_chaines):
+    resultat = set()
+    for colonne in colonnes:
+        mots = _normaliser(ligne[colonne])
+        resultat.update(mots)
+        colle = ''.join(mots)[:64]
+        if len(mots) > 1:
+            resultat.add(colle)
+        if colonne in sous_chaines:
+            resultat.update(colle[debut:] for debut in range(1, len(colle)))
+    return sorted(resultat)
+
+def _remplir(connexion, index_recherche):
+    maintenant = datetime.utcnow()
+    for nom, (entite, colonnes, sous_chaines) in SOURCES.items():
+        table = sa.table(nom, *[sa.column(colonne) for colonne in ['id'] + colonnes])
+        dernier_id = 0
+        while True:
+            lignes = connexion.execute(
+                sa.select(*table.c).where(table.c.id > dernier_id).order_by(table.c.id).limit(TAILLE_LOT)
+            ).mappings().all()
+            if not lignes:
+                break
+            lot = [
+                {
+                    'entite': entite, 'entite_id': ligne['id'], 'terme': terme,
+                    'date_creation': maintenant, 'date_modification': maintenant
+                }
+                for ligne in lignes
+                for terme in _termes(ligne, colonnes, sous_chaines)
+            ]
+            if lot:
+                connexion.execute(index_recherche.insert(), lot)
+            dernier_id = lignes[-1]['id']
+
+def upgrade():
+    index_recherche = op.create_table(
+        'index_recherche',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entite', sa.String(20), nullable=False),
+        sa.Column('entite_id', sa.Integer(), nullable=False),
+        sa.Column('terme', sa.String(64), nullable=False),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_index_recherche_entite_terme', 'index_recherche', ['entite', 'terme'])
+    op.create_index('ix_index_recherche_entite_id', 'index_recherche', ['entite', 'entite_id'])
+    _remplir(op.get_bind(), index_recherche)
+
+def downgrade():
+    op.drop_index('ix_index_recherche_entite_id', table_name='index_recherche')
+    op.drop_index('ix_index_recherche_entite_terme', table_name='index_recherche')
+    op.drop_table('index_recherche')
@@ -0,0 +1,32 @@
+"""add jetons_revoques table
+
+Revision ID: add_jetons_revoques
+Revises: add_cles_idempotence
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_jetons_revoques'
+down_revision = 'add_cles_idempotence'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'jetons_revoques',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('jti', sa.String(36), nullable=False, unique=True),
+        sa.Column('type_jeton', sa.String(10), nullable=False),
+        sa.Column('utilisateur_id', sa.Integer(), nullable=True),
+        sa.Column('date_expiration', sa.DateTime(), nullable=False),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_jetons_revoques_date_expiration', 'jetons_revoques', ['date_expiration'])
+
+def downgrade():
+    op.drop_index('ix_jetons_revoques_date_expiration', table_name='jetons_revoques')
+    op.drop_table('jetons_revoques')
@@ -0,0 +1,34 @@
+"""add lots_documents table for batch PDF generation
+
+Revision ID: add_lots_documents
+Revises: add_index_patients_cin
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_lots_documents'
+down_revision = 'add_index_patients_cin'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'lots_documents',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('utilisateur_id', sa.Integer(), sa.ForeignKey('utilisateurs.id'), nullable=False),
+        sa.Column('statut', sa.String(20), nullable=False, server_default='en_attente'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('traites', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('erreurs', sa.JSON(), nullable=True),
+        sa.Column('chemin_fichier', sa.String(255), nullable=True),
+        sa.Column('message', sa.String(255), nullable=True),
+        sa.Column('date_fin', sa.DateTime(), nullable=True),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+
+def downgrade():
+    op.drop_table('lots_documents')
@@ -0,0 +1,34 @@
+"""add notifications table
+
+Revision ID: add_notifications
+Revises: add_index_interventions_agenda
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_notifications'
+down_revision = 'add_index_interventions_agenda'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('intervention_id', sa.Integer(), nullable=False),
+        sa.Column('technicien_id', sa.Integer(), nullable=True),
+        sa.Column('type', sa.String(20), nullable=False, server_default='statut'),
+        sa.Column('ancien_statut', sa.String(20), nullable=True),
+        sa.Column('nouveau_statut', sa.String(20), nullable=True),
+        sa.Column('message', sa.String(255), nullable=False),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_notifications_technicien_id', 'notifications', ['technicien_id', 'id'])
+
+def downgrade():
+    op.drop_index('ix_notifications_technicien_id', table_name='notifications')
+    op.drop_table('notifications')
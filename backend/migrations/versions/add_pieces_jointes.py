@@ -0,0 +1,208 @@
+"""add pieces_jointes table, move inline signatures and photos to the blob store
+
+Revision ID: add_pieces_jointes
+Revises: add_jetons_revoques
+Create Date: 2026-10-17 23:30:00.000000
+
+"""
+from datetime import datetime
+import json
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_pieces_jointes'
+down_revision = 'add_jetons_revoques'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+TAILLE_LOT = 500
+
+interventions = sa.table(
+    'interventions',
+    sa.column('id', sa.Integer),
+    sa.column('signature_technicien', sa.Text),
+    sa.column('photos', sa.Text)
+)
+
+pieces_jointes = sa.table(
+    'pieces_jointes',
+    sa.column('id', sa.Integer),
+    sa.column('intervention_id', sa.Integer),
+    sa.column('type_piece', sa.String),
+    sa.column('empreinte', sa.String),
+    sa.column('type_contenu', sa.String),
+    sa.column('taille', sa.Integer),
+    sa.column('nom_fichier', sa.String),
+    sa.column('largeur', sa.Integer),
+    sa.column('hauteur', sa.Integer),
+    sa.column('date_creation', sa.DateTime),
+    sa.column('date_modification', sa.DateTime)
+)
+
+def _configuration():
+    from flask import current_app
+    from config import Config
+    try:
+        return current_app.config
+    except RuntimeError:
+        return {cle: getattr(Config, cle) for cle in dir(Config) if cle.isupper()}
+
+def _stockage(configuration):
+    from utils.stockage_blobs import creer_stockage
+    return creer_stockage(
+        configuration['PIECES_JOINTES_STOCKAGE'],
+        racine=configuration['DOSSIER_PIECES_JOINTES']
+    )
+
+def _lire_photos(valeur):
+    if not valeur:
+        return []
+    if isinstance(valeur, str):
+        try:
+            valeur = json.loads(valeur)
+        except ValueError:
+            return []
+    return valeur if isinstance(valeur, list) else []
+
+def _piece(intervention_id, type_piece, empreinte, type_contenu, taille, nom_fichier, largeur=None, hauteur=None):
+    maintenant = datetime.utcnow()
+    return {
+        'intervention_id': intervention_id, 'type_piece': type_piece, 'empreinte': empreinte,
+        'type_contenu': type_contenu, 'taille': taille, 'nom_fichier': nom_fichier,
+        'largeur': largeur, 'hauteur': hauteur,
+        'date_creation': maintenant, 'date_modification': maintenant
+    }
+
+def _deplacer(ligne, configuration, stockage):
+    """Pièces extraites d'une intervention et nouvelles valeurs de ses colonnes"""
+    from utils.images import compresser_signature, decoder_data_url
+    
+    pieces = []
+    valeurs = {}
+    if ligne.signature_technicien:
+        try:
+            contenu, _ = decoder_data_url(ligne.signature_technicien)
+            octets, type_contenu, largeur, hauteur = compresser_signature(
+                contenu, configuration['SIGNATURE_FORMAT'], configuration['SIGNATURE_LARGEUR_MAX']
+            )
+            empreinte, taille = stockage.enregistrer_octets(octets)
+            nom = 'signature' + ('.webp' if type_contenu == 'image/webp' else '.png')
+            pieces.append(_piece(ligne.id, 'signature', empreinte, type_contenu, taille, nom, largeur, hauteur))
+            valeurs['signature_technicien'] = None
+        except ValueError as e:
+            logger.warning(f"Signature de l'intervention {ligne.id} laissée en ligne: {str(e)}")
+    
+    photos = _lire_photos(ligne.photos)
+    if any(isinstance(photo, str) and photo.startswith('data:') for photo in photos):
+        restantes = []
+        for photo in photos:
+            if not (isinstance(photo, str) and photo.startswith('data:')):
+                restantes.append(photo)  # URL déjà externe
+                continue
+            try:
+                contenu, type_contenu = decoder_data_url(photo)
+                empreinte, taille = stockage.enregistrer_octets(contenu)
+                pieces.append(_piece(ligne.id, 'photo', empreinte, type_contenu or 'application/octet-stream', taille, None))
+            except ValueError as e:
+                logger.warning(f"Photo de l'intervention {ligne.id} laissée en ligne: {str(e)}")
+                restantes.append(photo)
+        valeurs['photos'] = json.dumps(restantes) if restantes else None
+    return pieces, valeurs
+
+def upgrade():
+    op.create_table(
+        'pieces_jointes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('intervention_id', sa.Integer(), sa.ForeignKey('interventions.id'), nullable=False),
+        sa.Column('type_piece', sa.String(20), nullable=False),
+        sa.Column('empreinte', sa.String(64), nullable=False),
+        sa.Column('type_contenu', sa.String(100), nullable=False),
+        sa.Column('taille', sa.Integer(), nullable=False),
+        sa.Column('nom_fichier', sa.String(255), nullable=True),
+        sa.Column('largeur', sa.Integer(), nullable=True),
+        sa.Column('hauteur', sa.Integer(), nullable=True),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_pieces_jointes_intervention_id', 'pieces_jointes', ['intervention_id'])
+    op.create_index('ix_pieces_jointes_empreinte', 'pieces_jointes', ['empreinte'])
+    
+    # Déplacement par lots ordonnés par id : une seule page de données en mémoire à la fois
+    connexion = op.get_bind()
+    configuration = _configuration()
+    stockage = _stockage(configuration)
+    dernier_id = 0
+    deplacees = 0
+    while True:
+        lignes = connexion.execute(
+            sa.select(interventions.c.id, interventions.c.signature_technicien, interventions.c.photos)
+            .where(interventions.c.id > dernier_id)
+            .where(sa.or_(interventions.c.signature_technicien.isnot(None), interventions.c.photos.like('%data:%')))
+            .order_by(interventions.c.id)
+            .limit(TAILLE_LOT)
+        ).all()
+        if not lignes:
+            break
+        for ligne in lignes:
+            pieces, valeurs = _deplacer(ligne, configuration, stockage)
+            if pieces:
+                connexion.execute(pieces_jointes.insert(), pieces)
+            if valeurs:
+                connexion.execute(interventions.update().where(interventions.c.id == ligne.id).values(**valeurs))
+                deplacees += 1
+        dernier_id = lignes[-1].id
+    logger.info(f"{deplacees} interventions: signatures et photos déplacées dans {configuration['DOSSIER_PIECES_JOINTES']}")
+
+def downgrade():
+    from utils.images import encoder_data_url
+    
+    # Les pièces redeviennent des data URL dans les colonnes (les blobs restent sur disque)
+    connexion = op.get_bind()
+    stockage = _stockage(_configuration())
+    dernier_id = 0
+    while True:
+        ids = connexion.execute(
+            sa.select(pieces_jointes.c.intervention_id).distinct()
+            .where(pieces_jointes.c.intervention_id > dernier_id)
+            .where(pieces_jointes.c.type_piece.in_(('signature', 'photo')))
+            .order_by(pieces_jointes.c.intervention_id)
+            .limit(TAILLE_LOT)
+        ).scalars().all()
+        if not ids:
+            break
+        for intervention_id in ids:
+            pieces = connexion.execute(
+                sa.select(pieces_jointes)
+                .where(pieces_jointes.c.intervention_id == intervention_id)
+                .where(pieces_jointes.c.type_piece.in_(('signature', 'photo')))
+                .order_by(pieces_jointes.c.id)
+            ).all()
+            valeurs = {}
+            photos = []
+            for piece in pieces:
+                try:
+                    with stockage.ouvrir(piece.empreinte) as fichier:
+                        data_url = encoder_data_url(fichier.read(), piece.type_contenu)
+                except FileNotFoundError:
+                    logger.warning(f"Contenu manquant pour la pièce jointe {piece.id}")
+                    continue
+                if piece.type_piece == 'signature':
+                    valeurs['signature_technicien'] = data_url
+                else:
+                    photos.append(data_url)
+            if photos:
+                existantes = _lire_photos(connexion.execute(
+                    sa.select(interventions.c.photos).where(interventions.c.id == intervention_id)
+                ).scalar())
+                valeurs['photos'] = json.dumps(existantes + photos)
+            if valeurs:
+                connexion.execute(interventions.update().where(interventions.c.id == intervention_id).values(**valeurs))
+        dernier_id = ids[-1]
+    
+    op.drop_index('ix_pieces_jointes_empreinte', table_name='pieces_jointes')
+    op.drop_index('ix_pieces_jointes_intervention_id', table_name='pieces_jointes')
+    op.drop_table('pieces_jointes')
@@ -0,0 +1,116 @@
+"""add stats_journalieres rollup table
+
+Revision ID: add_stats_journalieres
+Revises: fix_traitement_id_constraint
+Create Date: 2026-10-17 09:00:00.000000
+
+La table est remplie à partir de patients, dispositifs_medicaux et interventions
+(lecture par lots ordonnés par id) ; elle reste ensuite à jour par les écouteurs
+de services/service_statistiques.py. Réparation : flask reconstruire-statistiques.
+
+Les valeurs presque uniques par ligne (date de naissance, désignation, fin de
+garantie) ne sont pas cumulées : elles sont lues dans les tables, avec deux
+index sur dispositifs_medicaux.
+"""
+from collections import Counter
+from datetime import date, datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_stats_journalieres'
+down_revision = 'fix_traitement_id_constraint'
+branch_labels = None
+depends_on = None
+
+TAILLE_LOT = 1000
+JOUR_INCONNU = date(1970, 1, 1)
+
+# Table source -> (colonne du jour, {dimension: colonne de la valeur, None pour le total}),
+# figé à cette révision (DIMENSIONS de services/service_statistiques.py)
+SOURCES = {
+    'patients': ('date_creation', {
+        'patient': None,
+        'patient.ville': 'ville',
+        'patient.prescripteur_id': 'prescripteur_id',
+    }),
+    'dispositifs_medicaux': ('date_creation', {
+        'dispositif': None,
+        'dispositif.statut': 'statut',
+        'dispositif.type_acquisition': 'type_acquisition',
+    }),
+    'interventions': ('date_planifiee', {
+        'intervention': None,
+        'intervention.statut': 'statut',
+        'intervention.traitement': 'traitement',
+        'intervention.type_intervention': 'type_intervention',
+    }),
+}
+
+def _jour(valeur):
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    return valeur if isinstance(valeur, date) else JOUR_INCONNU
+
+def _valeur(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, (date, datetime)):
+        return valeur.isoformat()
+    return str(valeur)[:100]
+
+def _remplir(connexion, stats_journalieres):
+    compteurs = Counter()
+    for nom, (colonne_jour, dimensions) in SOURCES.items():
+        colonnes = ['id', colonne_jour] + sorted({colonne for colonne in dimensions.values() if colonne})
+        table = sa.table(nom, *[
+            sa.column(colonne, sa.DateTime if colonne == colonne_jour else None) for colonne in colonnes
+        ])
+        dernier_id = 0
+        while True:
+            lignes = connexion.execute(
+                sa.select(*[table.c[colonne] for colonne in colonnes])
+                .where(table.c.id > dernier_id).order_by(table.c.id).limit(TAILLE_LOT)
+            ).mappings().all()
+            if not lignes:
+                break
+            for ligne in lignes:
+                jour = _jour(ligne[colonne_jour])
+                for dimension, colonne in dimensions.items():
+                    compteurs[(jour, dimension, _valeur(ligne[colonne]) if colonne else '')] += 1
+            dernier_id = lignes[-1]['id']
+    
+    maintenant = datetime.utcnow()
+    lignes = [
+        {
+            'jour': jour, 'dimension': dimension, 'valeur': valeur, 'nombre': nombre,
+            'date_creation': maintenant, 'date_modification': maintenant
+        }
+        for (jour, dimension, valeur), nombre in compteurs.items()
+    ]
+    for debut in range(0, len(lignes), TAILLE_LOT):
+        connexion.execute(stats_journalieres.insert(), lignes[debut:debut + TAILLE_LOT])
+
+def upgrade():
+    stats_journalieres = op.create_table(
+        'stats_journalieres',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('jour', sa.Date(), nullable=False),
+        sa.Column('dimension', sa.String(50), nullable=False),
+        sa.Column('valeur', sa.String(100), nullable=False, server_default=''),
+        sa.Column('nombre', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('jour', 'dimension', 'valeur', name='uq_stats_journalieres_cle')
+    )
+    op.create_index('ix_stats_journalieres_dimension_jour', 'stats_journalieres', ['dimension', 'jour'])
+    op.create_index('ix_dispositifs_medicaux_designation', 'dispositifs_medicaux', ['designation'])
+    op.create_index('ix_dispositifs_medicaux_date_fin_garantie', 'dispositifs_medicaux', ['date_fin_garantie'])
+    
+    _remplir(op.get_bind(), stats_journalieres)
+
+def downgrade():
+    op.drop_index('ix_dispositifs_medicaux_date_fin_garantie', table_name='dispositifs_medicaux')
+    op.drop_index('ix_dispositifs_medicaux_designation', table_name='dispositifs_medicaux')
+    op.drop_index('ix_stats_journalieres_dimension_jour', table_name='stats_journalieres')
+    op.drop_table('stats_journalieres')
@@ -0,0 +1,39 @@
+"""add suppressions table and date_modification indexes for delta sync
+
+Revision ID: add_sync_suppressions
+Revises: add_notifications
+Create Date: 2026-10-17 21:00:00.000000
+
+GET /api/sync filtre interventions, patients et dispositifs sur
+date_modification et lit les suppressions depuis le repère du client.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_sync_suppressions'
+down_revision = 'add_notifications'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'suppressions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entite', sa.String(20), nullable=False),
+        sa.Column('entite_id', sa.Integer(), nullable=False),
+        sa.Column('technicien_id', sa.Integer(), nullable=True),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_suppressions_date_creation', 'suppressions', ['date_creation'])
+    op.create_index('ix_interventions_date_modification', 'interventions', ['date_modification'])
+    op.create_index('ix_patients_date_modification', 'patients', ['date_modification'])
+    op.create_index('ix_dispositifs_medicaux_date_modification', 'dispositifs_medicaux', ['date_modification'])
+
+def downgrade():
+    op.drop_index('ix_dispositifs_medicaux_date_modification', table_name='dispositifs_medicaux')
+    op.drop_index('ix_patients_date_modification', table_name='patients')
+    op.drop_index('ix_interventions_date_modification', table_name='interventions')
+    op.drop_index('ix_suppressions_date_creation', table_name='suppressions')
+    op.drop_table('suppressions')
@@ -0,0 +1,35 @@
+"""add tickets_flux table
+
+Revision ID: add_tickets_flux
+Revises: date_modification_microsecondes
+Create Date: 2026-10-18 02:00:00.000000
+
+Tickets à usage unique pour ouvrir le flux SSE des notifications sans passer
+le token d'accès dans l'URL.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = 'add_tickets_flux'
+down_revision = 'date_modification_microsecondes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'tickets_flux',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('empreinte', sa.String(64), nullable=False, unique=True),
+        sa.Column('utilisateur_id', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(20), nullable=True),
+        sa.Column('date_expiration', sa.DateTime(), nullable=False),
+        sa.Column('date_creation', sa.DateTime(), nullable=True),
+        sa.Column('date_modification', sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'), nullable=True)
+    )
+    op.create_index('ix_tickets_flux_date_expiration', 'tickets_flux', ['date_expiration'])
+
+def downgrade():
+    op.drop_index('ix_tickets_flux_date_expiration', table_name='tickets_flux')
+    op.drop_table('tickets_flux')
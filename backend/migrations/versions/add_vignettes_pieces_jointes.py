@@ -0,0 +1,22 @@
+"""add empreinte_vignette to pieces_jointes
+
+Revision ID: add_vignettes_pieces_jointes
+Revises: add_pieces_jointes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_vignettes_pieces_jointes'
+down_revision = 'add_pieces_jointes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Vignettes des pièces existantes : générées au premier affichage ou au premier PDF
+    op.add_column('pieces_jointes', sa.Column('empreinte_vignette', sa.String(64), nullable=True))
+
+def downgrade():
+    op.drop_column('pieces_jointes', 'empreinte_vignette')
@@ -0,0 +1,40 @@
+"""store date_modification with microsecond precision on MySQL
+
+Revision ID: date_modification_microsecondes
+Revises: add_index_interventions_filtres
+Create Date: 2026-10-18 01:00:00.000000
+
+Les ETag des listes (COUNT, MAX(id), MAX(date_modification)) et des détails
+(date_modification) ne distinguaient pas deux modifications dans la même
+seconde sur un DATETIME MySQL. Les autres bases gardent déjà les microsecondes.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = 'date_modification_microsecondes'
+down_revision = 'add_index_interventions_filtres'
+branch_labels = None
+depends_on = None
+
+def _tables():
+    inspecteur = sa.inspect(op.get_bind())
+    return [
+        table for table in inspecteur.get_table_names()
+        if any(colonne['name'] == 'date_modification' for colonne in inspecteur.get_columns(table))
+    ]
+
+def upgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for table in _tables():
+        op.alter_column(table, 'date_modification', type_=mysql.DATETIME(fsp=6),
+                        existing_type=mysql.DATETIME(), existing_nullable=True)
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for table in _tables():
+        op.alter_column(table, 'date_modification', type_=mysql.DATETIME(),
+                        existing_type=mysql.DATETIME(fsp=6), existing_nullable=True)
@@ -11,4 +11,13 @@ from .fiche_controle import FicheControle
 from .bon_entree import BonEntree
 from .bon_sortie import BonSortie
 from .intervention import Intervention
-from .traitement import Traitement
\ No newline at end of file
+from .traitement import Traitement
+from .stat_journaliere import StatJournaliere
+from .terme_recherche import TermeRecherche
+from .lot_documents import LotDocuments
+from .notification import Notification
+from .suppression import Suppression
+from .cle_idempotence import CleIdempotence
+from .jeton_revoque import JetonRevoque
+from .piece_jointe import PieceJointe
+from .ticket_flux import TicketFlux
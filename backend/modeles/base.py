@@ -1,13 +1,17 @@
 from datetime import datetime
+from sqlalchemy.dialects import mysql
 from extensions.base_donnees import db
 
+# Précision à la microseconde sur MySQL (DATETIME tronque à la seconde) : les ETag reposent sur date_modification
+HORODATAGE = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
 class ModeleBase(db.Model):
     """Modèle de base avec des fonctionnalités communes"""
     __abstract__ = True
     
     id = db.Column(db.Integer, primary_key=True)
     date_creation = db.Column(db.DateTime, default=datetime.utcnow)
-    date_modification = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    date_modification = db.Column(HORODATAGE, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def enregistrer(self):
         """Enregistrer l'instance en base de données"""
@@ -0,0 +1,23 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class CleIdempotence(ModeleBase):
+    """Modèle pour les réponses mémorisées des requêtes portant un en-tête Idempotency-Key"""
+    __tablename__ = 'cles_idempotence'
+    
+    # Empreintes SHA-256 : (utilisateur, méthode, chemin, clé) et corps de la requête
+    cle = db.Column(db.String(64), unique=True, nullable=False)
+    empreinte_requete = db.Column(db.String(64), nullable=False)
+    statut_http = db.Column(db.Integer, nullable=True)  # None : requête en cours
+    type_contenu = db.Column(db.String(100), nullable=True)
+    corps = db.Column(db.LargeBinary, nullable=True)  # Compressé (zlib)
+    date_expiration = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'statut_http': self.statut_http,
+            'type_contenu': self.type_contenu,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_expiration': self.date_expiration.isoformat() if self.date_expiration else None
+        }
@@ -5,6 +5,13 @@ from .base import ModeleBase
 class DispositifMedical(ModeleBase):
     """Modèle pour la table des dispositifs médicaux"""
     __tablename__ = 'dispositifs_medicaux'
+    __table_args__ = (
+        # Synchronisation différentielle (GET /api/sync)
+        db.Index('ix_dispositifs_medicaux_date_modification', 'date_modification'),
+        # Statistiques hors cumul journalier : top des désignations, dispositifs sous garantie
+        db.Index('ix_dispositifs_medicaux_designation', 'designation'),
+        db.Index('ix_dispositifs_medicaux_date_fin_garantie', 'date_fin_garantie'),
+    )
     
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=True)
     designation = db.Column(db.String(100))
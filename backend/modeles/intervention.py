@@ -6,6 +6,19 @@ from .reglage import Reglage
 class Intervention(ModeleBase):
     """Modèle pour la table des interventions"""
     __tablename__ = 'interventions'
+    __table_args__ = (
+        # Agenda des techniciens : technicien, plage de dates puis statut
+        db.Index('ix_interventions_technicien_date_statut', 'technicien_id', 'date_planifiee', 'statut'),
+        # Historique d'un patient / d'un dispositif, par date
+        db.Index('ix_interventions_patient_date', 'patient_id', 'date_planifiee'),
+        db.Index('ix_interventions_dispositif_date', 'dispositif_id', 'date_planifiee'),
+        # Listes par statut (planifiées, en cours...), éventuellement sur une période
+        db.Index('ix_interventions_statut_date', 'statut', 'date_planifiee'),
+        # Périodes et agenda tous techniciens, tri par date (pagination par curseur)
+        db.Index('ix_interventions_date_planifiee', 'date_planifiee'),
+        # Synchronisation différentielle (GET /api/sync)
+        db.Index('ix_interventions_date_modification', 'date_modification'),
+    )
     
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
     dispositif_id = db.Column(db.Integer, db.ForeignKey('dispositifs_medicaux.id'), nullable=False)
@@ -36,8 +49,9 @@ class Intervention(ModeleBase):
     # Détails de l'intervention
     actions_effectuees = db.Column(db.JSON, nullable=True)
     accessoires_utilises = db.Column(db.JSON, nullable=True)
-    photos = db.Column(db.JSON, nullable=True)  # Liste des URLs des photos
-    signature_technicien = db.Column(db.Text, nullable=True)  # Signature encodée en base64
+    photos = db.Column(db.JSON, nullable=True)  # Liste des URLs des photos (contenu : pieces_jointes)
+    signature_technicien = db.Column(db.Text, nullable=True)  # Ancienne signature en base64, déplacée dans pieces_jointes
+    pieces_jointes = db.relationship('PieceJointe', backref='intervention', lazy='dynamic', cascade='all, delete-orphan')
     rapport_pdf_url = db.Column(db.String(200), nullable=True)
     
     # Paramètres spécifiques par type de traitement
@@ -55,7 +69,16 @@ class Intervention(ModeleBase):
     maintenance_preventive = db.Column(db.Boolean, default=False)  # Indique si une maintenance préventive a été effectuée
     date_prochaine_maintenance = db.Column(db.DateTime, nullable=True)  # Date de la prochaine maintenance prévue
     
-    def to_dict(self):
+    def _valeur_champ(self, champ):
+        if champ == 'reglage':
+            return self.reglage.to_dict() if self.reglage else None
+        valeur = getattr(self, champ)
+        return valeur.isoformat() if isinstance(valeur, datetime) else valeur
+    
+    def to_dict(self, champs=None):
+        # Champs demandés seulement : les colonnes non chargées (load_only) ne sont pas lues
+        if champs is not None:
+            return {champ: self._valeur_champ(champ) for champ in champs}
         return {
             'id': self.id,
             'patient_id': self.patient_id,
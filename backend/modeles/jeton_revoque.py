@@ -0,0 +1,21 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class JetonRevoque(ModeleBase):
+    """Modèle pour les tokens JWT révoqués (déconnexion), conservés jusqu'à leur expiration"""
+    __tablename__ = 'jetons_revoques'
+    
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    type_jeton = db.Column(db.String(10), nullable=False)  # access, refresh
+    utilisateur_id = db.Column(db.Integer, nullable=True)
+    date_expiration = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'jti': self.jti,
+            'type_jeton': self.type_jeton,
+            'utilisateur_id': self.utilisateur_id,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_expiration': self.date_expiration.isoformat() if self.date_expiration else None
+        }
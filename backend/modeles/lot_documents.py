@@ -0,0 +1,29 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class LotDocuments(ModeleBase):
+    """Modèle pour les générations de documents PDF par lot (archive zip)"""
+    __tablename__ = 'lots_documents'
+    
+    utilisateur_id = db.Column(db.Integer, db.ForeignKey('utilisateurs.id'), nullable=False)
+    statut = db.Column(db.String(20), nullable=False, default='en_attente')  # en_attente, en_cours, termine, echoue
+    total = db.Column(db.Integer, nullable=False, default=0)
+    traites = db.Column(db.Integer, nullable=False, default=0)
+    erreurs = db.Column(db.JSON, nullable=True)  # [{'intervention_id': ..., 'erreur': ...}]
+    chemin_fichier = db.Column(db.String(255), nullable=True)
+    message = db.Column(db.String(255), nullable=True)
+    date_fin = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'utilisateur_id': self.utilisateur_id,
+            'statut': self.statut,
+            'total': self.total,
+            'traites': self.traites,
+            'erreurs': self.erreurs or [],
+            'fichier_disponible': self.statut == 'termine' and bool(self.chemin_fichier),
+            'message': self.message,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_fin': self.date_fin.isoformat() if self.date_fin else None
+        }
@@ -0,0 +1,29 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class Notification(ModeleBase):
+    """Modèle pour le fil des notifications (ajout seul, lu par id croissant)"""
+    __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notifications_technicien_id', 'technicien_id', 'id'),
+    )
+    
+    # Pas de clé étrangère : le fil garde la trace des interventions supprimées depuis
+    intervention_id = db.Column(db.Integer, nullable=False)
+    technicien_id = db.Column(db.Integer, nullable=True)  # Destinataire (les admins voient tout)
+    type = db.Column(db.String(20), nullable=False, default='statut')  # statut, rappel, info, erreur
+    ancien_statut = db.Column(db.String(20), nullable=True)
+    nouveau_statut = db.Column(db.String(20), nullable=True)
+    message = db.Column(db.String(255), nullable=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'intervention_id': self.intervention_id,
+            'technicien_id': self.technicien_id,
+            'type': self.type,
+            'ancien_statut': self.ancien_statut,
+            'nouveau_statut': self.nouveau_statut,
+            'message': self.message,
+            'date': self.date_creation.isoformat() if self.date_creation else None
+        }
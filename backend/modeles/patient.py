@@ -5,11 +5,15 @@ from .base import ModeleBase
 class Patient(ModeleBase):
     """Modèle pour la table des patients"""
     __tablename__ = 'patients'
+    __table_args__ = (
+        # Synchronisation différentielle (GET /api/sync)
+        db.Index('ix_patients_date_modification', 'date_modification'),
+    )
     
     code_patient = db.Column(db.String(20), unique=True, index=True)
     nom = db.Column(db.String(64))
     prenom = db.Column(db.String(64))
-    cin = db.Column(db.String(20))
+    cin = db.Column(db.String(20), index=True)
     date_naissance = db.Column(db.Date)
     telephone = db.Column(db.String(20))
     email = db.Column(db.String(120))
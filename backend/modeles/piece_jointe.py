@@ -0,0 +1,35 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class PieceJointe(ModeleBase):
+    """Modèle pour les pièces jointes des interventions (signatures, photos) ; le contenu est dans le stockage de blobs"""
+    __tablename__ = 'pieces_jointes'
+    
+    intervention_id = db.Column(db.Integer, db.ForeignKey('interventions.id'), nullable=False, index=True)
+    type_piece = db.Column(db.String(20), nullable=False)  # signature, photo, document
+    empreinte = db.Column(db.String(64), nullable=False, index=True)  # SHA-256 du contenu (clé du blob)
+    type_contenu = db.Column(db.String(100), nullable=False)
+    taille = db.Column(db.Integer, nullable=False)
+    nom_fichier = db.Column(db.String(255), nullable=True)
+    largeur = db.Column(db.Integer, nullable=True)
+    hauteur = db.Column(db.Integer, nullable=True)
+    empreinte_vignette = db.Column(db.String(64), nullable=True)  # Vignette JPEG, générée en arrière-plan pour les images
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'intervention_id': self.intervention_id,
+            'type_piece': self.type_piece,
+            'empreinte': self.empreinte,
+            'type_contenu': self.type_contenu,
+            'taille': self.taille,
+            'nom_fichier': self.nom_fichier,
+            'largeur': self.largeur,
+            'hauteur': self.hauteur,
+            'url': f'/api/interventions/{self.intervention_id}/pieces-jointes/{self.id}',
+            'vignette_url': (
+                f'/api/interventions/{self.intervention_id}/pieces-jointes/{self.id}/vignette'
+                if self.type_contenu.startswith('image/') else None
+            ),
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None
+        }
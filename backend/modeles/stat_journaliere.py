@@ -0,0 +1,24 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class StatJournaliere(ModeleBase):
+    """Modèle pour la table de cumul des statistiques journalières"""
+    __tablename__ = 'stats_journalieres'
+    __table_args__ = (
+        db.UniqueConstraint('jour', 'dimension', 'valeur', name='uq_stats_journalieres_cle'),
+        db.Index('ix_stats_journalieres_dimension_jour', 'dimension', 'jour'),
+    )
+    
+    jour = db.Column(db.Date, nullable=False)
+    dimension = db.Column(db.String(50), nullable=False)  # ex: 'dispositif.statut', 'patient.ville'
+    valeur = db.Column(db.String(100), nullable=False, default='')  # '' pour une valeur absente
+    nombre = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'jour': self.jour.isoformat() if self.jour else None,
+            'dimension': self.dimension,
+            'valeur': self.valeur,
+            'nombre': self.nombre
+        }
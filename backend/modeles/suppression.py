@@ -0,0 +1,22 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class Suppression(ModeleBase):
+    """Modèle pour les traces de suppression lues par la synchronisation (tombstones)"""
+    __tablename__ = 'suppressions'
+    __table_args__ = (
+        db.Index('ix_suppressions_date_creation', 'date_creation'),
+    )
+    
+    entite = db.Column(db.String(20), nullable=False)  # 'intervention', 'patient', 'dispositif'
+    entite_id = db.Column(db.Integer, nullable=False)
+    technicien_id = db.Column(db.Integer, nullable=True)  # Seul technicien concerné (None : tous)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'entite': self.entite,
+            'entite_id': self.entite_id,
+            'technicien_id': self.technicien_id,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None
+        }
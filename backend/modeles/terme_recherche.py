@@ -0,0 +1,22 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class TermeRecherche(ModeleBase):
+    """Modèle pour l'index de recherche (un mot normalisé par ligne)"""
+    __tablename__ = 'index_recherche'
+    __table_args__ = (
+        db.Index('ix_index_recherche_entite_terme', 'entite', 'terme'),
+        db.Index('ix_index_recherche_entite_id', 'entite', 'entite_id'),
+    )
+    
+    entite = db.Column(db.String(20), nullable=False)  # 'patient', 'dispositif', 'utilisateur'
+    entite_id = db.Column(db.Integer, nullable=False)
+    terme = db.Column(db.String(64), nullable=False)  # minuscules, sans accents
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'entite': self.entite,
+            'entite_id': self.entite_id,
+            'terme': self.terme
+        }
@@ -0,0 +1,21 @@
+from extensions.base_donnees import db
+from .base import ModeleBase
+
+class TicketFlux(ModeleBase):
+    """Modèle pour les tickets d'ouverture du flux SSE des notifications (usage unique, courte durée)"""
+    __tablename__ = 'tickets_flux'
+    
+    # Empreinte SHA-256 du ticket : le ticket lui-même n'est pas conservé
+    empreinte = db.Column(db.String(64), unique=True, nullable=False)
+    utilisateur_id = db.Column(db.Integer, nullable=False)
+    role = db.Column(db.String(20), nullable=True)
+    date_expiration = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'utilisateur_id': self.utilisateur_id,
+            'role': self.role,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_expiration': self.date_expiration.isoformat() if self.date_expiration else None
+        }
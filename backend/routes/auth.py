@@ -1,5 +1,5 @@
 from flask import Blueprint
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from controleurs.controleur_auth import ControleurAuth
 
 auth_bp = Blueprint('auth', __name__)
@@ -22,6 +22,12 @@ def rafraichir():
     utilisateur_id = get_jwt_identity()
     return controleur_auth.rafraichir_token(utilisateur_id)
 
+@auth_bp.route('/deconnexion', methods=['POST'])
+@jwt_required(verify_type=False)
+def deconnexion():
+    """Révoque le token présenté (access ou refresh)"""
+    return controleur_auth.deconnexion(get_jwt())
+
 @auth_bp.route('/profil', methods=['GET'])
 @jwt_required()
 def obtenir_profil():
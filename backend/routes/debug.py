@@ -1,5 +1,14 @@
 from flask import Blueprint, jsonify, current_app, request
 from extensions.base_donnees import db
+from datetime import datetime, date
+from sqlalchemy import func
+from modeles.dispositif_medical import DispositifMedical
+from modeles.prescripteur import Prescripteur
+from services.service_statistiques import ServiceStatistiques
+from flask_jwt_extended import jwt_required
+from utils.decorateurs import admin_requis
+from utils.cache_identite import cache_identites
+from utils.requetes_lentes import journal_requetes_lentes
 
 debug_bp = Blueprint('debug', __name__)
 
@@ -504,86 +513,68 @@ def debug_get_patient(patient_id):
 def statistiques_patients():
     """Route pour obtenir les statistiques détaillées des patients"""
     try:
-        # Total des patients
-        total_patients = Patient.query.count()
+        # Lecture dans le cumul journalier (stats_journalieres) plutôt que dans la table
+        total_patients = ServiceStatistiques.total('patient')
         
         # Patients créés ce mois
         maintenant = datetime.now()
-        debut_mois = datetime(maintenant.year, maintenant.month, 1)
-        nouveaux_ce_mois = Patient.query.filter(
-            Patient.date_creation >= debut_mois
-        ).count()
+        debut_mois = date(maintenant.year, maintenant.month, 1)
+        nouveaux_ce_mois = ServiceStatistiques.total('patient', debut_mois)
         
         # Patients par mois (6 derniers mois)
-        patients_par_mois = db.session.query(
-            extract('year', Patient.date_creation).label('annee'),
-            extract('month', Patient.date_creation).label('mois'),
-            func.count(Patient.id).label('nombre')
-        ).filter(
-            Patient.date_creation >= datetime(maintenant.year, maintenant.month - 5, 1)
-        ).group_by(
-            extract('year', Patient.date_creation),
-            extract('month', Patient.date_creation)
-        ).order_by('annee', 'mois').all()
+        annee, mois = maintenant.year, maintenant.month - 5
+        if mois < 1:
+            annee, mois = annee - 1, mois + 12
+        patients_par_mois = ServiceStatistiques.compter_par_mois('patient', date(annee, mois, 1))
         
         # Formatage des données par mois
         mois_data = []
-        for annee, mois, nombre in patients_par_mois:
-            mois_nom = datetime(int(annee), int(mois), 1).strftime('%b %Y')
-            mois_data.append({'mois': mois_nom, 'nombre': nombre})
+        for (annee, mois), nombre in sorted(patients_par_mois.items()):
+            if nombre:
+                mois_nom = datetime(annee, mois, 1).strftime('%b %Y')
+                mois_data.append({'mois': mois_nom, 'nombre': nombre})
         
         # Patients par ville
-        patients_par_ville = db.session.query(
-            Patient.ville,
-            func.count(Patient.id).label('nombre')
-        ).group_by(Patient.ville).order_by(
-            func.count(Patient.id).desc()
-        ).limit(10).all()
+        patients_par_ville = sorted(
+            ServiceStatistiques.compter('patient.ville').items(),
+            key=lambda element: element[1],
+            reverse=True
+        )[:10]
         
         villes_data = []
         for ville, nombre in patients_par_ville:
             ville_nom = ville or 'Non spécifiée'
             villes_data.append({'ville': ville_nom, 'nombre': nombre})
         
-        # Patients avec dispositifs
+        # Patients avec dispositifs (COUNT(DISTINCT) non cumulable jour par jour)
         patients_avec_dispositifs = db.session.query(
             func.count(func.distinct(DispositifMedical.patient_id))
         ).filter(DispositifMedical.patient_id.isnot(None)).scalar()
         
-        # Répartition par âge
-        patients_ages = db.session.query(
-            Patient.date_naissance
-        ).filter(Patient.date_naissance.isnot(None)).all()
-        
-        tranches_age = {'0-18': 0, '19-35': 0, '36-55': 0, '56-70': 0, '70+': 0}
-        for (date_naissance,) in patients_ages:
-            if date_naissance:
-                age = (date.today() - date_naissance).days // 365
-                if age <= 18:
-                    tranches_age['0-18'] += 1
-                elif age <= 35:
-                    tranches_age['19-35'] += 1
-                elif age <= 55:
-                    tranches_age['36-55'] += 1
-                elif age <= 70:
-                    tranches_age['56-70'] += 1
-                else:
-                    tranches_age['70+'] += 1
+        # Répartition par âge (âge exact, lu dans la table : non cumulable jour par jour)
+        tranches_age = ServiceStatistiques.tranches_age()
         
         # Patients par prescripteur
-        patients_par_prescripteur = db.session.query(
-            Patient.prescripteur_nom,
-            func.count(Patient.id).label('nombre')
-        ).filter(
-            Patient.prescripteur_nom.isnot(None),
-            Patient.prescripteur_nom != ''
-        ).group_by(Patient.prescripteur_nom).order_by(
-            func.count(Patient.id).desc()
-        ).limit(5).all()
+        patients_par_prescripteur = sorted(
+            ((prescripteur_id, nombre) for prescripteur_id, nombre
+             in ServiceStatistiques.compter('patient.prescripteur_id').items() if prescripteur_id),
+            key=lambda element: element[1],
+            reverse=True
+        )[:5]
+        prescripteurs = {
+            str(p.id): p for p in Prescripteur.query.filter(
+                Prescripteur.id.in_([int(prescripteur_id) for prescripteur_id, _ in patients_par_prescripteur])
+            ).all()
+        } if patients_par_prescripteur else {}
         
         prescripteurs_data = []
-        for prescripteur, nombre in patients_par_prescripteur:
-            prescripteurs_data.append({'prescripteur': prescripteur, 'nombre': nombre})
+        for prescripteur_id, nombre in patients_par_prescripteur:
+            prescripteur = prescripteurs.get(prescripteur_id)
+            if prescripteur:
+                prescripteurs_data.append({
+                    'prescripteur': f"{prescripteur.prenom} {prescripteur.nom}".strip(),
+                    'nombre': nombre
+                })
         
         return jsonify({
             'success': True,
@@ -657,4 +648,47 @@ def statistiques_general():
             'error': str(e),
             'message': 'Erreur lors de la récupération des statistiques générales'
         }), 500
-        
\ No newline at end of file
+        
+@debug_bp.route('/cache-identites', methods=['GET'])
+@jwt_required()
+@admin_requis
+def statistiques_cache_identites():
+    """Compteurs du cache des identités utilisé par admin_requis / technicien_requis"""
+    return jsonify({
+        'success': True,
+        'data': cache_identites.statistiques(),
+        'message': 'Statistiques du cache des identités'
+    }), 200
+
+@debug_bp.route('/slow-queries', methods=['GET'])
+@jwt_required()
+@admin_requis
+def lister_requetes_lentes():
+    """Instructions SQL plus lentes que REQUETES_LENTES_SEUIL_MS, avec leur plan d'exécution"""
+    limite = request.args.get('limite', type=int)
+    tri = request.args.get('tri', 'date', type=str)
+    if tri not in ('date', 'duree'):
+        return jsonify({
+            'success': False,
+            'message': "Tri invalide (date ou duree)"
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            **journal_requetes_lentes.statistiques(),
+            'requetes': journal_requetes_lentes.lister(limite, tri)
+        },
+        'message': 'Requêtes lentes récupérées avec succès'
+    }), 200
+
+@debug_bp.route('/slow-queries', methods=['DELETE'])
+@jwt_required()
+@admin_requis
+def vider_requetes_lentes():
+    """Vide le journal des requêtes lentes"""
+    journal_requetes_lentes.vider()
+    return jsonify({
+        'success': True,
+        'message': 'Journal des requêtes lentes vidé'
+    }), 200
@@ -4,9 +4,32 @@ from modeles.dispositif_medical import DispositifMedical
 from modeles.patient import Patient
 from datetime import datetime, date
 from sqlalchemy import or_, func
+from sqlalchemy.orm import contains_eager, joinedload
+from services.service_statistiques import ServiceStatistiques
+from depots.depot_recherche import DepotRecherche
+from utils.etag import avec_etag, calculer_etag, empreinte_ensemble, est_inchangee, reponse_inchangee
 
 dispositifs_bp = Blueprint('dispositifs', __name__)
 
+def _donnees_patient(patient, details=False):
+    """Projection du patient incluse dans les réponses des dispositifs"""
+    donnees = {
+        'id': patient.id,
+        'code_patient': patient.code_patient,
+        'nom': patient.nom,
+        'prenom': patient.prenom
+    }
+    if details:
+        donnees['telephone'] = patient.telephone
+        donnees['email'] = patient.email
+    return donnees
+
+def _obtenir_dispositif_avec_patient(dispositif_id):
+    """Charger un dispositif et son patient en une seule requête (LEFT OUTER JOIN)"""
+    return DispositifMedical.query.options(
+        joinedload(DispositifMedical.patient)
+    ).filter(DispositifMedical.id == dispositif_id).first()
+
 @dispositifs_bp.route('', methods=['GET'])
 def lister_dispositifs():
     """Récupérer tous les dispositifs médicaux avec pagination et recherche"""
@@ -30,17 +53,21 @@ def lister_dispositifs():
         
         # Recherche textuelle
         if recherche:
-            query = query.filter(
-                or_(
-                    DispositifMedical.designation.ilike(f'%{recherche}%'),
-                    DispositifMedical.reference.ilike(f'%{recherche}%'),
-                    DispositifMedical.numero_serie.ilike(f'%{recherche}%')
-                )
-            )
-        
-        # Jointure avec Patient pour inclure les informations patient
+            ids = DepotRecherche.ids_correspondants('dispositif', recherche)
+            query = query.filter(DispositifMedical.id.in_(ids))
+        
         query = query.join(Patient, DispositifMedical.patient_id == Patient.id, isouter=True)
         
+        # ETag : nombre et dernière modification des dispositifs filtrés et de leurs patients
+        etag = calculer_etag(*empreinte_ensemble(
+            query, DispositifMedical.id, DispositifMedical.date_modification, Patient.date_modification
+        ))
+        if est_inchangee(etag):
+            return reponse_inchangee(etag)
+        
+        # Jointure avec Patient : les colonnes du patient sont chargées dans la même requête
+        query = query.options(contains_eager(DispositifMedical.patient))
+        
         # Pagination
         dispositifs_pagines = query.paginate(
             page=page, 
@@ -53,18 +80,11 @@ def lister_dispositifs():
         for dispositif in dispositifs_pagines.items:
             data = dispositif.to_dict()
             # Ajouter les informations du patient
-            if dispositif.patient_id:
-                patient = Patient.query.get(dispositif.patient_id)
-                if patient:
-                    data['patient'] = {
-                        'id': patient.id,
-                        'code_patient': patient.code_patient,
-                        'nom': patient.nom,
-                        'prenom': patient.prenom
-                    }
+            if dispositif.patient:
+                data['patient'] = _donnees_patient(dispositif.patient)
             dispositifs_data.append(data)
         
-        return jsonify({
+        return avec_etag((jsonify({
             'success': True,
             'data': {
                 'items': dispositifs_data,
@@ -74,7 +94,7 @@ def lister_dispositifs():
                 'elements_par_page': dispositifs_pagines.per_page
             },
             'message': f'{len(dispositifs_data)} dispositifs trouvés'
-        }), 200
+        }), 200), etag)
         
     except Exception as e:
         print(f"Erreur lister_dispositifs: {str(e)}")
@@ -169,16 +189,10 @@ def creer_dispositif():
         db.session.commit()
         
         # Récupérer le dispositif créé avec les relations
+        nouveau_dispositif = _obtenir_dispositif_avec_patient(nouveau_dispositif.id)
         dispositif_data = nouveau_dispositif.to_dict()
-        if patient_id:
-            patient = Patient.query.get(patient_id)
-            if patient:
-                dispositif_data['patient'] = {
-                    'id': patient.id,
-                    'code_patient': patient.code_patient,
-                    'nom': patient.nom,
-                    'prenom': patient.prenom
-                }
+        if nouveau_dispositif.patient:
+            dispositif_data['patient'] = _donnees_patient(nouveau_dispositif.patient)
         
         return jsonify({
             'success': True,
@@ -199,7 +213,17 @@ def creer_dispositif():
 def obtenir_dispositif(dispositif_id):
     """Récupérer un dispositif spécifique"""
     try:
-        dispositif = DispositifMedical.query.get(dispositif_id)
+        # Avec If-None-Match, seules les dates de modification sont lues tant que rien n'a changé
+        if request.if_none_match:
+            dates = db.session.query(DispositifMedical.date_modification, Patient.date_modification).outerjoin(
+                Patient, DispositifMedical.patient_id == Patient.id
+            ).filter(DispositifMedical.id == dispositif_id).first()
+            if dates is not None:
+                etag = calculer_etag(*dates)
+                if est_inchangee(etag):
+                    return reponse_inchangee(etag)
+        
+        dispositif = _obtenir_dispositif_avec_patient(dispositif_id)
         if not dispositif:
             return jsonify({
                 'success': False,
@@ -209,23 +233,18 @@ def obtenir_dispositif(dispositif_id):
         dispositif_data = dispositif.to_dict()
         
         # Ajouter les informations du patient
-        if dispositif.patient_id:
-            patient = Patient.query.get(dispositif.patient_id)
-            if patient:
-                dispositif_data['patient'] = {
-                    'id': patient.id,
-                    'code_patient': patient.code_patient,
-                    'nom': patient.nom,
-                    'prenom': patient.prenom,
-                    'telephone': patient.telephone,
-                    'email': patient.email
-                }
+        if dispositif.patient:
+            dispositif_data['patient'] = _donnees_patient(dispositif.patient, details=True)
         
-        return jsonify({
+        etag = calculer_etag(
+            dispositif.date_modification,
+            dispositif.patient.date_modification if dispositif.patient else None
+        )
+        return avec_etag((jsonify({
             'success': True,
             'data': dispositif_data,
             'message': 'Dispositif récupéré avec succès'
-        }), 200
+        }), 200), etag)
         
     except Exception as e:
         print(f"Erreur obtenir_dispositif: {str(e)}")
@@ -308,17 +327,11 @@ def modifier_dispositif(dispositif_id):
         
         db.session.commit()
         
-        # Retourner le dispositif mis à jour
+        # Retourner le dispositif mis à jour (rechargé avec son patient en une requête)
+        dispositif = _obtenir_dispositif_avec_patient(dispositif_id)
         dispositif_data = dispositif.to_dict()
-        if dispositif.patient_id:
-            patient = Patient.query.get(dispositif.patient_id)
-            if patient:
-                dispositif_data['patient'] = {
-                    'id': patient.id,
-                    'code_patient': patient.code_patient,
-                    'nom': patient.nom,
-                    'prenom': patient.prenom
-                }
+        if dispositif.patient:
+            dispositif_data['patient'] = _donnees_patient(dispositif.patient)
         
         return jsonify({
             'success': True,
@@ -394,12 +407,14 @@ def associer_patient(dispositif_id):
                 'message': 'Patient non trouvé'
             }), 404
         
+        # Construire le message avant le commit, qui expire le patient (évite un rechargement)
+        message = f'Dispositif associé au patient {patient.prenom} {patient.nom}'
         dispositif.patient_id = patient_id
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': f'Dispositif associé au patient {patient.prenom} {patient.nom}'
+            'message': message
         }), 200
         
     except Exception as e:
@@ -450,39 +465,23 @@ def dissocier_patient(dispositif_id):
 def statistiques_dispositifs():
     """Obtenir les statistiques des dispositifs médicaux"""
     try:
-        # Total des dispositifs
-        total_dispositifs = DispositifMedical.query.count()
-        
-        # Répartition par statut
-        statuts = db.session.query(
-            DispositifMedical.statut,
-            func.count(DispositifMedical.id).label('count')
-        ).group_by(DispositifMedical.statut).all()
+        # Lecture dans le cumul journalier (stats_journalieres) plutôt que dans la table
+        total_dispositifs = ServiceStatistiques.total('dispositif')
+        repartition_statuts = ServiceStatistiques.compter('dispositif.statut')
+        repartition_types = ServiceStatistiques.compter('dispositif.type_acquisition')
         
-        repartition_statuts = {statut: count for statut, count in statuts}
-        
-        # Répartition par type d'acquisition
-        types_acquisition = db.session.query(
-            DispositifMedical.type_acquisition,
-            func.count(DispositifMedical.id).label('count')
-        ).group_by(DispositifMedical.type_acquisition).all()
-        
-        repartition_types = {type_acq: count for type_acq, count in types_acquisition}
-        
-        # Dispositifs sous garantie
-        dispositifs_sous_garantie = DispositifMedical.query.filter(
+        # Dispositifs sous garantie : valeurs presque uniques, hors cumul (index sur date_fin_garantie)
+        dispositifs_sous_garantie = db.session.query(func.count(DispositifMedical.id)).filter(
             DispositifMedical.date_fin_garantie >= date.today()
-        ).count()
+        ).scalar()
         
-        # Top 5 des désignations les plus utilisées
-        top_designations = db.session.query(
-            DispositifMedical.designation,
-            func.count(DispositifMedical.id).label('count')
-        ).group_by(DispositifMedical.designation).order_by(
-            func.count(DispositifMedical.id).desc()
-        ).limit(5).all()
+        # Top 5 des désignations les plus utilisées (GROUP BY sur l'index de designation)
+        nombre = func.count(DispositifMedical.id)
+        top_designations = db.session.query(DispositifMedical.designation, nombre).filter(
+            DispositifMedical.designation.isnot(None)
+        ).group_by(DispositifMedical.designation).order_by(nombre.desc()).limit(5).all()
         
-        # Dispositifs par patient (moyenne)
+        # Dispositifs par patient (moyenne) : COUNT(DISTINCT) non cumulable jour par jour
         nb_patients_avec_dispositifs = db.session.query(
             func.count(func.distinct(DispositifMedical.patient_id))
         ).scalar()
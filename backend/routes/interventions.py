@@ -1,22 +1,255 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
-from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt
+from flask import Blueprint, request, jsonify, current_app, send_file, Response, stream_with_context
+from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt, verify_jwt_in_request
 from extensions.base_donnees import db
+from extensions.journalisation import ECHANTILLON
 from modeles.intervention import Intervention
 from modeles.patient import Patient
 from modeles.dispositif_medical import DispositifMedical
 from modeles.utilisateur import Utilisateur
-from sqlalchemy import or_
+from modeles.reglage import Reglage
+from modeles.piece_jointe import PieceJointe
+from sqlalchemy import func, or_
 import logging
 import traceback
 from datetime import datetime, timedelta
+from collections import deque
+from utils.pagination import paginer_par_curseur
+from utils.etag import avec_etag, calculer_etag, empreinte_ensemble, est_inchangee, reponse_inchangee
+from depots.intervention_depot import InterventionDepot
+from depots.depot_recherche import DepotRecherche
+from services.service_notifications import ServiceNotifications
+from services.intervention_service import InterventionService
+import csv
+import io
 import json
+import time
 
 interventions_bp = Blueprint('interventions', __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Champs de la représentation complète (to_dict) et relations projetées
+CHAMPS_INTERVENTION = (
+    'id', 'patient_id', 'dispositif_id', 'technicien_id', 'traitement', 'type_intervention',
+    'date_planifiee', 'date_reelle', 'lieu', 'etat_materiel', 'type_concentrateur', 'mode_ventilation',
+    'type_masque', 'statut', 'actions_effectuees', 'accessoires_utilises', 'photos', 'signature_technicien',
+    'rapport_pdf_url', 'remarques', 'motif_annulation', 'date_reprogrammation', 'date_creation',
+    'date_modification', 'parametres', 'reglage', 'verification_securite', 'tests_effectues',
+    'consommables_utilises', 'maintenance_preventive', 'date_prochaine_maintenance',
+    'patient', 'dispositif', 'technicien'
+)
+
+# Relation (clé étrangère <relation>_id) -> (modèle lié, colonnes de la projection)
+RELATIONS_INTERVENTION = {
+    'patient': (Patient, ('id', 'code_patient', 'nom', 'prenom', 'telephone', 'email')),
+    'dispositif': (DispositifMedical, ('id', 'designation', 'reference', 'numero_serie')),
+    'technicien': (Utilisateur, ('id', 'nom', 'prenom', 'email')),
+    'reglage': (Reglage, ('id', 'pmax', 'pmin', 'pramp', 'hu', 're', 'commentaire')),
+}
+
+# ?vue=liste : colonnes des tableaux, sans signature, photos, paramètres ni détails JSON
+CHAMPS_LISTE = (
+    'id', 'patient_id', 'dispositif_id', 'technicien_id', 'traitement', 'type_intervention',
+    'date_planifiee', 'date_reelle', 'lieu', 'statut', 'etat_materiel', 'rapport_pdf_url',
+    'date_creation', 'date_modification', 'patient', 'dispositif', 'technicien'
+)
+
+def _lire_champs():
+    """Champs demandés par ?fields= ou ?vue= (None : représentation complète).
+    Lève ValueError si un champ ou la vue est inconnu."""
+    fields = request.args.get('fields', '', type=str).strip()
+    vue = request.args.get('vue', 'complet', type=str).strip()
+    if fields:
+        champs = [champ.strip() for champ in fields.split(',') if champ.strip()]
+        inconnus = [champ for champ in champs if champ not in CHAMPS_INTERVENTION]
+        if inconnus:
+            raise ValueError(f"Champs inconnus: {', '.join(inconnus)}")
+        return ['id'] + [champ for champ in dict.fromkeys(champs) if champ != 'id']
+    if vue == 'liste':
+        return list(CHAMPS_LISTE)
+    if vue == 'complet':
+        return None
+    raise ValueError(f"Vue inconnue: {vue} (liste ou complet)")
+
+def _options_chargement(champs):
+    """Options de la requête : toutes les relations en jointure pour la représentation complète,
+    sinon seulement les colonnes et relations demandées (load_only)"""
+    if champs is None:
+        return [
+            db.joinedload(Intervention.patient),
+            db.joinedload(Intervention.dispositif),
+            db.joinedload(Intervention.technicien),
+            db.joinedload(Intervention.reglage)
+        ]
+    # id, date_planifiee : curseur de pagination ; technicien_id : contrôle d'accès
+    colonnes = {'id', 'date_planifiee', 'technicien_id'} | {
+        champ for champ in champs if champ not in RELATIONS_INTERVENTION
+    }
+    attributs = [getattr(Intervention, colonne) for colonne in sorted(colonnes)]
+    options = []
+    for nom, (modele, colonnes_liees) in RELATIONS_INTERVENTION.items():
+        if nom in champs:
+            attributs.append(getattr(Intervention, f'{nom}_id'))
+            options.append(db.joinedload(getattr(Intervention, nom)).load_only(
+                *[getattr(modele, colonne) for colonne in colonnes_liees]
+            ))
+    return [db.load_only(*attributs)] + options
+
+def _versions_intervention(intervention_id, champs):
+    """(technicien_id, morceaux de l'ETag) d'une intervention sans la charger, ou None si elle n'existe pas.
+    Les morceaux : dates de modification de l'intervention et des relations affichées,
+    nombre et dernier id des pièces jointes (représentation complète), champs demandés."""
+    relations = list(RELATIONS_INTERVENTION) if champs is None else [
+        nom for nom in RELATIONS_INTERVENTION if nom in champs
+    ]
+    colonnes = [Intervention.technicien_id, Intervention.date_modification]
+    colonnes += [RELATIONS_INTERVENTION[nom][0].date_modification for nom in relations]
+    if champs is None:
+        pieces = db.session.query(
+            func.count(PieceJointe.id), func.max(PieceJointe.id)
+        ).filter(PieceJointe.intervention_id == intervention_id).one()
+    query = db.session.query(*colonnes).select_from(Intervention)
+    for nom in relations:
+        modele = RELATIONS_INTERVENTION[nom][0]
+        query = query.outerjoin(modele, getattr(Intervention, f'{nom}_id') == modele.id)
+    ligne = query.filter(Intervention.id == intervention_id).first()
+    if ligne is None:
+        return None
+    morceaux = list(ligne[1:]) + (list(pieces) if champs is None else []) + [champs]
+    return ligne[0], morceaux
+
+def _serialiser_interventions(interventions, champs=None):
+    """Sérialise une liste d'interventions avec leurs relations chargées
+    (seulement les champs demandés si champs n'est pas None)"""
+    relations = set(RELATIONS_INTERVENTION) if champs is None else set(champs) & set(RELATIONS_INTERVENTION)
+    colonnes = None if champs is None else [champ for champ in champs if champ not in RELATIONS_INTERVENTION]
+    interventions_data = []
+    for intervention in interventions:
+        try:
+            data = intervention.to_dict(colonnes)
+            
+            # Handle patient data
+            if 'patient' in relations and intervention.patient:
+                try:
+                    data['patient'] = {
+                        'id': intervention.patient.id,
+                        'code_patient': intervention.patient.code_patient,
+                        'nom': intervention.patient.nom,
+                        'prenom': intervention.patient.prenom,
+                        'telephone': intervention.patient.telephone,
+                        'email': intervention.patient.email,
+                    }
+                    logger.debug("Patient data added for intervention %s", intervention.id, extra=ECHANTILLON)
+                except Exception as patient_error:
+                    logger.error(f"Error processing patient data for intervention {intervention.id}: {str(patient_error)}\n{traceback.format_exc()}")
+                    data['patient'] = None
+
+            # Handle device data
+            if 'dispositif' in relations and intervention.dispositif:
+                try:
+                    data['dispositif'] = {
+                        'id': intervention.dispositif.id,
+                        'designation': intervention.dispositif.designation,
+                        'reference': intervention.dispositif.reference,
+                        'numero_serie': intervention.dispositif.numero_serie,
+                    }
+                    logger.debug("Device data added for intervention %s", intervention.id, extra=ECHANTILLON)
+                except Exception as device_error:
+                    logger.error(f"Error processing device data for intervention {intervention.id}: {str(device_error)}\n{traceback.format_exc()}")
+                    data['dispositif'] = None
+
+            # Handle technician data
+            if 'technicien' in relations and intervention.technicien:
+                try:
+                    data['technicien'] = {
+                        'id': intervention.technicien.id,
+                        'nom': intervention.technicien.nom,
+                        'prenom': intervention.technicien.prenom,
+                        'email': intervention.technicien.email,
+                    }
+                    logger.debug("Technician data added for intervention %s", intervention.id, extra=ECHANTILLON)
+                except Exception as tech_error:
+                    logger.error(f"Error processing technician data for intervention {intervention.id}: {str(tech_error)}\n{traceback.format_exc()}")
+                    data['technicien'] = None
+
+            # Handle reglage data
+            if 'reglage' in relations and intervention.reglage:
+                try:
+                    data['reglage'] = {
+                        'id': intervention.reglage.id,
+                        'pmax': intervention.reglage.pmax,
+                        'pmin': intervention.reglage.pmin,
+                        'pramp': intervention.reglage.pramp,
+                        'hu': intervention.reglage.hu,
+                        're': intervention.reglage.re,
+                        'commentaire': intervention.reglage.commentaire
+                    }
+                    logger.debug("Reglage data added for intervention %s", intervention.id, extra=ECHANTILLON)
+                except Exception as reglage_error:
+                    logger.error(f"Error processing reglage data for intervention {intervention.id}: {str(reglage_error)}\n{traceback.format_exc()}")
+                    data['reglage'] = None
+
+            interventions_data.append(data)
+            logger.debug("Successfully processed intervention %s", intervention.id, extra=ECHANTILLON)
+        except Exception as e:
+            logger.error(f"Error serializing intervention {intervention.id}: {str(e)}\n{traceback.format_exc()}")
+            continue
+    return interventions_data
+
+def _filtrer_interventions(query, user_id, user_role):
+    """Applique les filtres communs à la liste et à l'export (paramètres de la requête).
+    Lève ValueError si une date de filtre est invalide."""
+    recherche = request.args.get('recherche', '', type=str).strip()
+    technicien_id = request.args.get('technicien_id', type=int)
+    statut = request.args.get('statut', type=str)
+    type_intervention = request.args.get('type', type=str)
+    date_debut = request.args.get('date_debut', type=str)
+    date_fin = request.args.get('date_fin', type=str)
+
+    logger.debug("Query parameters: recherche=%s, technicien_id=%s, statut=%s, type=%s", recherche, technicien_id, statut, type_intervention)
+
+    # Restrict technicians to their own interventions
+    if user_role == 'technicien':
+        query = query.filter(Intervention.technicien_id == user_id)
+        logger.info(f"Filtering interventions for technician {user_id}")
+
+    # Admin can filter by technicien_id
+    if technicien_id and user_role == 'admin':
+        query = query.filter(Intervention.technicien_id == technicien_id)
+        logger.info(f"Admin filtering by technician {technicien_id}")
+
+    # Filter by status
+    if statut:
+        query = query.filter(Intervention.statut == statut)
+
+    # Filter by intervention type
+    if type_intervention:
+        query = query.filter(Intervention.type_intervention == type_intervention)
+
+    # Filter by planned date (date_fin seule : jusqu'à la fin de ce jour)
+    if date_debut:
+        query = query.filter(Intervention.date_planifiee >= datetime.fromisoformat(date_debut))
+    if date_fin:
+        fin = datetime.fromisoformat(date_fin)
+        if len(date_fin) == 10:
+            query = query.filter(Intervention.date_planifiee < fin + timedelta(days=1))
+        else:
+            query = query.filter(Intervention.date_planifiee <= fin)
+
+    # Text search (index de recherche : patient, dispositif ou technicien)
+    if recherche:
+        query = query.filter(or_(*[
+            colonne.in_(DepotRecherche.ids_correspondants(entite, recherche))
+            for entite, colonne in (
+                ('patient', Intervention.patient_id),
+                ('dispositif', Intervention.dispositif_id),
+                ('utilisateur', Intervention.technicien_id),
+            )
+        ]))
+        logger.info(f"Search query applied: {recherche}")
+
+    return query
+
 @interventions_bp.route('', methods=['GET'])
 @jwt_required()
 def lister_interventions():
@@ -57,68 +290,80 @@ def lister_interventions():
                 'error': str(e)
             }), 422
 
-        recherche = request.args.get('recherche', '', type=str).strip()
-        technicien_id = request.args.get('technicien_id', type=int)
-        statut = request.args.get('statut', type=str)
-        type_intervention = request.args.get('type', type=str)
-
-        logger.debug(f"Query parameters: recherche={recherche}, technicien_id={technicien_id}, statut={statut}, type={type_intervention}")
-
-        # Build query with eager loading
-        query = Intervention.query.options(
-            db.joinedload(Intervention.patient),
-            db.joinedload(Intervention.dispositif),
-            db.joinedload(Intervention.technicien),
-            db.joinedload(Intervention.reglage)
-        )
-
-        # Restrict technicians to their own interventions
-        if user_role == 'technicien':
-            query = query.filter(Intervention.technicien_id == user_id)
-            logger.info(f"Filtering interventions for technician {user_id}")
-        elif user_role != 'admin':
+        if user_role not in ('technicien', 'admin'):
             logger.error(f"Unauthorized role: {user_role}")
             return jsonify({
                 'success': False,
                 'message': 'Rôle non autorisé'
             }), 403
 
-        # Admin can filter by technicien_id
-        if technicien_id and user_role == 'admin':
-            query = query.filter(Intervention.technicien_id == technicien_id)
-            logger.info(f"Admin filtering by technician {technicien_id}")
+        try:
+            champs = _lire_champs()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Champs demandés invalides',
+                'error': str(e)
+            }), 422
+
+        try:
+            query = _filtrer_interventions(Intervention.query, user_id, user_role)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Paramètres de filtre invalides',
+                'error': str(e)
+            }), 422
 
-        # Filter by status
-        if statut:
-            query = query.filter(Intervention.statut == statut)
+        # ETag : nombre et dernière modification des interventions filtrées et des lignes liées affichées,
+        # vérifié avant la requête paginée et la sérialisation
+        etag = calculer_etag(*empreinte_ensemble(
+            query.outerjoin(Intervention.patient)
+                 .outerjoin(Intervention.dispositif)
+                 .outerjoin(Intervention.technicien)
+                 .outerjoin(Intervention.reglage),
+            Intervention.id,
+            Intervention.date_modification,
+            Patient.date_modification,
+            DispositifMedical.date_modification,
+            Utilisateur.date_modification,
+            Reglage.date_modification
+        ))
+        if est_inchangee(etag):
+            return reponse_inchangee(etag)
 
-        # Filter by intervention type
-        if type_intervention:
-            query = query.filter(Intervention.type_intervention == type_intervention)
+        # Eager loading (colonnes demandées seulement avec ?vue=liste ou ?fields=)
+        query = query.options(*_options_chargement(champs))
 
-        # Text search
-        if recherche:
+        # Pagination par curseur (opt-in) : pas de COUNT(*) ni d'OFFSET
+        if 'cursor' in request.args:
             try:
-                query = query.join(Patient, Intervention.patient_id == Patient.id, isouter=True).join(
-                    DispositifMedical, Intervention.dispositif_id == DispositifMedical.id, isouter=True
-                ).join(Utilisateur, Intervention.technicien_id == Utilisateur.id, isouter=True).filter(
-                    or_(
-                        Patient.nom.ilike(f'%{recherche}%'),
-                        Patient.prenom.ilike(f'%{recherche}%'),
-                        DispositifMedical.designation.ilike(f'%{recherche}%'),
-                        DispositifMedical.reference.ilike(f'%{recherche}%'),
-                        Utilisateur.nom.ilike(f'%{recherche}%'),
-                        Utilisateur.prenom.ilike(f'%{recherche}%'),
-                    )
+                interventions, curseur_suivant, curseur_precedent = paginer_par_curseur(
+                    query,
+                    Intervention.date_planifiee,
+                    Intervention.id,
+                    request.args.get('cursor', '', type=str).strip(),
+                    per_page
                 )
-                logger.info(f"Search query applied: {recherche}")
-            except Exception as e:
-                logger.error(f"Error in search query: {str(e)}\n{traceback.format_exc()}")
+            except ValueError as e:
+                logger.error(f"Invalid cursor: {str(e)}")
                 return jsonify({
                     'success': False,
-                    'message': 'Erreur dans la recherche',
+                    'message': 'Curseur de pagination invalide',
                     'error': str(e)
-                }), 400
+                }), 422
+
+            interventions_data = _serialiser_interventions(interventions, champs)
+            return avec_etag((jsonify({
+                'success': True,
+                'data': {
+                    'items': interventions_data,
+                    'curseur_suivant': curseur_suivant,
+                    'curseur_precedent': curseur_precedent,
+                    'elements_par_page': per_page,
+                },
+                'message': f'{len(interventions_data)} interventions trouvées',
+            }), 200), etag)
 
         # Pagination
         try:
@@ -133,77 +378,7 @@ def lister_interventions():
             }), 500
 
         # Serialize data
-        interventions_data = []
-        for intervention in interventions_paginated.items:
-            try:
-                data = intervention.to_dict()
-                
-                # Handle patient data
-                if intervention.patient:
-                    try:
-                        data['patient'] = {
-                            'id': intervention.patient.id,
-                            'code_patient': intervention.patient.code_patient,
-                            'nom': intervention.patient.nom,
-                            'prenom': intervention.patient.prenom,
-                            'telephone': intervention.patient.telephone,
-                            'email': intervention.patient.email,
-                        }
-                        logger.debug(f"Patient data added for intervention {intervention.id}")
-                    except Exception as patient_error:
-                        logger.error(f"Error processing patient data for intervention {intervention.id}: {str(patient_error)}\n{traceback.format_exc()}")
-                        data['patient'] = None
-
-                # Handle device data
-                if intervention.dispositif:
-                    try:
-                        data['dispositif'] = {
-                            'id': intervention.dispositif.id,
-                            'designation': intervention.dispositif.designation,
-                            'reference': intervention.dispositif.reference,
-                            'numero_serie': intervention.dispositif.numero_serie,
-                        }
-                        logger.debug(f"Device data added for intervention {intervention.id}")
-                    except Exception as device_error:
-                        logger.error(f"Error processing device data for intervention {intervention.id}: {str(device_error)}\n{traceback.format_exc()}")
-                        data['dispositif'] = None
-
-                # Handle technician data
-                if intervention.technicien:
-                    try:
-                        data['technicien'] = {
-                            'id': intervention.technicien.id,
-                            'nom': intervention.technicien.nom,
-                            'prenom': intervention.technicien.prenom,
-                            'email': intervention.technicien.email,
-                        }
-                        logger.debug(f"Technician data added for intervention {intervention.id}")
-                    except Exception as tech_error:
-                        logger.error(f"Error processing technician data for intervention {intervention.id}: {str(tech_error)}\n{traceback.format_exc()}")
-                        data['technicien'] = None
-
-                # Handle reglage data
-                if intervention.reglage:
-                    try:
-                        data['reglage'] = {
-                            'id': intervention.reglage.id,
-                            'pmax': intervention.reglage.pmax,
-                            'pmin': intervention.reglage.pmin,
-                            'pramp': intervention.reglage.pramp,
-                            'hu': intervention.reglage.hu,
-                            're': intervention.reglage.re,
-                            'commentaire': intervention.reglage.commentaire
-                        }
-                        logger.debug(f"Reglage data added for intervention {intervention.id}")
-                    except Exception as reglage_error:
-                        logger.error(f"Error processing reglage data for intervention {intervention.id}: {str(reglage_error)}\n{traceback.format_exc()}")
-                        data['reglage'] = None
-
-                interventions_data.append(data)
-                logger.debug(f"Successfully processed intervention {intervention.id}")
-            except Exception as e:
-                logger.error(f"Error serializing intervention {intervention.id}: {str(e)}\n{traceback.format_exc()}")
-                continue
+        interventions_data = _serialiser_interventions(interventions_paginated.items, champs)
 
         response_data = {
             'success': True,
@@ -217,7 +392,7 @@ def lister_interventions():
             'message': f'{len(interventions_data)} interventions trouvées',
         }
 
-        return jsonify(response_data), 200
+        return avec_etag((jsonify(response_data), 200), etag)
 
     except Exception as e:
         logger.error(f"Unexpected error in lister_interventions: {str(e)}\n{traceback.format_exc()}")
@@ -227,6 +402,438 @@ def lister_interventions():
             'error': str(e)
         }), 500
 
+@interventions_bp.route('/<int:intervention_id>', methods=['GET'])
+@jwt_required()
+def obtenir_intervention(intervention_id):
+    """Récupérer une intervention (représentation complète, ?vue=liste ou ?fields=)"""
+    try:
+        user_id = get_jwt_identity()
+        user_role = get_jwt().get('role')
+        if user_role not in ('technicien', 'admin'):
+            return jsonify({
+                'success': False,
+                'message': 'Rôle non autorisé'
+            }), 403
+
+        try:
+            champs = _lire_champs()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Champs demandés invalides',
+                'error': str(e)
+            }), 422
+
+        # Versions lues d'abord : avec If-None-Match, rien d'autre n'est chargé tant que rien n'a changé
+        versions = _versions_intervention(intervention_id, champs)
+        if versions is None:
+            return jsonify({
+                'success': False,
+                'message': 'Intervention non trouvée'
+            }), 404
+        technicien_id, morceaux = versions
+
+        # Un technicien ne voit que ses propres interventions
+        if user_role == 'technicien' and int(technicien_id) != int(user_id):
+            return jsonify({
+                'success': False,
+                'message': 'Vous n\'êtes pas autorisé à consulter cette intervention'
+            }), 403
+
+        etag = calculer_etag(*morceaux)
+        if est_inchangee(etag):
+            return reponse_inchangee(etag)
+
+        intervention = Intervention.query.options(*_options_chargement(champs)).filter(
+            Intervention.id == intervention_id
+        ).first()
+        if not intervention:
+            return jsonify({
+                'success': False,
+                'message': 'Intervention non trouvée'
+            }), 404
+
+        interventions_data = _serialiser_interventions([intervention], champs)
+        if not interventions_data:
+            raise ValueError(f"Sérialisation impossible de l'intervention {intervention_id}")
+        if champs is None:
+            interventions_data[0]['pieces_jointes'] = [piece.to_dict() for piece in intervention.pieces_jointes]
+
+        return avec_etag((jsonify({
+            'success': True,
+            'data': interventions_data[0],
+            'message': 'Intervention récupérée avec succès'
+        }), 200), etag)
+
+    except Exception as e:
+        logger.error(f"Error in obtenir_intervention: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la récupération de l\'intervention',
+            'error': str(e)
+        }), 500
+
+JOURS_AGENDA_MAX = 31
+
+def _ligne_agenda(ligne):
+    """Projection réduite d'une intervention pour l'agenda"""
+    return {
+        'id': ligne.id,
+        'date_planifiee': ligne.date_planifiee.isoformat() if ligne.date_planifiee else None,
+        'statut': ligne.statut,
+        'type_intervention': ligne.type_intervention,
+        'traitement': ligne.traitement,
+        'lieu': ligne.lieu,
+        'technicien_id': ligne.technicien_id,
+        'patient': {
+            'id': ligne.patient_id,
+            'code_patient': ligne.code_patient,
+            'nom': ligne.patient_nom,
+            'prenom': ligne.patient_prenom,
+            'telephone': ligne.patient_telephone,
+            'adresse': ligne.patient_adresse,
+            'ville': ligne.patient_ville
+        } if ligne.patient_id else None,
+        'dispositif': {
+            'id': ligne.dispositif_id,
+            'designation': ligne.dispositif_designation,
+            'numero_serie': ligne.dispositif_numero_serie
+        } if ligne.dispositif_id else None
+    }
+
+@interventions_bp.route('/aujourdhui', methods=['GET'])
+@jwt_required()
+def agenda_interventions():
+    """Interventions du jour (ou de ?date= sur ?jours= jours) du technicien connecté"""
+    try:
+        user_id = get_jwt_identity()
+        user_role = get_jwt().get('role')
+        if user_role not in ('technicien', 'admin'):
+            return jsonify({
+                'success': False,
+                'message': 'Rôle non autorisé'
+            }), 403
+
+        try:
+            date_param = request.args.get('date', type=str)
+            jour = datetime.strptime(date_param, '%Y-%m-%d') if date_param else datetime.combine(datetime.now().date(), datetime.min.time())
+            jours = int(request.args.get('jours', 1))
+            if jours < 1 or jours > JOURS_AGENDA_MAX:
+                raise ValueError(f"jours doit être compris entre 1 et {JOURS_AGENDA_MAX}")
+        except (ValueError, TypeError) as e:
+            return jsonify({
+                'success': False,
+                'message': 'Paramètres invalides',
+                'error': str(e)
+            }), 422
+
+        # Un technicien ne voit que son agenda ; un admin peut cibler un technicien (sinon tous)
+        if user_role == 'technicien':
+            technicien_id = int(user_id)
+        else:
+            technicien_id = request.args.get('technicien_id', type=int)
+
+        statut = request.args.get('statut', '', type=str)
+        statuts = [s.strip() for s in statut.split(',') if s.strip()] or None
+
+        fin = jour + timedelta(days=jours)
+        lignes = InterventionDepot.obtenir_agenda(jour, fin, technicien_id, statuts)
+        items = [_ligne_agenda(ligne) for ligne in lignes]
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'items': items,
+                'date_debut': jour.date().isoformat(),
+                'date_fin': (fin - timedelta(days=1)).date().isoformat(),
+                'jours': jours
+            },
+            'message': f'{len(items)} interventions planifiées'
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération de l'agenda: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la récupération de l\'agenda',
+            'error': str(e)
+        }), 500
+
+NOTIFICATIONS_LIMITE_MAX = 200
+
+def _destinataire_notifications(user_id, user_role):
+    """Technicien dont on lit le fil (None : tous, pour un admin)"""
+    if user_role == 'admin':
+        return request.args.get('technicien_id', type=int)
+    return int(user_id)
+
+@interventions_bp.route('/notifications', methods=['GET'])
+@jwt_required()
+def lister_notifications():
+    """Rattrapage des notifications postérieures à ?depuis_id= (par id croissant)"""
+    try:
+        user_id = get_jwt_identity()
+        technicien_id = _destinataire_notifications(user_id, get_jwt().get('role'))
+
+        depuis_id = request.args.get('depuis_id', 0, type=int)
+        limite = request.args.get('limite', 50, type=int)
+        if depuis_id < 0 or limite < 1 or limite > NOTIFICATIONS_LIMITE_MAX:
+            return jsonify({
+                'success': False,
+                'message': 'Paramètres invalides'
+            }), 422
+
+        items = ServiceNotifications.lister(depuis_id, technicien_id, limite)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'items': items,
+                'dernier_id': items[-1]['id'] if items else depuis_id,
+                'a_suivre': len(items) == limite
+            },
+            'message': f'{len(items)} notifications'
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des notifications: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la récupération des notifications',
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/notifications/ticket', methods=['POST'])
+@jwt_required()
+def creer_ticket_flux():
+    """Ticket à usage unique pour ouvrir le flux SSE (EventSource n'envoie pas d'en-têtes),
+    à la place du token d'accès qui finirait dans les journaux d'accès"""
+    try:
+        duree = current_app.config['NOTIFICATIONS_SSE_TICKET_DUREE']
+        ticket = ServiceNotifications.creer_ticket(int(get_jwt_identity()), get_jwt().get('role'), duree)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'ticket': ticket,
+                'expire_dans': duree
+            },
+            'message': 'Ticket de flux créé'
+        }), 201
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du ticket de flux: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la création du ticket de flux',
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/notifications/flux', methods=['GET'])
+def flux_notifications():
+    """Flux Server-Sent Events des nouvelles notifications.
+    Authentification par ?ticket= (POST /notifications/ticket) ou par l'en-tête Authorization ;
+    la reprise se fait depuis Last-Event-ID, ?depuis_id=, ou à défaut la dernière notification."""
+    if 'ticket' in request.args:
+        titulaire = ServiceNotifications.consommer_ticket(request.args.get('ticket'))
+        if titulaire is None:
+            return jsonify({
+                'success': False,
+                'message': 'Ticket de flux invalide, expiré ou déjà utilisé'
+            }), 401
+        user_id, user_role = titulaire['utilisateur_id'], titulaire['role']
+    else:
+        verify_jwt_in_request()
+        user_id, user_role = get_jwt_identity(), get_jwt().get('role')
+    technicien_id = _destinataire_notifications(user_id, user_role)
+
+    depuis = request.headers.get('Last-Event-ID') or request.args.get('depuis_id')
+    try:
+        depuis_id = int(depuis) if depuis else ServiceNotifications.dernier_id(technicien_id)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'Identifiant de reprise invalide'
+        }), 422
+    db.session.remove()
+
+    intervalle = current_app.config['NOTIFICATIONS_SSE_INTERVALLE']
+    duree_max = current_app.config['NOTIFICATIONS_SSE_DUREE_MAX']
+    relecture = current_app.config['NOTIFICATIONS_SSE_RELECTURE']
+
+    # Chaque flux garde un thread du worker : au-delà de la limite, le client réessaie plus tard
+    if not ServiceNotifications.ouvrir_flux(current_app.config['NOTIFICATIONS_SSE_FLUX_MAX']):
+        reponse = jsonify({
+            'success': False,
+            'message': 'Trop de flux ouverts, réessayez plus tard'
+        })
+        reponse.headers['Retry-After'] = str(intervalle)
+        return reponse, 503
+
+    def evenements():
+        dernier_id = depuis_id
+        # Une notification d'id inférieur peut être commitée après une d'id supérieur :
+        # on relit depuis le curseur d'il y a `relecture` secondes, sans renvoyer les ids déjà émis
+        curseurs = deque([(time.monotonic(), depuis_id)])
+        envoyes = set()
+        fin = time.monotonic() + duree_max
+        generation = ServiceNotifications.generation()
+        # Le client se reconnecte seul (avec Last-Event-ID) à la fin du flux
+        yield f"retry: {int(intervalle * 1000)}\n\n"
+        while time.monotonic() < fin:
+            maintenant = time.monotonic()
+            while len(curseurs) > 1 and curseurs[1][0] <= maintenant - relecture:
+                curseurs.popleft()
+            plancher = curseurs[0][1]
+            envoyes = {i for i in envoyes if i > plancher}
+            try:
+                items = ServiceNotifications.lister(plancher, technicien_id, NOTIFICATIONS_LIMITE_MAX + len(envoyes))
+            finally:
+                # Ne pas garder de connexion du pool pendant l'attente
+                db.session.remove()
+            nouveaux = [item for item in items if item['id'] not in envoyes]
+            for item in nouveaux:
+                envoyes.add(item['id'])
+                dernier_id = max(dernier_id, item['id'])
+                yield f"id: {dernier_id}\nevent: notification\ndata: {json.dumps(item, ensure_ascii=False)}\n\n"
+            if dernier_id != curseurs[-1][1]:
+                curseurs.append((maintenant, dernier_id))
+            if len(nouveaux) >= NOTIFICATIONS_LIMITE_MAX:
+                continue
+            generation, signale = ServiceNotifications.attendre(generation, intervalle)
+            if not signale:
+                yield ": ping\n\n"
+
+    reponse = Response(
+        stream_with_context(evenements()),
+        content_type='text/event-stream; charset=utf-8',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Appelé par le serveur à la fermeture, même si le flux n'a jamais été lu
+    reponse.call_on_close(ServiceNotifications.fermer_flux)
+    return reponse
+
+# Colonnes exportées : (nom dans le fichier, colonne SQL)
+COLONNES_EXPORT = [
+    ('id', Intervention.id),
+    ('date_planifiee', Intervention.date_planifiee),
+    ('date_reelle', Intervention.date_reelle),
+    ('statut', Intervention.statut),
+    ('type_intervention', Intervention.type_intervention),
+    ('traitement', Intervention.traitement),
+    ('lieu', Intervention.lieu),
+    ('patient_id', Intervention.patient_id),
+    ('patient_code', Patient.code_patient),
+    ('patient_nom', Patient.nom),
+    ('patient_prenom', Patient.prenom),
+    ('dispositif_id', Intervention.dispositif_id),
+    ('dispositif_designation', DispositifMedical.designation),
+    ('dispositif_numero_serie', DispositifMedical.numero_serie),
+    ('technicien_id', Intervention.technicien_id),
+    ('technicien_nom', Utilisateur.nom),
+    ('technicien_prenom', Utilisateur.prenom),
+    ('remarques', Intervention.remarques),
+    ('motif_annulation', Intervention.motif_annulation),
+]
+
+# Lignes lues par aller-retour avec le curseur serveur, et lignes par morceau envoyé
+TAILLE_LOT_EXPORT = 1000
+
+def _valeur_export(valeur):
+    if isinstance(valeur, datetime):
+        return valeur.isoformat()
+    return valeur
+
+def _lignes_csv(lignes):
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    # BOM pour qu'Excel détecte l'UTF-8
+    tampon.write('\ufeff')
+    ecrivain.writerow([nom for nom, _ in COLONNES_EXPORT])
+    for numero, ligne in enumerate(lignes, start=1):
+        ecrivain.writerow(['' if valeur is None else _valeur_export(valeur) for valeur in ligne])
+        if numero % TAILLE_LOT_EXPORT == 0:
+            yield tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate()
+    yield tampon.getvalue()
+
+def _lignes_ndjson(lignes):
+    noms = [nom for nom, _ in COLONNES_EXPORT]
+    morceau = []
+    for ligne in lignes:
+        morceau.append(json.dumps(
+            {nom: _valeur_export(valeur) for nom, valeur in zip(noms, ligne)},
+            ensure_ascii=False
+        ))
+        if len(morceau) >= TAILLE_LOT_EXPORT:
+            yield '\n'.join(morceau) + '\n'
+            morceau = []
+    if morceau:
+        yield '\n'.join(morceau) + '\n'
+
+@interventions_bp.route('/export', methods=['GET'])
+@jwt_required()
+def exporter_interventions():
+    """Exporter les interventions filtrées en CSV ou NDJSON, en flux"""
+    try:
+        user_id = get_jwt_identity()
+        user_role = get_jwt().get('role')
+        if user_role not in ('technicien', 'admin'):
+            return jsonify({
+                'success': False,
+                'message': 'Rôle non autorisé'
+            }), 403
+
+        format_export = request.args.get('format', 'csv', type=str).lower()
+        if format_export not in ('csv', 'ndjson'):
+            return jsonify({
+                'success': False,
+                'message': 'Format invalide, utilisez csv ou ndjson'
+            }), 422
+
+        # Projection de colonnes : pas d'objets ORM ni de to_dict() par ligne
+        query = db.session.query(*[colonne for _, colonne in COLONNES_EXPORT]).select_from(Intervention).outerjoin(
+            Patient, Intervention.patient_id == Patient.id
+        ).outerjoin(
+            DispositifMedical, Intervention.dispositif_id == DispositifMedical.id
+        ).outerjoin(
+            Utilisateur, Intervention.technicien_id == Utilisateur.id
+        )
+
+        try:
+            query = _filtrer_interventions(query, user_id, user_role)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Paramètres de filtre invalides',
+                'error': str(e)
+            }), 422
+
+        # yield_per active le curseur côté serveur (stream_results) : mémoire constante
+        query = query.order_by(Intervention.date_planifiee.desc(), Intervention.id.desc()).yield_per(TAILLE_LOT_EXPORT)
+
+        nom_fichier = f"interventions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_export}"
+        if format_export == 'csv':
+            contenu, type_mime = _lignes_csv(query), 'text/csv; charset=utf-8'
+        else:
+            contenu, type_mime = _lignes_ndjson(query), 'application/x-ndjson; charset=utf-8'
+
+        logger.info(f"Export {format_export} des interventions pour l'utilisateur {user_id}")
+        return Response(
+            stream_with_context(contenu),
+            content_type=type_mime,
+            headers={'Content-Disposition': f'attachment; filename={nom_fichier}'}
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in exporter_interventions: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': "Erreur lors de l'export des interventions",
+            'error': str(e)
+        }), 500
+
 @interventions_bp.route('', methods=['POST'])
 @jwt_required()
 def creer_intervention():
@@ -316,6 +923,57 @@ def creer_intervention():
             'error': str(e)
         }), 500
 
+@interventions_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def appliquer_lot_interventions():
+    """Appliquer en une transaction des mises à jour saisies hors ligne (résultat par élément)"""
+    try:
+        user_id = get_jwt_identity()
+        user_role = get_jwt().get('role')
+        if user_role not in ('technicien', 'admin'):
+            return jsonify({
+                'success': False,
+                'message': 'Rôle non autorisé'
+            }), 403
+
+        data = request.get_json(silent=True)
+        elements = data.get('interventions') if isinstance(data, dict) else data
+        if not isinstance(elements, list) or not elements:
+            return jsonify({
+                'success': False,
+                'message': 'Une liste non vide d\'interventions est requise'
+            }), 400
+
+        taille_max = current_app.config['INTERVENTIONS_LOT_MAX']
+        if len(elements) > taille_max:
+            return jsonify({
+                'success': False,
+                'message': f'Au plus {taille_max} interventions par lot'
+            }), 413
+
+        resultats = InterventionService.appliquer_lot(elements, int(user_id), user_role)
+
+        compteurs = {}
+        for resultat in resultats:
+            compteurs[resultat['resultat']] = compteurs.get(resultat['resultat'], 0) + 1
+        return jsonify({
+            'success': True,
+            'data': {
+                'resultats': resultats,
+                'compteurs': compteurs
+            },
+            'message': f"{compteurs.get('applique', 0)} interventions sur {len(resultats)} mises à jour"
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de l'application du lot d'interventions: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de l\'application du lot d\'interventions',
+            'error': str(e)
+        }), 500
+
 @interventions_bp.route('/<int:intervention_id>', methods=['PUT'])
 @jwt_required()
 def modifier_intervention(intervention_id):
@@ -582,7 +1240,7 @@ def mettre_a_jour_reglages(intervention_id):
 @interventions_bp.route('/statistiques/technicien', methods=['GET'])
 @jwt_required()
 def statistiques_technicien():
-    """Récupérer les statistiques des interventions pour un technicien"""
+    """Récupérer les statistiques des interventions pour un technicien (ou tous, pour un admin)"""
     try:
         # Récupérer l'ID du technicien depuis le token
         technicien_id = get_jwt_identity()
@@ -592,41 +1250,68 @@ def statistiques_technicien():
                 'message': 'Token invalide ou expiré'
             }), 401
 
-        # Récupérer toutes les interventions du technicien
-        interventions = Intervention.query.filter_by(technicien_id=technicien_id).all()
-        
-        # Calculer les statistiques
-        total = len(interventions)
-        en_cours = sum(1 for i in interventions if i.statut == 'en_cours')
-        terminees = sum(1 for i in interventions if i.statut == 'terminee')
-        en_retard = sum(1 for i in interventions if i.statut == 'en_retard')
-
-        # Calculer la répartition par statut
-        par_statut = {}
-        for intervention in interventions:
-            statut = intervention.statut
-            par_statut[statut] = par_statut.get(statut, 0) + 1
+        # Un admin peut cibler un autre technicien (?technicien_id=<id>) ou tous (?technicien_id=tous)
+        cible = request.args.get('technicien_id', type=str)
+        tous = False
+        if cible:
+            if get_jwt().get('role') != 'admin':
+                return jsonify({
+                    'success': False,
+                    'message': 'Seuls les administrateurs peuvent consulter les statistiques d\'un autre technicien'
+                }), 403
+            if cible == 'tous':
+                tous = True
+                technicien_id = None
+            else:
+                try:
+                    technicien_id = int(cible)
+                except ValueError:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Paramètre technicien_id invalide'
+                    }), 422
+
+        # Agrégations côté SQL (GROUP BY statut / GROUP BY année, mois)
+        par_statut = InterventionDepot.compter_par_statut(technicien_id)
+        total = sum(par_statut.values())
+        en_cours = par_statut.get('en_cours', 0)
+        terminees = par_statut.get('terminee', 0)
+        en_retard = par_statut.get('en_retard', 0)
 
         # Calculer l'évolution sur 6 mois
-        par_mois = []
         now = datetime.now()
-        for i in range(5, -1, -1):
-            date = now - timedelta(days=30*i)
-            mois = date.strftime('%b %Y')
-            count = sum(1 for i in interventions if i.date_creation and i.date_creation.strftime('%b %Y') == mois)
-            par_mois.append({'mois': mois, 'nombre': count})
+        dates_mois = [now - timedelta(days=30*i) for i in range(5, -1, -1)]
+        depuis = datetime(dates_mois[0].year, dates_mois[0].month, 1)
+        comptes_mois = InterventionDepot.compter_par_mois(depuis, technicien_id)
+        par_mois = [
+            {'mois': d.strftime('%b %Y'), 'nombre': comptes_mois.get((d.year, d.month), 0)}
+            for d in dates_mois
+        ]
+
+        statistiques = {
+            'total': total,
+            'en_cours': en_cours,
+            'terminees': terminees,
+            'en_retard': en_retard,
+            'par_mois': par_mois,
+            'par_statut': par_statut
+        }
+        if tous:
+            statistiques['par_technicien'] = {
+                str(id_technicien): {
+                    'total': sum(statuts.values()),
+                    'en_cours': statuts.get('en_cours', 0),
+                    'terminees': statuts.get('terminee', 0),
+                    'en_retard': statuts.get('en_retard', 0),
+                    'par_statut': statuts
+                }
+                for id_technicien, statuts in InterventionDepot.compter_par_technicien_et_statut().items()
+            }
 
         return jsonify({
             'success': True,
             'data': {
-                'interventions': {
-                    'total': total,
-                    'en_cours': en_cours,
-                    'terminees': terminees,
-                    'en_retard': en_retard,
-                    'par_mois': par_mois,
-                    'par_statut': par_statut
-                }
+                'interventions': statistiques
             }
         })
 
@@ -643,8 +1328,7 @@ def statistiques_technicien():
 def generate_document(intervention_id):
     """Générer le document PDF d'une intervention"""
     try:
-        # Récupérer l'intervention
-        intervention = Intervention.query.get_or_404(intervention_id)
+        from services.service_pieces_jointes import ServicePiecesJointes
         
         # Vérifier les permissions
         user_id = get_jwt_identity()
@@ -657,17 +1341,59 @@ def generate_document(intervention_id):
                 'success': False,
                 'message': 'Seuls les techniciens et les administrateurs peuvent générer des documents'
             }), 403
+        
+        # Récupérer l'intervention et les données affichées en une requête (elles composent la clé du cache)
+        intervention = Intervention.query.options(
+            db.joinedload(Intervention.patient),
+            db.joinedload(Intervention.dispositif),
+            db.joinedload(Intervention.technicien),
+            db.joinedload(Intervention.reglage)
+        ).filter(Intervention.id == intervention_id).first()
+        if not intervention:
+            return jsonify({
+                'success': False,
+                'message': 'Intervention non trouvée'
+            }), 404
+        
+        # Un technicien ne génère que les documents de ses propres interventions
+        if user_role == 'technicien' and int(intervention.technicien_id) != int(user_id):
+            return jsonify({
+                'success': False,
+                'message': 'Vous n\'êtes pas autorisé à générer le document de cette intervention'
+            }), 403
+        
+        # Vignettes des photos (celles qui manquent sont générées sans écrire dans la session de la requête)
+        vignettes = ServicePiecesJointes.chemins_vignettes([intervention_id]).get(intervention_id, [])
+
+        from utils import cache_pdf
+        from utils.pdf_generator import generate_intervention_pdf, VERSION_MODELE
+
+        cle = cache_pdf.cle_intervention(intervention, VERSION_MODELE, vignettes)
+        fichier = cache_pdf.lire(cle)
+        if fichier:
+            logger.info(f"PDF de l'intervention {intervention_id} servi depuis le cache")
+        else:
+            # Générer le PDF et le mettre en cache
+            pdf_data = generate_intervention_pdf(intervention, vignettes)
+            fichier = cache_pdf.ecrire(cle, pdf_data.getvalue())
 
-        # Générer le PDF
-        from utils.pdf_generator import generate_intervention_pdf
-        pdf_data = generate_intervention_pdf(intervention)
+        reference = cache_pdf.reference(cle)
+        if intervention.rapport_pdf_url != reference:
+            # UPDATE direct en conservant date_modification : la clé du cache reste valable
+            db.session.execute(
+                Intervention.__table__.update().where(Intervention.id == intervention_id).values(
+                    rapport_pdf_url=reference, date_modification=intervention.date_modification
+                )
+            )
+            db.session.commit()
         
         # Retourner le PDF
         return send_file(
-            pdf_data,
+            fichier,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'intervention_{intervention_id}_{datetime.now().strftime("%Y%m%d")}.pdf'
+            download_name=f'intervention_{intervention_id}_{datetime.now().strftime("%Y%m%d")}.pdf',
+            etag=cle
         )
 
     except Exception as e:
@@ -676,4 +1402,389 @@ def generate_document(intervention_id):
             'success': False,
             'message': 'Erreur lors de la génération du document',
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+@interventions_bp.route('/documents/batch', methods=['POST'])
+@jwt_required()
+def generer_documents_lot():
+    """Lancer la génération des PDF de plusieurs interventions (archive zip en arrière-plan)"""
+    try:
+        user_id = int(get_jwt_identity())
+        user_role = get_jwt().get('role')
+        if user_role not in ['technicien', 'admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Seuls les techniciens et les administrateurs peuvent générer des documents'
+            }), 403
+
+        donnees = request.get_json(silent=True) or {}
+        ids = donnees.get('ids')
+        try:
+            if ids is not None:
+                if not isinstance(ids, list):
+                    raise ValueError("ids doit être une liste d'identifiants")
+                ids = [int(id) for id in ids]
+            date_debut = datetime.fromisoformat(donnees['date_debut']) if donnees.get('date_debut') else None
+            date_fin = datetime.fromisoformat(donnees['date_fin']) if donnees.get('date_fin') else None
+            if date_fin and len(donnees['date_fin']) == 10:
+                date_fin = date_fin + timedelta(days=1) - timedelta(microseconds=1)
+        except (ValueError, TypeError) as e:
+            return jsonify({
+                'success': False,
+                'message': 'Paramètres invalides',
+                'error': str(e)
+            }), 422
+
+        if not ids and not (date_debut or date_fin):
+            return jsonify({
+                'success': False,
+                'message': 'Fournir une liste ids ou une période (date_debut, date_fin)'
+            }), 400
+
+        from services.service_documents import ServiceDocuments
+        selection = ServiceDocuments.selectionner_interventions(user_id, user_role, ids, date_debut, date_fin)
+        if not selection:
+            return jsonify({
+                'success': False,
+                'message': 'Aucune intervention accessible pour cette sélection'
+            }), 404
+
+        maximum = current_app.config.get('DOCUMENTS_LOT_MAX', 5000)
+        if len(selection) > maximum:
+            return jsonify({
+                'success': False,
+                'message': f'Trop d\'interventions pour un lot ({len(selection)} > {maximum})'
+            }), 422
+
+        lot = ServiceDocuments.creer_lot(user_id, selection)
+        return jsonify({
+            'success': True,
+            'data': lot.to_dict(),
+            'message': f'Génération de {len(selection)} documents lancée'
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Erreur lors du lancement du lot de documents: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors du lancement de la génération',
+            'error': str(e)
+        }), 500
+
+def _obtenir_lot_autorise(lot_id):
+    """Retourne (lot, None) ou (None, réponse d'erreur) selon l'existence et le propriétaire du lot"""
+    from modeles.lot_documents import LotDocuments
+    from services.service_documents import STATUTS_ACTIFS, ServiceDocuments
+    lot = db.session.get(LotDocuments, lot_id)
+    if not lot:
+        return None, (jsonify({'success': False, 'message': 'Lot de documents non trouvé'}), 404)
+    if get_jwt().get('role') != 'admin' and lot.utilisateur_id != int(get_jwt_identity()):
+        return None, (jsonify({'success': False, 'message': 'Accès non autorisé à ce lot'}), 403)
+    if lot.statut in STATUTS_ACTIFS and ServiceDocuments.marquer_lots_interrompus():
+        db.session.refresh(lot)
+    return lot, None
+
+@interventions_bp.route('/documents/batch/<int:lot_id>', methods=['GET'])
+@jwt_required()
+def statut_documents_lot(lot_id):
+    """Consulter l'avancement d'un lot de documents"""
+    try:
+        lot, erreur = _obtenir_lot_autorise(lot_id)
+        if erreur:
+            return erreur
+        return jsonify({
+            'success': True,
+            'data': lot.to_dict(),
+            'message': f'Lot {lot.statut} ({lot.traites}/{lot.total})'
+        }), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture du lot {lot_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la lecture du lot',
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/documents/batch/<int:lot_id>/fichier', methods=['GET'])
+@jwt_required()
+def telecharger_documents_lot(lot_id):
+    """Télécharger l'archive zip d'un lot terminé"""
+    try:
+        lot, erreur = _obtenir_lot_autorise(lot_id)
+        if erreur:
+            return erreur
+        if lot.statut != 'termine' or not lot.chemin_fichier:
+            return jsonify({
+                'success': False,
+                'message': f'Archive non disponible (statut : {lot.statut})'
+            }), 409
+        return send_file(
+            lot.chemin_fichier,
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=f'interventions_lot_{lot_id}.zip'
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors du téléchargement du lot {lot_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': "Erreur lors du téléchargement de l'archive",
+            'error': str(e)
+        }), 500
+
+def _obtenir_intervention_autorisee(intervention_id):
+    """Retourne (intervention, None) ou (None, réponse d'erreur) : admin, ou technicien assigné"""
+    intervention = db.session.get(Intervention, intervention_id)
+    if not intervention:
+        return None, (jsonify({'success': False, 'message': 'Intervention non trouvée'}), 404)
+    if get_jwt().get('role') != 'admin' and intervention.technicien_id != int(get_jwt_identity()):
+        return None, (jsonify({'success': False, 'message': 'Accès non autorisé à cette intervention'}), 403)
+    return intervention, None
+
+def _televerser_pieces(intervention_id, champ, type_piece):
+    """Copie les fichiers multipart du champ dans le stockage de blobs et les rattache à l'intervention"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    from utils.stockage_blobs import TailleDepassee
+    
+    intervention, erreur = _obtenir_intervention_autorisee(intervention_id)
+    if erreur:
+        return None, erreur
+    fichiers = [fichier for fichier in request.files.getlist(champ) if fichier.filename]
+    if not fichiers:
+        return None, (jsonify({'success': False, 'message': f'Aucun fichier fourni (champ {champ})'}), 400)
+    
+    try:
+        pieces = [
+            ServicePiecesJointes.enregistrer_fichier(
+                intervention, type_piece, fichier.stream, fichier.mimetype, fichier.filename
+            )
+            for fichier in fichiers
+        ]
+        db.session.commit()
+    except TailleDepassee as e:
+        db.session.rollback()
+        return None, (jsonify({'success': False, 'message': 'Fichier trop volumineux', 'error': str(e)}), 413)
+    except ValueError as e:
+        db.session.rollback()
+        return None, (jsonify({'success': False, 'message': 'Fichier refusé', 'error': str(e)}), 415)
+    return pieces, None
+
+@interventions_bp.route('/<int:intervention_id>/pieces-jointes', methods=['POST'])
+@jwt_required()
+def ajouter_pieces_jointes(intervention_id):
+    """Téléverser des pièces jointes (multipart, champ 'fichiers', type de pièce dans le champ 'type')"""
+    try:
+        type_piece = request.form.get('type', 'document')
+        if type_piece not in ('photo', 'document'):
+            return jsonify({
+                'success': False,
+                'message': 'Type de pièce invalide (photo ou document)'
+            }), 422
+        pieces, erreur = _televerser_pieces(intervention_id, 'fichiers', type_piece)
+        if erreur:
+            return erreur
+        return jsonify({
+            'success': True,
+            'data': [piece.to_dict() for piece in pieces],
+            'message': f'{len(pieces)} pièces jointes ajoutées'
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de l'ajout de pièces jointes à l'intervention {intervention_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': "Erreur lors de l'ajout des pièces jointes",
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/<int:intervention_id>/photos', methods=['POST'])
+@jwt_required()
+def ajouter_photos(intervention_id):
+    """Téléverser des photos (multipart, champ 'photos')"""
+    try:
+        pieces, erreur = _televerser_pieces(intervention_id, 'photos', 'photo')
+        if erreur:
+            return erreur
+        return jsonify({
+            'success': True,
+            'data': [piece.to_dict() for piece in pieces],
+            'photos': [piece.to_dict()['url'] for piece in pieces],
+            'message': f'{len(pieces)} photos ajoutées'
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de l'ajout de photos à l'intervention {intervention_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': "Erreur lors de l'ajout des photos",
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/<int:intervention_id>/signature', methods=['POST'])
+@jwt_required()
+def enregistrer_signature(intervention_id):
+    """Enregistrer la signature du technicien (data URL), compressée avant stockage"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    try:
+        intervention, erreur = _obtenir_intervention_autorisee(intervention_id)
+        if erreur:
+            return erreur
+        signature = (request.get_json(silent=True) or {}).get('signature')
+        if not signature:
+            return jsonify({
+                'success': False,
+                'message': 'La signature est requise'
+            }), 400
+        try:
+            piece = ServicePiecesJointes.enregistrer_signature(intervention, signature)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Signature invalide',
+                'error': str(e)
+            }), 422
+        db.session.commit()
+        return jsonify({
+            'success': True,
+            'data': piece.to_dict(),
+            'message': 'Signature enregistrée'
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de l'enregistrement de la signature de l'intervention {intervention_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': "Erreur lors de l'enregistrement de la signature",
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/<int:intervention_id>/pieces-jointes', methods=['GET'])
+@jwt_required()
+def lister_pieces_jointes(intervention_id):
+    """Lister les pièces jointes d'une intervention (métadonnées seulement)"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    try:
+        intervention, erreur = _obtenir_intervention_autorisee(intervention_id)
+        if erreur:
+            return erreur
+        pieces = ServicePiecesJointes.lister(intervention.id)
+        return jsonify({
+            'success': True,
+            'data': [piece.to_dict() for piece in pieces],
+            'message': f'{len(pieces)} pièces jointes'
+        }), 200
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture des pièces jointes de l'intervention {intervention_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la lecture des pièces jointes',
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/<int:intervention_id>/pieces-jointes/<int:piece_id>', methods=['GET'])
+@jwt_required()
+def telecharger_piece_jointe(intervention_id, piece_id):
+    """Télécharger le contenu d'une pièce jointe (contenu immuable : ETag = empreinte)"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    try:
+        intervention, erreur = _obtenir_intervention_autorisee(intervention_id)
+        if erreur:
+            return erreur
+        piece = ServicePiecesJointes.obtenir(intervention.id, piece_id)
+        if not piece:
+            return jsonify({
+                'success': False,
+                'message': 'Pièce jointe non trouvée'
+            }), 404
+        stockage = ServicePiecesJointes.stockage
+        chemin = stockage.chemin(piece.empreinte)
+        reponse = send_file(
+            chemin if chemin else stockage.ouvrir(piece.empreinte),
+            mimetype=piece.type_contenu,
+            download_name=piece.nom_fichier or piece.empreinte,
+            etag=piece.empreinte,
+            conditional=True,
+            max_age=86400
+        )
+        reponse.cache_control.private = True
+        reponse.cache_control.public = False
+        return reponse
+    except FileNotFoundError:
+        logger.error(f"Contenu manquant pour la pièce jointe {piece_id} (intervention {intervention_id})")
+        return jsonify({
+            'success': False,
+            'message': 'Contenu de la pièce jointe introuvable'
+        }), 404
+    except Exception as e:
+        logger.error(f"Erreur lors du téléchargement de la pièce jointe {piece_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors du téléchargement de la pièce jointe',
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/<int:intervention_id>/pieces-jointes/<int:piece_id>/vignette', methods=['GET'])
+@jwt_required()
+def telecharger_vignette(intervention_id, piece_id):
+    """Vignette JPEG d'une image (générée à l'envoi ; immuable, mise en cache longue durée)"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    try:
+        intervention, erreur = _obtenir_intervention_autorisee(intervention_id)
+        if erreur:
+            return erreur
+        piece = ServicePiecesJointes.obtenir(intervention.id, piece_id)
+        empreinte = ServicePiecesJointes.vignette(piece) if piece else None
+        if not empreinte:
+            return jsonify({
+                'success': False,
+                'message': 'Vignette non disponible'
+            }), 404
+        stockage = ServicePiecesJointes.stockage
+        chemin = stockage.chemin(empreinte)
+        reponse = send_file(
+            chemin if chemin else stockage.ouvrir(empreinte),
+            mimetype='image/jpeg',
+            download_name=f'vignette_{piece_id}.jpg',
+            etag=empreinte,
+            conditional=True,
+            max_age=current_app.config['VIGNETTES_CACHE_DUREE']
+        )
+        reponse.cache_control.private = True
+        reponse.cache_control.public = False
+        reponse.cache_control.immutable = True
+        return reponse
+    except Exception as e:
+        logger.error(f"Erreur lors du téléchargement de la vignette {piece_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors du téléchargement de la vignette',
+            'error': str(e)
+        }), 500
+
+@interventions_bp.route('/<int:intervention_id>/pieces-jointes/<int:piece_id>', methods=['DELETE'])
+@jwt_required()
+def supprimer_piece_jointe(intervention_id, piece_id):
+    """Supprimer une pièce jointe (le contenu est supprimé s'il n'est plus référencé)"""
+    from services.service_pieces_jointes import ServicePiecesJointes
+    try:
+        intervention, erreur = _obtenir_intervention_autorisee(intervention_id)
+        if erreur:
+            return erreur
+        piece = ServicePiecesJointes.obtenir(intervention.id, piece_id)
+        if not piece:
+            return jsonify({
+                'success': False,
+                'message': 'Pièce jointe non trouvée'
+            }), 404
+        ServicePiecesJointes.supprimer(piece)
+        return jsonify({
+            'success': True,
+            'message': 'Pièce jointe supprimée'
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de la suppression de la pièce jointe {piece_id}: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la suppression de la pièce jointe',
+            'error': str(e)
+        }), 500
@@ -0,0 +1,33 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from extensions.base_donnees import db
+from extensions.metriques import jauges_pool
+from utils.metriques import metriques
+from utils.cache_identite import cache_identites
+from utils.cache_jetons import cache_jetons
+import hmac
+
+metriques_bp = Blueprint('metriques', __name__)
+
+def _jauges_caches():
+    identites = cache_identites.statistiques()
+    jetons = cache_jetons.statistiques()
+    return [
+        ('oxycare_cache_identites_entrees', 'Identités en cache', 'gauge', identites['entrees']),
+        ('oxycare_cache_identites_succes_total', 'Identités servies par le cache', 'counter', identites['succes']),
+        ('oxycare_cache_identites_echecs_total', 'Identités chargées en base', 'counter', identites['echecs']),
+        ('oxycare_cache_jetons_entrees', 'Verdicts de révocation en cache', 'gauge', jetons['entrees']),
+        ('oxycare_cache_jetons_succes_total', 'Verdicts de révocation servis sans lecture de la table', 'counter', jetons['succes']),
+        ('oxycare_cache_jetons_echecs_total', 'Verdicts de révocation lus en base', 'counter', jetons['echecs']),
+    ]
+
+@metriques_bp.route('', methods=['GET'])
+def exposer_metriques():
+    """Métriques du processus au format texte Prometheus"""
+    jeton = current_app.config.get('METRIQUES_JETON')
+    if jeton:
+        fourni = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(fourni.encode('utf-8'), f'Bearer {jeton}'.encode('utf-8')):
+            return jsonify({'message': 'Accès non autorisé'}), 401
+    
+    texte = metriques.exporter(jauges_pool(db.engine) + _jauges_caches())
+    return Response(texte, mimetype='text/plain; version=0.0.4; charset=utf-8')
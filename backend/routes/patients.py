@@ -40,6 +40,13 @@ def creer_patient_alt():
     """Crée un nouveau patient (route alternative)"""
     return controleur_patient.creer_patient()
 
+@patients_bp.route('/import', methods=['POST'])
+@jwt_required()
+@admin_requis
+def importer_patients():
+    """Importe des patients en masse depuis un fichier CSV ou XLSX"""
+    return controleur_patient.importer_patients()
+
 @patients_bp.route('/<int:patient_id>', methods=['PUT'])
 @jwt_required()
 @admin_requis
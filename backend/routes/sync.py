@@ -0,0 +1,57 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt
+from datetime import datetime, timezone
+from services.service_sync import ServiceSync
+import logging
+import traceback
+
+sync_bp = Blueprint('sync', __name__)
+logger = logging.getLogger(__name__)
+
+def _lire_repere(valeur):
+    """Repère ISO 8601 ramené en UTC naïf (comme date_modification) ; lève ValueError s'il est invalide"""
+    repere = datetime.fromisoformat(valeur.replace('Z', '+00:00'))
+    if repere.tzinfo:
+        repere = repere.astimezone(timezone.utc).replace(tzinfo=None)
+    return repere
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def synchroniser():
+    """Synchronisation différentielle : lignes modifiées et supprimées depuis ?since="""
+    try:
+        user_id = get_jwt_identity()
+        user_role = get_jwt().get('role')
+        if user_role not in ('technicien', 'admin'):
+            return jsonify({
+                'success': False,
+                'message': 'Rôle non autorisé'
+            }), 403
+
+        depuis = request.args.get('since', '', type=str).strip()
+        try:
+            depuis = _lire_repere(depuis) if depuis else None
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Paramètre since invalide',
+                'error': str(e)
+            }), 422
+
+        technicien_id = int(user_id) if user_role == 'technicien' else request.args.get('technicien_id', type=int)
+        donnees = ServiceSync.delta(depuis, technicien_id)
+
+        nombre = len(donnees['interventions']) + len(donnees['patients']) + len(donnees['dispositifs'])
+        return jsonify({
+            'success': True,
+            'data': donnees,
+            'message': f'{nombre} éléments modifiés'
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la synchronisation: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Erreur lors de la synchronisation',
+            'error': str(e)
+        }), 500
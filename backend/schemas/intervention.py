@@ -1,5 +1,6 @@
-from marshmallow import Schema, fields, validates, ValidationError, post_load
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError, post_load
 from datetime import datetime
+from schemas.reglage import ReglageSchema
 
 class InterventionSchema(Schema):
     id = fields.Int(dump_only=True)
@@ -139,4 +140,58 @@ class InterventionSchema(Schema):
     def make_intervention(self, data, **kwargs):
         """Crée une instance d'intervention après validation"""
         from modeles.intervention import Intervention
-        return Intervention(**data) 
\ No newline at end of file
+        return Intervention(**data) 
+
+STATUTS = ['planifiee', 'en_cours', 'terminee', 'patient_absent', 'annulee', 'reportee', 'partielle']
+
+class MiseAJourInterventionSchema(InterventionSchema):
+    """Mise à jour partielle d'une intervention saisie hors ligne (POST /api/interventions/batch).
+    À instancier avec only=CHAMPS_MISE_A_JOUR : les autres champs sont refusés."""
+    id = fields.Int(required=True)
+    # Version de l'intervention connue du client, pour détecter les modifications concurrentes
+    date_modification = fields.DateTime(allow_none=True)
+    
+    statut = fields.Str(validate=validate.OneOf(STATUTS))
+    etat_materiel = fields.Str(allow_none=True, validate=validate.OneOf(['Fonctionnel', 'Défaut', 'À remplacer']))
+    actions_effectuees = fields.Raw(allow_none=True)
+    accessoires_utilises = fields.Raw(allow_none=True)
+    parametres = fields.Dict(allow_none=True)
+    verification_securite = fields.Dict(allow_none=True)
+    tests_effectues = fields.Dict(allow_none=True)
+    consommables_utilises = fields.Dict(allow_none=True)
+    maintenance_preventive = fields.Bool()
+    date_prochaine_maintenance = fields.DateTime(allow_none=True)
+    reglage = fields.Dict(allow_none=True)
+    
+    @validates('reglage')
+    def validate_reglage(self, value, **kwargs):
+        """Valide les réglages avec ReglageSchema (le dispositif est celui de l'intervention)"""
+        if value:
+            erreurs = ReglageSchema(exclude=('dispositif_id',)).validate(value, partial=True)
+            if erreurs:
+                raise ValidationError(erreurs)
+    
+    @validates_schema
+    def validate_motif_annulation(self, data, **kwargs):
+        """Le motif d'annulation accompagne le statut annulee"""
+        if data.get('motif_annulation') and data.get('statut') != 'annulee':
+            raise ValidationError("Le motif d'annulation n'est valide que pour une intervention annulée", 'motif_annulation')
+    
+    @validates_schema
+    def validate_date_reprogrammation(self, data, **kwargs):
+        """La date de reprogrammation accompagne le statut reportee"""
+        if data.get('date_reprogrammation') and data.get('statut') != 'reportee':
+            raise ValidationError("La date de reprogrammation n'est valide que pour une intervention reportée", 'date_reprogrammation')
+    
+    @post_load
+    def make_intervention(self, data, **kwargs):
+        """Les mises à jour restent des dictionnaires, appliqués à l'intervention existante"""
+        return data
+
+CHAMPS_MISE_A_JOUR = (
+    'id', 'date_modification', 'statut', 'date_reelle', 'etat_materiel',
+    'actions_effectuees', 'accessoires_utilises', 'parametres', 'verification_securite',
+    'tests_effectues', 'consommables_utilises', 'maintenance_preventive',
+    'date_prochaine_maintenance', 'photos', 'signature_technicien', 'remarques',
+    'motif_annulation', 'date_reprogrammation', 'reglage'
+)
@@ -21,31 +21,31 @@ class ReglageSchema(Schema):
     date_modification = fields.DateTime(dump_only=True)
     
     @validates('pmax')
-    def validate_pmax(self, value):
+    def validate_pmax(self, value, **kwargs):
         """Valide la pression maximale"""
         if value is not None and value < 0:
             raise ValidationError("La pression maximale ne peut pas être négative")
     
     @validates('pmin')
-    def validate_pmin(self, value):
+    def validate_pmin(self, value, **kwargs):
         """Valide la pression minimale"""
         if value is not None and value < 0:
             raise ValidationError("La pression minimale ne peut pas être négative")
     
     @validates('pramp')
-    def validate_pramp(self, value):
+    def validate_pramp(self, value, **kwargs):
         """Valide la pression de rampe"""
         if value is not None and value < 0:
             raise ValidationError("La pression de rampe ne peut pas être négative")
     
     @validates('hu')
-    def validate_hu(self, value):
+    def validate_hu(self, value, **kwargs):
         """Valide l'humidité"""
         if value is not None and (value < 0 or value > 5):
             raise ValidationError("L'humidité doit être comprise entre 0 et 5")
     
     @validates('re')
-    def validate_re(self, value):
+    def validate_re(self, value, **kwargs):
         """Valide la réserve d'expiration"""
         if value is not None and (value < 0 or value > 3):
             raise ValidationError("La réserve d'expiration doit être comprise entre 0 et 3")
@@ -1,11 +1,46 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from marshmallow import ValidationError
+from sqlalchemy.orm import joinedload
 from modeles.intervention import Intervention
+from modeles.reglage import Reglage
 from modeles.utilisateur import Utilisateur
 from modeles.patient import Patient
 from modeles.dispositif_medical import DispositifMedical
 from extensions.base_donnees import db
+from services.service_statistiques import ServiceStatistiques
+from schemas.intervention import MiseAJourInterventionSchema, CHAMPS_MISE_A_JOUR
 from typing import List, Dict, Optional, Any
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+schema_mise_a_jour = MiseAJourInterventionSchema(only=CHAMPS_MISE_A_JOUR)
+
+CHAMPS_REGLAGE = ('pmax', 'pmin', 'pramp', 'hu', 're', 'commentaire')
+
+def _utc_naif(valeur: Optional[datetime]) -> Optional[datetime]:
+    """Ramène une date avec fuseau en UTC naïf, comme les colonnes DateTime"""
+    if valeur is not None and valeur.tzinfo:
+        return valeur.astimezone(timezone.utc).replace(tzinfo=None)
+    return valeur
+
+def _appliquer_reglage(intervention: Intervention, valeur: Optional[Dict[str, Any]]) -> None:
+    """Crée, met à jour ou supprime le réglage d'une intervention (mêmes règles que PUT)"""
+    if valeur is None:
+        if intervention.reglage:
+            db.session.delete(intervention.reglage)
+            intervention.reglage = None
+    elif intervention.reglage:
+        for champ in CHAMPS_REGLAGE:
+            if champ in valeur:
+                setattr(intervention.reglage, champ, valeur[champ])
+    else:
+        reglage = Reglage(dispositif_id=intervention.dispositif_id, **{
+            champ: valeur.get(champ) for champ in CHAMPS_REGLAGE
+        })
+        db.session.add(reglage)
+        intervention.reglage = reglage
 
 class InterventionService:
     @staticmethod
@@ -140,34 +175,84 @@ class InterventionService:
         date_fin: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Obtient des statistiques sur les interventions"""
-        query = Intervention.query
+        # Lu dans le cumul journalier (stats_journalieres), sans charger les interventions
+        return ServiceStatistiques.statistiques_interventions(date_debut, date_fin) 
+    
+    @staticmethod
+    def appliquer_lot(elements: List[Dict[str, Any]], user_id: int, user_role: str) -> List[Dict[str, Any]]:
+        """
+        Applique une liste de mises à jour d'interventions saisies hors ligne.
         
-        if date_debut:
-            query = query.filter(Intervention.date_planifiee >= date_debut)
-        if date_fin:
-            query = query.filter(Intervention.date_planifiee <= date_fin)
-            
-        interventions = query.all()
+        Les interventions sont chargées en une requête et le lot est validé en une
+        transaction ; chaque élément a son point de sauvegarde, donc un élément en
+        erreur n'annule pas les autres. Un élément portant une date_modification
+        antérieure à celle de l'intervention est refusé en conflit.
+        Retourne un résultat par élément, dans l'ordre reçu.
+        """
+        resultats = [None] * len(elements)
+        valides = []
+        for index, element in enumerate(elements):
+            try:
+                valides.append((index, schema_mise_a_jour.load(element)))
+            except ValidationError as e:
+                resultats[index] = {'index': index, 'id': (element or {}).get('id') if isinstance(element, dict) else None,
+                                    'resultat': 'invalide', 'erreurs': e.messages}
         
-        # Calcul des statistiques
-        total = len(interventions)
-        par_statut = {}
-        par_traitement = {}
-        par_type = {}
+        ids = {donnees['id'] for _, donnees in valides}
+        interventions = {
+            intervention.id: intervention
+            for intervention in Intervention.query.options(joinedload(Intervention.reglage))
+                .filter(Intervention.id.in_(ids)).all()
+        } if ids else {}
         
-        for intervention in interventions:
-            # Statistiques par statut
-            par_statut[intervention.statut] = par_statut.get(intervention.statut, 0) + 1
+        vus = set()
+        for index, donnees in valides:
+            intervention_id = donnees.pop('id')
+            resultat = {'index': index, 'id': intervention_id}
+            resultats[index] = resultat
+            intervention = interventions.get(intervention_id)
+            
+            if intervention is None:
+                resultat['resultat'] = 'introuvable'
+                continue
+            if user_role == 'technicien' and intervention.technicien_id != user_id:
+                resultat['resultat'] = 'interdit'
+                continue
+            if intervention_id in vus:
+                resultat['resultat'] = 'doublon'
+                continue
+            vus.add(intervention_id)
             
-            # Statistiques par traitement
-            par_traitement[intervention.traitement] = par_traitement.get(intervention.traitement, 0) + 1
+            connue = _utc_naif(donnees.pop('date_modification', None))
+            if connue and intervention.date_modification and intervention.date_modification > connue:
+                resultat['resultat'] = 'conflit'
+                resultat['data'] = intervention.to_dict()
+                continue
             
-            # Statistiques par type d'intervention
-            par_type[intervention.type_intervention] = par_type.get(intervention.type_intervention, 0) + 1
-        
-        return {
-            'total': total,
-            'par_statut': par_statut,
-            'par_traitement': par_traitement,
-            'par_type': par_type
-        } 
\ No newline at end of file
+            try:
+                with db.session.begin_nested():
+                    for champ, valeur in donnees.items():
+                        if champ == 'reglage':
+                            _appliquer_reglage(intervention, valeur)
+                        elif isinstance(valeur, datetime):
+                            setattr(intervention, champ, _utc_naif(valeur))
+                        else:
+                            setattr(intervention, champ, valeur)
+                resultat['resultat'] = 'applique'
+            except Exception as e:
+                logger.error(f"Erreur lors de la mise à jour de l'intervention {intervention_id} du lot: {str(e)}")
+                resultat['resultat'] = 'erreur'
+                resultat['erreurs'] = str(e)
+        
+        db.session.commit()
+        appliques = [resultat for resultat in resultats if resultat['resultat'] == 'applique']
+        if appliques:
+            # Relecture en une requête des interventions expirées par le commit
+            relues = {
+                intervention.id: intervention
+                for intervention in Intervention.query.options(joinedload(Intervention.reglage))
+                    .filter(Intervention.id.in_([resultat['id'] for resultat in appliques])).all()
+            }
+            for resultat in appliques:
+                resultat['data'] = relues[resultat['id']].to_dict()
+        return resultats
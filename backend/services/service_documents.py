@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from extensions.base_donnees import db
+from modeles.intervention import Intervention
+from modeles.lot_documents import LotDocuments
+from services.service_pieces_jointes import ServicePiecesJointes
+from utils.pdf_generator import generer_pdf_instantane, instantane_intervention
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Interventions chargées par requête pendant un lot (chaque tranche rafraîchit date_modification du lot)
+TAILLE_TRANCHE = 100
+
+STATUTS_ACTIFS = ('en_attente', 'en_cours')
+
+_executeur = None
+_verrou_executeur = threading.Lock()
+
+def _obtenir_executeur(nombre_processus: int) -> ProcessPoolExecutor:
+    """Pool de processus partagé par tous les lots du processus courant.
+    Contexte 'spawn' : pas de fork d'un processus serveur qui a déjà des threads."""
+    global _executeur
+    with _verrou_executeur:
+        if _executeur is None:
+            _executeur = ProcessPoolExecutor(
+                max_workers=nombre_processus,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executeur
+
+def _mettre_a_jour_lot(lot_id: int, **valeurs) -> None:
+    LotDocuments.query.filter_by(id=lot_id).update(
+        dict(valeurs, date_modification=datetime.utcnow()), synchronize_session=False
+    )
+    db.session.commit()
+
+class ServiceDocuments:
+    """Service de génération des fiches PDF par lot, dans un pool de processus"""
+    
+    @staticmethod
+    def selectionner_interventions(utilisateur_id: int, role: str, ids: Optional[List[int]] = None,
+                                   date_debut: Optional[datetime] = None, date_fin: Optional[datetime] = None) -> List[int]:
+        """Identifiants des interventions accessibles à l'utilisateur parmi la sélection demandée"""
+        query = db.session.query(Intervention.id)
+        if role == 'technicien':
+            query = query.filter(Intervention.technicien_id == utilisateur_id)
+        if ids is not None:
+            query = query.filter(Intervention.id.in_(ids))
+        if date_debut:
+            query = query.filter(Intervention.date_planifiee >= date_debut)
+        if date_fin:
+            query = query.filter(Intervention.date_planifiee <= date_fin)
+        return [id for (id,) in query.order_by(Intervention.date_planifiee, Intervention.id)]
+    
+    @staticmethod
+    def marquer_lots_interrompus() -> int:
+        """Marque échoués les lots actifs sans avancement depuis DOCUMENTS_LOT_INACTIVITE_MAX secondes :
+        leur thread est mort avec le worker qui l'exécutait (redémarrage, arrêt, timeout)"""
+        maintenant = datetime.utcnow()
+        limite = maintenant - timedelta(seconds=current_app.config['DOCUMENTS_LOT_INACTIVITE_MAX'])
+        nombre = LotDocuments.query.filter(
+            LotDocuments.statut.in_(STATUTS_ACTIFS),
+            LotDocuments.date_modification < limite
+        ).update({
+            'statut': 'echoue',
+            'date_fin': maintenant,
+            'date_modification': maintenant,
+            'message': 'Génération interrompue (processus arrêté)'
+        }, synchronize_session=False)
+        db.session.commit()
+        if nombre:
+            logger.warning(f"{nombre} lots de documents interrompus marqués échoués")
+        return nombre
+    
+    @staticmethod
+    def creer_lot(utilisateur_id: int, ids: List[int]) -> LotDocuments:
+        """Enregistre le lot et lance sa génération en arrière-plan.
+        Le thread meurt avec le worker : le lot est alors marqué échoué par marquer_lots_interrompus."""
+        lot = LotDocuments(utilisateur_id=utilisateur_id, total=len(ids), traites=0, erreurs=[], statut='en_attente')
+        db.session.add(lot)
+        db.session.commit()
+        
+        app = current_app._get_current_object()
+        threading.Thread(
+            target=ServiceDocuments._executer_lot,
+            args=(app, lot.id, ids),
+            name=f'lot-documents-{lot.id}',
+            daemon=True
+        ).start()
+        logger.info(f"Lot de documents {lot.id} créé ({len(ids)} interventions)")
+        return lot
+    
+    @staticmethod
+    def _executer_lot(app, lot_id: int, ids: List[int]) -> None:
+        """Rend les PDF dans le pool et les ajoute à l'archive au fur et à mesure"""
+        with app.app_context():
+            dossier = app.config['DOSSIER_DOCUMENTS']
+            chemin = os.path.join(dossier, f'lot_{lot_id}.zip')
+            partiel = chemin + '.part'
+            erreurs: List[Dict[str, Any]] = []
+            traites = 0
+            try:
+                os.makedirs(dossier, exist_ok=True)
+                _mettre_a_jour_lot(lot_id, statut='en_cours')
+                
+                nombre_processus = app.config.get('DOCUMENTS_PROCESSUS') or os.cpu_count() or 1
+                executeur = _obtenir_executeur(nombre_processus)
+                # Au plus deux rendus en attente par processus : la mémoire ne dépend pas de la taille du lot
+                en_vol_max = 2 * nombre_processus
+                en_cours = {}
+                
+                with zipfile.ZipFile(partiel, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    def recolter(termines):
+                        nonlocal traites
+                        for future in termines:
+                            intervention_id = en_cours.pop(future)
+                            try:
+                                _, contenu = future.result()
+                                archive.writestr(f'intervention_{intervention_id}.pdf', contenu)
+                            except Exception as e:
+                                logger.error(f"Lot {lot_id}: échec du PDF de l'intervention {intervention_id}: {str(e)}")
+                                erreurs.append({'intervention_id': intervention_id, 'erreur': str(e)})
+                            traites += 1
+                    
+                    for debut in range(0, len(ids), TAILLE_TRANCHE):
+                        tranche = ids[debut:debut + TAILLE_TRANCHE]
+                        # Vignettes manquantes générées dans le stockage ; leur enregistrement en base est laissé au pool
+                        vignettes = ServicePiecesJointes.chemins_vignettes(tranche)
+                        interventions = Intervention.query.options(
+                            joinedload(Intervention.patient),
+                            joinedload(Intervention.dispositif),
+                            joinedload(Intervention.technicien),
+                            joinedload(Intervention.reglage)
+                        ).filter(Intervention.id.in_(tranche)).all()
+                        
+                        trouvees = {intervention.id for intervention in interventions}
+                        for intervention_id in tranche:
+                            if intervention_id not in trouvees:
+                                erreurs.append({'intervention_id': intervention_id, 'erreur': 'Intervention introuvable'})
+                                traites += 1
+                        
+                        for intervention in interventions:
+                            if len(en_cours) >= en_vol_max:
+                                termines, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+                                recolter(termines)
+                            future = executeur.submit(
+                                generer_pdf_instantane,
+                                instantane_intervention(intervention, vignettes.get(intervention.id))
+                            )
+                            en_cours[future] = intervention.id
+                        
+                        # Libérer les objets de la tranche avant la suivante
+                        db.session.expunge_all()
+                        _mettre_a_jour_lot(lot_id, traites=traites, erreurs=list(erreurs))
+                    
+                    recolter(wait(en_cours).done)
+                
+                os.replace(partiel, chemin)
+                _mettre_a_jour_lot(
+                    lot_id, statut='termine', traites=traites, erreurs=list(erreurs),
+                    chemin_fichier=chemin, date_fin=datetime.utcnow(),
+                    message=f'{traites - len(erreurs)} documents générés, {len(erreurs)} en erreur'
+                )
+                logger.info(f"Lot de documents {lot_id} terminé ({traites} traités, {len(erreurs)} erreurs)")
+            except Exception as e:
+                logger.error(f"Erreur lors de la génération du lot {lot_id}: {str(e)}")
+                db.session.rollback()
+                if os.path.exists(partiel):
+                    os.remove(partiel)
+                _mettre_a_jour_lot(
+                    lot_id, statut='echoue', traites=traites, erreurs=list(erreurs),
+                    date_fin=datetime.utcnow(), message=str(e)[:255]
+                )
+            finally:
+                db.session.remove()
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import hashlib
+import zlib
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from extensions.base_donnees import db
+from modeles.cle_idempotence import CleIdempotence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Purge des clés expirées toutes les N réservations (par processus)
+PURGE_TOUTES_LES = 200
+
+_reservations = 0
+
+def empreinte(*morceaux) -> str:
+    """SHA-256 hexadécimal d'une suite de morceaux (str ou bytes)"""
+    h = hashlib.sha256()
+    for morceau in morceaux:
+        h.update(morceau if isinstance(morceau, bytes) else str(morceau).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+class ServiceIdempotence:
+    """
+    Stockage des réponses des requêtes idempotentes.
+    
+    Les écritures passent par une connexion propre (hors de db.session) et sont
+    validées tout de suite : la réservation est visible des autres processus
+    avant l'exécution de la requête.
+    """
+    
+    @staticmethod
+    def reserver(cle: str, empreinte_requete: str, ttl: timedelta) -> Tuple[str, Optional[dict]]:
+        """
+        Réserve la clé avant l'exécution de la requête.
+        Retourne ('reservee', None), ('en_cours', None), ('differente', None)
+        ou ('terminee', {'statut_http', 'type_contenu', 'corps'}).
+        """
+        global _reservations
+        table = CleIdempotence.__table__
+        maintenant = datetime.utcnow()
+        
+        with db.engine.begin() as connection:
+            ligne = connection.execute(select(
+                table.c.empreinte_requete, table.c.statut_http, table.c.type_contenu,
+                table.c.corps, table.c.date_expiration
+            ).where(table.c.cle == cle)).first()
+            if ligne is not None and ligne.date_expiration <= maintenant:
+                connection.execute(table.delete().where(table.c.cle == cle))
+                ligne = None
+        
+        if ligne is not None:
+            if ligne.empreinte_requete != empreinte_requete:
+                return 'differente', None
+            if ligne.statut_http is None:
+                return 'en_cours', None
+            return 'terminee', {
+                'statut_http': ligne.statut_http,
+                'type_contenu': ligne.type_contenu,
+                'corps': zlib.decompress(ligne.corps) if ligne.corps else b''
+            }
+        
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(table.insert().values(
+                    cle=cle,
+                    empreinte_requete=empreinte_requete,
+                    date_expiration=maintenant + ttl,
+                    date_creation=maintenant,
+                    date_modification=maintenant
+                ))
+        except IntegrityError:
+            # Une requête concurrente avec la même clé vient de la réserver
+            return 'en_cours', None
+        
+        _reservations += 1
+        if _reservations % PURGE_TOUTES_LES == 0:
+            ServiceIdempotence.purger()
+        return 'reservee', None
+    
+    @staticmethod
+    def enregistrer(cle: str, statut_http: int, type_contenu: Optional[str], corps: bytes) -> None:
+        """Mémorise la réponse d'une requête réservée"""
+        table = CleIdempotence.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.cle == cle).values(
+                statut_http=statut_http,
+                type_contenu=type_contenu,
+                corps=zlib.compress(corps),
+                date_modification=datetime.utcnow()
+            ))
+    
+    @staticmethod
+    def liberer(cle: str) -> None:
+        """Supprime une réservation (réponse non mémorisable) : la requête pourra être rejouée"""
+        table = CleIdempotence.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(
+                (table.c.cle == cle) & table.c.statut_http.is_(None)
+            ))
+    
+    @staticmethod
+    def purger() -> int:
+        """Supprime les clés expirées"""
+        table = CleIdempotence.__table__
+        with db.engine.begin() as connection:
+            resultat = connection.execute(table.delete().where(table.c.date_expiration <= datetime.utcnow()))
+        if resultat.rowcount:
+            logger.info(f"{resultat.rowcount} clés d'idempotence expirées supprimées")
+        return resultat.rowcount
@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from extensions.base_donnees import db
+from modeles.jeton_revoque import JetonRevoque
+from utils.filtre_bloom import FiltreBloom
+from utils.cache_jetons import cache_jetons, empreinte_jeton
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Une révocation d'id inférieur peut être commitée après une d'id supérieur :
+# chaque relecture reprend les FENETRE_RELECTURE ids sous le dernier id lu
+FENETRE_RELECTURE = 100
+
+_verrou = threading.Lock()
+
+def _etat() -> Dict[str, Any]:
+    """Filtre des jti révoqués de l'application courante, complété par relecture de la table
+    (révocations faites par les autres processus) toutes les `intervalle` secondes"""
+    return current_app.extensions.setdefault('jetons_revoques', {
+        'filtre': None, 'dernier_id': 0, 'prochaine_lecture': 0.0, 'reconstruction': 0.0
+    })
+
+def _cle(jti: str) -> str:
+    return empreinte_jeton(current_app.config['JWT_SECRET_KEY'], jti)
+
+class ServiceJetons:
+    """Service de révocation des tokens JWT (table jetons_revoques, filtre de Bloom en façade)"""
+    
+    capacite = 100000
+    intervalle = 5
+    periode_reconstruction = 3600
+    
+    @staticmethod
+    def _reconstruire(etat: Dict[str, Any]) -> None:
+        """Recharge le filtre avec les révocations non expirées et purge les autres"""
+        table = JetonRevoque.__table__
+        maintenant = datetime.utcnow()
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.date_expiration <= maintenant))
+            lignes = connection.execute(select(table.c.id, table.c.jti)).all()
+        
+        filtre = FiltreBloom(max(ServiceJetons.capacite, 2 * len(lignes)))
+        for _, jti in lignes:
+            filtre.ajouter(jti)
+        etat['filtre'] = filtre
+        etat['dernier_id'] = max((id for id, _ in lignes), default=0)
+        etat['prochaine_lecture'] = time.monotonic() + ServiceJetons.intervalle
+        etat['reconstruction'] = time.monotonic() + ServiceJetons.periode_reconstruction
+        logger.info(f"Filtre des tokens révoqués chargé: {len(lignes)} entrées")
+    
+    @staticmethod
+    def _actualiser() -> None:
+        etat = _etat()
+        with _verrou:
+            if (etat['filtre'] is None or etat['filtre'].est_plein()
+                    or time.monotonic() >= etat['reconstruction']):
+                ServiceJetons._reconstruire(etat)
+                return
+            if time.monotonic() < etat['prochaine_lecture']:
+                return
+            table = JetonRevoque.__table__
+            with db.engine.connect() as connection:
+                lignes = connection.execute(
+                    select(table.c.id, table.c.jti).where(table.c.id > etat['dernier_id'] - FENETRE_RELECTURE)
+                ).all()
+            for id, jti in lignes:
+                if jti not in etat['filtre']:
+                    etat['filtre'].ajouter(jti)
+                    # Un verdict « non révoqué » mis en cache sur un faux positif n'est plus valable
+                    cache_jetons.retirer(_cle(jti))
+                etat['dernier_id'] = max(etat['dernier_id'], id)
+            etat['prochaine_lecture'] = time.monotonic() + ServiceJetons.intervalle
+    
+    @staticmethod
+    def est_revoque(jti: Optional[str], exp: Optional[int] = None) -> bool:
+        """Vrai si le token est révoqué ; la table n'est lue que si le filtre répond peut-être,
+        et au plus une fois par token (verdict gardé dans cache_jetons jusqu'à exp)"""
+        if not jti:
+            return False
+        ServiceJetons._actualiser()
+        if jti not in _etat()['filtre']:
+            return False
+        cle = _cle(jti)
+        revoque = cache_jetons.obtenir(cle)
+        if revoque is None:
+            table = JetonRevoque.__table__
+            with db.engine.connect() as connection:
+                revoque = connection.execute(select(table.c.id).where(table.c.jti == jti)).first() is not None
+            cache_jetons.ajouter(cle, exp, revoque)
+        return revoque
+    
+    @staticmethod
+    def revoquer(claims: Dict[str, Any]) -> None:
+        """Révoque un token décodé (table, filtre et cache des verdicts de ce processus)"""
+        table = JetonRevoque.__table__
+        maintenant = datetime.utcnow()
+        exp = claims.get('exp')
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(table.insert().values(
+                    jti=claims['jti'],
+                    type_jeton=claims.get('type', 'access'),
+                    utilisateur_id=int(claims['sub']) if str(claims.get('sub', '')).isdigit() else None,
+                    date_expiration=datetime.utcfromtimestamp(exp) if exp else datetime.max,
+                    date_creation=maintenant,
+                    date_modification=maintenant
+                ))
+        except IntegrityError:
+            pass  # Déjà révoqué
+        
+        etat = _etat()
+        with _verrou:
+            if etat['filtre'] is not None:
+                etat['filtre'].ajouter(claims['jti'])
+        cache_jetons.ajouter(_cle(claims['jti']), exp, True)
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import secrets
+import threading
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, object_session
+from extensions.base_donnees import db
+from modeles.intervention import Intervention
+from modeles.notification import Notification
+from modeles.ticket_flux import TicketFlux
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Réveille les flux SSE de ce processus quand une transaction ajoute des notifications ;
+# les autres processus les voient à leur prochaine relecture (NOTIFICATIONS_SSE_INTERVALLE)
+_condition = threading.Condition()
+_generation = 0
+
+# Flux SSE ouverts dans ce processus : chacun occupe un thread du serveur pendant toute sa durée
+_verrou_flux = threading.Lock()
+_flux_ouverts = 0
+
+# --- Écouteurs SQLAlchemy : une notification par changement de statut, dans la même transaction ---
+
+def _apres_modification(mapper, connection, target):
+    historique = inspect(target).attrs.statut.history
+    if not historique.has_changes():
+        return
+    ancien = historique.deleted[0] if historique.deleted else None
+    nouveau = target.statut
+    if ancien == nouveau:
+        return
+
+    maintenant = datetime.utcnow()
+    connection.execute(Notification.__table__.insert().values(
+        intervention_id=target.id,
+        technicien_id=target.technicien_id,
+        type='statut',
+        ancien_statut=ancien,
+        nouveau_statut=nouveau,
+        message=f"Intervention #{target.id} : {ancien or '-'} → {nouveau}",
+        date_creation=maintenant,
+        date_modification=maintenant
+    ))
+    session = object_session(target)
+    if session is not None:
+        session.info['notifications_ajoutees'] = True
+
+def _apres_commit(session):
+    if session.info.pop('notifications_ajoutees', False):
+        ServiceNotifications.signaler()
+
+def _apres_annulation(session):
+    session.info.pop('notifications_ajoutees', None)
+
+def _ignorer(target, valeur, ancienne_valeur, initiateur):
+    return valeur
+
+def _filtrer(query, technicien_id: Optional[int]):
+    if technicien_id:
+        query = query.filter(Notification.technicien_id == technicien_id)
+    return query
+
+class ServiceNotifications:
+    """Service du fil des notifications (table notifications, rattrapage par id et flux SSE)"""
+    
+    @staticmethod
+    def enregistrer_ecouteurs() -> None:
+        """Branche la création des notifications sur les changements de statut des interventions"""
+        if event.contains(Intervention, 'after_update', _apres_modification):
+            return
+        event.listen(Intervention, 'after_update', _apres_modification)
+        event.listen(Session, 'after_commit', _apres_commit)
+        event.listen(Session, 'after_rollback', _apres_annulation)
+        # active_history : l'ancien statut est connu même si l'attribut était expiré
+        event.listen(Intervention.statut, 'set', _ignorer, retval=True, active_history=True)
+    
+    @staticmethod
+    def lister(depuis_id: int = 0, technicien_id: Optional[int] = None, limite: int = 100) -> List[Dict[str, Any]]:
+        """Notifications d'id strictement supérieur à depuis_id, par id croissant"""
+        query = _filtrer(Notification.query.filter(Notification.id > depuis_id), technicien_id)
+        return [n.to_dict() for n in query.order_by(Notification.id).limit(limite).all()]
+    
+    @staticmethod
+    def dernier_id(technicien_id: Optional[int] = None) -> int:
+        """Id de la dernière notification visible (0 si aucune)"""
+        query = _filtrer(db.session.query(func.max(Notification.id)), technicien_id)
+        return query.scalar() or 0
+    
+    @staticmethod
+    def generation() -> int:
+        """Compteur des commits ayant ajouté des notifications dans ce processus"""
+        return _generation
+    
+    @staticmethod
+    def signaler() -> None:
+        """Réveille les flux en attente"""
+        global _generation
+        with _condition:
+            _generation += 1
+            _condition.notify_all()
+    
+    @staticmethod
+    def attendre(generation: int, delai: float) -> Tuple[int, bool]:
+        """Attend un signal postérieur à generation, au plus delai secondes.
+        Retourne (génération courante, vrai si signalé)."""
+        with _condition:
+            signale = _condition.wait_for(lambda: _generation != generation, timeout=delai)
+            return _generation, signale
+    
+    @staticmethod
+    def ouvrir_flux(maximum: int) -> bool:
+        """Réserve une place de flux dans ce processus ; faux si les maximum places sont prises"""
+        global _flux_ouverts
+        with _verrou_flux:
+            if _flux_ouverts >= maximum:
+                return False
+            _flux_ouverts += 1
+            return True
+    
+    @staticmethod
+    def fermer_flux() -> None:
+        """Libère la place réservée par ouvrir_flux"""
+        global _flux_ouverts
+        with _verrou_flux:
+            _flux_ouverts = max(_flux_ouverts - 1, 0)
+    
+    @staticmethod
+    def creer_ticket(utilisateur_id: int, role: Optional[str], duree: int) -> str:
+        """Ticket opaque ouvrant une fois le flux SSE pendant duree secondes ;
+        seule son empreinte est enregistrée (table partagée par tous les processus)"""
+        ticket = secrets.token_urlsafe(32)
+        table = TicketFlux.__table__
+        maintenant = datetime.utcnow()
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.date_expiration <= maintenant))
+            connection.execute(table.insert().values(
+                empreinte=hashlib.sha256(ticket.encode()).hexdigest(),
+                utilisateur_id=utilisateur_id,
+                role=role,
+                date_expiration=maintenant + timedelta(seconds=duree),
+                date_creation=maintenant,
+                date_modification=maintenant
+            ))
+        return ticket
+    
+    @staticmethod
+    def consommer_ticket(ticket: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Utilisateur et rôle du ticket s'il est valide, None sinon ; le ticket est supprimé,
+        et seule la requête dont la suppression aboutit l'utilise (usage unique entre processus)"""
+        if not ticket:
+            return None
+        table = TicketFlux.__table__
+        empreinte = hashlib.sha256(ticket.encode()).hexdigest()
+        with db.engine.begin() as connection:
+            ligne = connection.execute(
+                table.select().where(
+                    (table.c.empreinte == empreinte) & (table.c.date_expiration > datetime.utcnow())
+                )
+            ).mappings().first()
+            if ligne is None:
+                return None
+            if connection.execute(table.delete().where(table.c.id == ligne['id'])).rowcount != 1:
+                return None
+        return {'utilisateur_id': ligne['utilisateur_id'], 'role': ligne['role']}
@@ -1,13 +1,20 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from collections import Counter
 from datetime import datetime
+import csv
 from depots.depot_patient import DepotPatient
 from modeles.patient import Patient
+from modeles.prescripteur import Prescripteur
+from modeles.terme_recherche import TermeRecherche
+from schemas.schema_patient import SchemaPatient
+from services.service_statistiques import appliquer_deltas, contributions
+from services.service_recherche import ServiceRecherche
+from utils.generateurs import generer_code_patient, generer_code_aleatoire
 import logging
 import traceback
 from extensions.base_donnees import db
 
 # Configuration du logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class ServicePatient:
@@ -28,6 +35,14 @@ class ServicePatient:
             db.session.rollback()
             raise
     
+    def obtenir_empreinte_patients(self, recherche: str = '') -> Tuple:
+        """Empreinte (nombre, dernier id, dernière modification) de la liste des patients, pour l'ETag"""
+        return self.depot_patient.obtenir_empreinte_recherche(recherche)
+    
+    def obtenir_date_modification_patient(self, patient_id: int):
+        """Date de modification d'un patient, pour l'ETag (None s'il n'existe pas)"""
+        return self.depot_patient.obtenir_date_modification(patient_id)
+    
     def obtenir_patient_par_id(self, patient_id: int) -> Optional[Patient]:
         """Récupérer un patient par son ID"""
         logger.info(f"Service: Récupération du patient {patient_id}")
@@ -123,4 +138,116 @@ class ServicePatient:
         except Exception as e:
             logger.error(f"Erreur dans supprimer_patient: {str(e)}\n{traceback.format_exc()}")
             db.session.rollback()
-            return False, str(e)
\ No newline at end of file
+            return False, str(e)
+    
+    def importer_patients(self, lignes: Iterable[Tuple[int, Dict[str, Any]]], taille_lot: int = 500) -> Dict[str, Any]:
+        """
+        Importer des patients en masse à partir de (numéro de ligne, données), par lots d'au plus taille_lot lignes.
+        Chaque lot est validé, dédoublonné (CIN / code patient) et inséré dans sa propre transaction.
+        Retourne un rapport {total, crees, doublons, erreurs: [{ligne, erreurs}]}.
+        """
+        logger.info(f"Service: Import de patients (taille_lot={taille_lot})")
+        schema = SchemaPatient(many=True)
+        contexte = {
+            'schema': schema,
+            'champs': {nom for nom, champ in schema.fields.items() if not champ.dump_only},
+            'prescripteurs': {
+                f"{prenom} {nom}".strip().lower(): id
+                for id, nom, prenom in db.session.query(Prescripteur.id, Prescripteur.nom, Prescripteur.prenom)
+            },
+            'cins_vus': set(),
+            'codes_vus': set()
+        }
+        rapport = {'total': 0, 'crees': 0, 'doublons': 0, 'erreurs': []}
+        
+        lot = []
+        try:
+            for numero, ligne in lignes:
+                lot.append((numero, ligne))
+                if len(lot) >= taille_lot:
+                    self._importer_lot(lot, contexte, rapport)
+                    lot = []
+        except (ValueError, csv.Error) as e:
+            logger.error(f"Erreur de lecture du fichier d'import: {str(e)}")
+            rapport['erreur_fichier'] = str(e)
+        if lot:
+            self._importer_lot(lot, contexte, rapport)
+        rapport['erreurs'].sort(key=lambda erreur: erreur['ligne'])
+        
+        logger.info(f"Service: Import terminé ({rapport['crees']} créés, {len(rapport['erreurs'])} rejetés)")
+        return rapport
+    
+    def _importer_lot(self, lot: List[Tuple[int, Dict[str, Any]]], contexte: Dict[str, Any], rapport: Dict[str, Any]) -> None:
+        """Valide, dédoublonne et insère un lot de lignes dans une seule transaction"""
+        rapport['total'] += len(lot)
+        
+        # Validation du lot entier ; code_patient est en lecture seule dans le schéma
+        codes_fournis = [ligne.get('code_patient') for _, ligne in lot]
+        donnees = [
+            {cle: valeur for cle, valeur in ligne.items() if cle in contexte['champs'] and valeur is not None}
+            for _, ligne in lot
+        ]
+        erreurs_validation = contexte['schema'].validate(donnees)
+        for index, erreurs in sorted(erreurs_validation.items()):
+            rapport['erreurs'].append({'ligne': lot[index][0], 'erreurs': erreurs})
+        
+        indices = [i for i in range(len(lot)) if i not in erreurs_validation]
+        if not indices:
+            return
+        valides = contexte['schema'].load([donnees[i] for i in indices])
+        
+        # Codes générés avant la recherche de doublons : une seule requête pour tout le lot
+        codes = [
+            codes_fournis[i] or f"{generer_code_patient(d['nom'], d['prenom'])}{generer_code_aleatoire(5)}"
+            for i, d in zip(indices, valides)
+        ]
+        cins_lot = {d['cin'] for d in valides if d.get('cin')}
+        cins_existants, codes_existants = self.depot_patient.obtenir_cles_existantes(cins_lot, set(codes))
+        
+        maintenant = datetime.utcnow()
+        a_inserer = []
+        for i, d, code in zip(indices, valides, codes):
+            numero = lot[i][0]
+            cin = d.get('cin')
+            if cin and (cin in cins_existants or cin in contexte['cins_vus']):
+                rapport['doublons'] += 1
+                rapport['erreurs'].append({'ligne': numero, 'erreurs': {'cin': ['Un patient avec cette CIN existe déjà']}})
+                continue
+            if code in codes_existants or code in contexte['codes_vus']:
+                if codes_fournis[i]:
+                    rapport['doublons'] += 1
+                    rapport['erreurs'].append({'ligne': numero, 'erreurs': {'code_patient': ['Ce code patient existe déjà']}})
+                    continue
+                code = f"{generer_code_patient(d['nom'], d['prenom'])}{generer_code_aleatoire(5)}"
+            
+            if cin:
+                contexte['cins_vus'].add(cin)
+            contexte['codes_vus'].add(code)
+            
+            prescripteur_nom = d.pop('prescripteur_nom', None)
+            if prescripteur_nom and not d.get('prescripteur_id'):
+                d['prescripteur_id'] = contexte['prescripteurs'].get(prescripteur_nom.strip().lower())
+            d.update(code_patient=code, date_creation=maintenant, date_modification=maintenant)
+            a_inserer.append((numero, d))
+        
+        if not a_inserer:
+            return
+        
+        lignes = [d for _, d in a_inserer]
+        try:
+            self.depot_patient.inserer_en_masse(lignes)
+            # Les insertions en masse ne déclenchent pas les événements : cumul et index à la main
+            appliquer_deltas(db.session.connection(), Counter(
+                cle for ligne in lignes for cle in contributions(Patient, ligne.get)
+            ))
+            db.session.bulk_insert_mappings(TermeRecherche, ServiceRecherche.indexer_lignes(Patient, lignes))
+            db.session.commit()
+            rapport['crees'] += len(lignes)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'insertion d'un lot d'import: {str(e)}\n{traceback.format_exc()}")
+            db.session.rollback()
+            for numero, d in a_inserer:
+                contexte['codes_vus'].discard(d['code_patient'])
+                if d.get('cin'):
+                    contexte['cins_vus'].discard(d['cin'])
+                rapport['erreurs'].append({'ligne': numero, 'erreurs': {'lot': [f"Insertion du lot impossible: {str(e)}"]}})
@@ -0,0 +1,318 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from sqlalchemy import event, inspect, or_
+from extensions.base_donnees import db
+from modeles.intervention import Intervention
+from modeles.piece_jointe import PieceJointe
+from utils.images import compresser_signature, creer_vignette, decoder_data_url
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Un blob non référencé n'est supprimé par la purge qu'après ce délai (téléversement en cours)
+AGE_MIN_ORPHELIN = 3600
+
+_executeur = None
+_verrou_executeur = threading.Lock()
+
+def _obtenir_executeur(nombre_threads: int) -> ThreadPoolExecutor:
+    """Pool de threads partagé pour les vignettes (le décodage et l'encodage PIL libèrent le GIL)"""
+    global _executeur
+    with _verrou_executeur:
+        if _executeur is None:
+            _executeur = ThreadPoolExecutor(max_workers=nombre_threads, thread_name_prefix='vignettes')
+        return _executeur
+
+def _dimensions(chemin):
+    """(largeur, hauteur) d'une image stockée (lecture de l'en-tête seulement), ou (None, None)"""
+    if not chemin:
+        return None, None
+    try:
+        from PIL import Image
+        with Image.open(chemin) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+def _extraire_donnees_inline(session, flush_context, instances):
+    """Déplace signature et photos en base64 écrites sur une intervention vers le stockage de blobs"""
+    for objet in list(session.new) + list(session.dirty):
+        if not isinstance(objet, Intervention):
+            continue
+        etat = inspect(objet)
+        
+        if objet.signature_technicien and etat.attrs.signature_technicien.history.added:
+            try:
+                ServicePiecesJointes.enregistrer_signature(objet, objet.signature_technicien)
+                objet.signature_technicien = None
+            except ValueError as e:
+                logger.warning(f"Signature de l'intervention {objet.id} laissée en ligne: {str(e)}")
+        
+        photos = objet.photos
+        if photos and etat.attrs.photos.history.added and any(
+            isinstance(photo, str) and photo.startswith('data:') for photo in photos
+        ):
+            restantes = []
+            for photo in photos:
+                if not (isinstance(photo, str) and photo.startswith('data:')):
+                    restantes.append(photo)
+                    continue
+                try:
+                    contenu, type_contenu = decoder_data_url(photo)
+                    ServicePiecesJointes.enregistrer_fichier(
+                        objet, 'photo', io.BytesIO(contenu), type_contenu or 'application/octet-stream'
+                    )
+                except ValueError as e:
+                    logger.warning(f"Photo de l'intervention {objet.id} laissée en ligne: {str(e)}")
+                    restantes.append(photo)
+            objet.photos = restantes or None
+
+def _noter_images(session, flush_context):
+    """Retient les images insérées par le flush : leurs vignettes seront générées après le commit"""
+    nouvelles = [
+        objet.id for objet in session.new
+        if isinstance(objet, PieceJointe) and objet.type_contenu.startswith('image/')
+    ]
+    if nouvelles:
+        session.info.setdefault('vignettes_a_generer', []).extend(nouvelles)
+
+def _planifier_vignettes(session):
+    ids = session.info.pop('vignettes_a_generer', None)
+    if ids:
+        ServicePiecesJointes.planifier_vignettes(ids)
+
+def _oublier_vignettes(session):
+    session.info.pop('vignettes_a_generer', None)
+
+class ServicePiecesJointes:
+    """Service des pièces jointes d'intervention (métadonnées en base, contenu dans le stockage de blobs)"""
+    
+    stockage = None  # Défini par extensions.pieces_jointes
+    
+    @staticmethod
+    def enregistrer_ecouteurs() -> None:
+        """Toute signature ou photo en base64 écrite sur une intervention est déplacée au flush"""
+        if not event.contains(db.session, 'before_flush', _extraire_donnees_inline):
+            event.listen(db.session, 'before_flush', _extraire_donnees_inline)
+            event.listen(db.session, 'after_flush', _noter_images)
+            event.listen(db.session, 'after_commit', _planifier_vignettes)
+            event.listen(db.session, 'after_rollback', _oublier_vignettes)
+    
+    @staticmethod
+    def enregistrer_fichier(intervention: Intervention, type_piece: str, flux, type_contenu: str,
+                            nom_fichier: Optional[str] = None) -> PieceJointe:
+        """Copie le flux dans le stockage (par blocs, dédupliqué) et rattache la pièce à l'intervention.
+        Lève ValueError si le type de contenu n'est pas accepté, TailleDepassee si le fichier est trop gros."""
+        type_contenu = (type_contenu or '').split(';')[0].strip().lower()
+        if type_contenu not in current_app.config['PIECES_JOINTES_TYPES']:
+            raise ValueError(f"Type de fichier non accepté: {type_contenu or 'inconnu'}")
+        
+        stockage = ServicePiecesJointes.stockage
+        empreinte, taille = stockage.enregistrer_flux(flux, current_app.config['PIECES_JOINTES_TAILLE_MAX'])
+        largeur, hauteur = (None, None)
+        if type_contenu.startswith('image/'):
+            largeur, hauteur = _dimensions(stockage.chemin(empreinte))
+        
+        piece = PieceJointe(
+            type_piece=type_piece,
+            empreinte=empreinte,
+            type_contenu=type_contenu,
+            taille=taille,
+            nom_fichier=(nom_fichier or '')[:255] or None,
+            largeur=largeur,
+            hauteur=hauteur
+        )
+        intervention.pieces_jointes.append(piece)
+        return piece
+    
+    @staticmethod
+    def enregistrer_signature(intervention: Intervention, texte: str) -> PieceJointe:
+        """Compresse une signature base64 (data URL) et remplace la signature précédente de l'intervention.
+        Lève ValueError si l'image est invalide."""
+        contenu, _ = decoder_data_url(texte)
+        octets, type_contenu, largeur, hauteur = compresser_signature(
+            contenu,
+            current_app.config['SIGNATURE_FORMAT'],
+            current_app.config['SIGNATURE_LARGEUR_MAX']
+        )
+        empreinte, taille = ServicePiecesJointes.stockage.enregistrer_octets(octets)
+        
+        if intervention.id is not None:
+            for ancienne in intervention.pieces_jointes.filter_by(type_piece='signature'):
+                db.session.delete(ancienne)
+        piece = PieceJointe(
+            type_piece='signature',
+            empreinte=empreinte,
+            type_contenu=type_contenu,
+            taille=taille,
+            nom_fichier='signature' + ('.webp' if type_contenu == 'image/webp' else '.png'),
+            largeur=largeur,
+            hauteur=hauteur
+        )
+        intervention.pieces_jointes.append(piece)
+        return piece
+    
+    @staticmethod
+    def planifier_vignettes(ids: Iterable[int]) -> None:
+        """Soumet la génération des vignettes au pool (hors de la requête de téléversement)"""
+        app = current_app._get_current_object()
+        executeur = _obtenir_executeur(app.config['VIGNETTES_THREADS'])
+        for piece_id in ids:
+            executeur.submit(ServicePiecesJointes._generer_vignette_tache, app, piece_id)
+    
+    @staticmethod
+    def _generer_vignette_tache(app, piece_id: int) -> None:
+        with app.app_context():
+            try:
+                piece = db.session.get(PieceJointe, piece_id)
+                if piece is not None and not piece.empreinte_vignette:
+                    empreinte = ServicePiecesJointes._produire_vignette(piece)
+                    if empreinte:
+                        ServicePiecesJointes._noter_vignettes({piece_id: empreinte})
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erreur lors de la génération de la vignette de la pièce jointe {piece_id}: {str(e)}")
+            finally:
+                db.session.remove()
+    
+    @staticmethod
+    def _enregistrer_vignettes_tache(app, empreintes: Dict[int, str]) -> None:
+        with app.app_context():
+            try:
+                ServicePiecesJointes._noter_vignettes(empreintes)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erreur lors de l'enregistrement des vignettes {list(empreintes)}: {str(e)}")
+            finally:
+                db.session.remove()
+    
+    @staticmethod
+    def _noter_vignettes(empreintes: Dict[int, str]) -> None:
+        """Enregistre les empreintes de vignettes (session du pool, jamais celle d'une requête)"""
+        table = PieceJointe.__table__
+        # UPDATE direct : ne pas toucher date_modification ni déclencher les écouteurs du modèle
+        for piece_id, empreinte in empreintes.items():
+            db.session.execute(
+                table.update()
+                .where(table.c.id == piece_id, table.c.empreinte_vignette.is_(None))
+                .values(empreinte_vignette=empreinte)
+            )
+        db.session.commit()
+    
+    @staticmethod
+    def _produire_vignette(piece: PieceJointe) -> Optional[str]:
+        """Écrit la vignette d'une image dans le stockage (sans écrire en base) et retourne son empreinte"""
+        # Même contenu déjà vignetté pour une autre pièce (dédupliqué)
+        empreinte = db.session.query(PieceJointe.empreinte_vignette).filter(
+            PieceJointe.empreinte == piece.empreinte,
+            PieceJointe.empreinte_vignette.isnot(None)
+        ).limit(1).scalar()
+        if empreinte:
+            return empreinte
+        stockage = ServicePiecesJointes.stockage
+        try:
+            with stockage.ouvrir(piece.empreinte) as flux:
+                octets, _, _, _ = creer_vignette(
+                    flux,
+                    current_app.config['VIGNETTE_TAILLE'],
+                    current_app.config['VIGNETTE_QUALITE']
+                )
+        except (ValueError, FileNotFoundError) as e:
+            logger.warning(f"Pas de vignette pour la pièce jointe {piece.id}: {str(e)}")
+            return None
+        empreinte, _ = stockage.enregistrer_octets(octets)
+        return empreinte
+    
+    @staticmethod
+    def _vignettes(pieces: Iterable[PieceJointe]) -> Dict[int, str]:
+        """Empreintes des vignettes des pièces images, générées maintenant si le pool ne l'a pas encore fait.
+        Les nouvelles empreintes sont enregistrées par le pool, en un seul commit, hors de la session appelante."""
+        empreintes: Dict[int, str] = {}
+        a_noter: Dict[int, str] = {}
+        for piece in pieces:
+            if not piece.type_contenu.startswith('image/'):
+                continue
+            empreinte = piece.empreinte_vignette
+            if not empreinte:
+                empreinte = ServicePiecesJointes._produire_vignette(piece)
+                if empreinte:
+                    a_noter[piece.id] = empreinte
+            if empreinte:
+                empreintes[piece.id] = empreinte
+        if a_noter:
+            app = current_app._get_current_object()
+            _obtenir_executeur(app.config['VIGNETTES_THREADS']).submit(
+                ServicePiecesJointes._enregistrer_vignettes_tache, app, a_noter
+            )
+        return empreintes
+    
+    @staticmethod
+    def vignette(piece: PieceJointe) -> Optional[str]:
+        """Empreinte de la vignette d'une image, générée maintenant si le pool ne l'a pas encore fait.
+        None si la pièce n'est pas une image lisible. Ne modifie pas la session courante."""
+        return ServicePiecesJointes._vignettes([piece]).get(piece.id)
+    
+    @staticmethod
+    def chemins_vignettes(intervention_ids: Iterable[int]) -> Dict[int, List[str]]:
+        """Chemins locaux des vignettes des photos, par intervention, en une requête (pour les PDF)"""
+        ids = list(intervention_ids)
+        if not ids:
+            return {}
+        pieces = PieceJointe.query.filter(
+            PieceJointe.intervention_id.in_(ids),
+            PieceJointe.type_piece == 'photo'
+        ).order_by(PieceJointe.intervention_id, PieceJointe.id).all()
+        empreintes = ServicePiecesJointes._vignettes(pieces)
+        
+        chemins: Dict[int, List[str]] = {}
+        for piece in pieces:
+            empreinte = empreintes.get(piece.id)
+            chemin = ServicePiecesJointes.stockage.chemin(empreinte) if empreinte else None
+            if chemin:
+                chemins.setdefault(piece.intervention_id, []).append(chemin)
+        return chemins
+    
+    @staticmethod
+    def lister(intervention_id: int) -> List[PieceJointe]:
+        return PieceJointe.query.filter_by(intervention_id=intervention_id).order_by(PieceJointe.id).all()
+    
+    @staticmethod
+    def obtenir(intervention_id: int, piece_id: int) -> Optional[PieceJointe]:
+        return PieceJointe.query.filter_by(intervention_id=intervention_id, id=piece_id).first()
+    
+    @staticmethod
+    def supprimer(piece: PieceJointe) -> None:
+        """Supprime la pièce, et son contenu s'il n'est plus référencé"""
+        empreintes = [e for e in (piece.empreinte, piece.empreinte_vignette) if e]
+        db.session.delete(piece)
+        db.session.commit()
+        for empreinte in empreintes:
+            if not db.session.query(PieceJointe.id).filter(or_(
+                PieceJointe.empreinte == empreinte, PieceJointe.empreinte_vignette == empreinte
+            )).first():
+                ServicePiecesJointes.stockage.supprimer(empreinte)
+    
+    @staticmethod
+    def purger_orphelins() -> int:
+        """Supprime les blobs qu'aucune pièce jointe ne référence (pièces supprimées avec leur intervention)"""
+        stockage = ServicePiecesJointes.stockage
+        referencees = set()
+        for empreinte, empreinte_vignette in db.session.query(PieceJointe.empreinte, PieceJointe.empreinte_vignette):
+            referencees.update((empreinte, empreinte_vignette))
+        limite = time.time() - AGE_MIN_ORPHELIN
+        nombre = 0
+        for empreinte in list(stockage.empreintes()):
+            if empreinte in referencees:
+                continue
+            chemin = stockage.chemin(empreinte)
+            if chemin and os.path.getmtime(chemin) > limite:
+                continue
+            stockage.supprimer(empreinte)
+            nombre += 1
+        logger.info(f"{nombre} pièces jointes orphelines supprimées")
+        return nombre
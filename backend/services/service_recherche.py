@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from sqlalchemy import event, inspect
+from extensions.base_donnees import db
+from modeles.patient import Patient
+from modeles.dispositif_medical import DispositifMedical
+from modeles.utilisateur import Utilisateur
+from modeles.terme_recherche import TermeRecherche
+from depots.depot_recherche import DepotRecherche
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Modèle -> (nom de l'entité dans l'index, colonnes indexées)
+CHAMPS = {
+    Patient: ('patient', ['code_patient', 'nom', 'prenom', 'telephone', 'cin']),
+    DispositifMedical: ('dispositif', ['designation', 'reference', 'numero_serie']),
+    Utilisateur: ('utilisateur', ['nom', 'prenom']),
+}
+
+# Colonnes cherchées aussi en milieu de valeur (téléphone, CIN) : tous leurs suffixes sont indexés,
+# un préfixe de suffixe étant une sous-chaîne quelconque
+SOUS_CHAINES = {
+    Patient: {'telephone', 'cin'},
+}
+
+def termes(modele, lire: Callable[[str], Any]) -> List[str]:
+    """Mots indexés pour une ligne ; une valeur en plusieurs morceaux (téléphone, code)
+    est aussi indexée collée, pour qu'une saisie sans séparateurs la retrouve"""
+    resultat = set()
+    sous_chaines = SOUS_CHAINES.get(modele, set())
+    for colonne in CHAMPS[modele][1]:
+        mots = DepotRecherche.normaliser(lire(colonne))
+        resultat.update(mots)
+        colle = ''.join(mots)[:64]
+        if len(mots) > 1:
+            resultat.add(colle)
+        if colonne in sous_chaines:
+            resultat.update(colle[debut:] for debut in range(1, len(colle)))
+    return sorted(resultat)
+
+def _lignes(entite: str, entite_id: int, mots: List[str]) -> List[Dict[str, Any]]:
+    maintenant = datetime.utcnow()
+    return [
+        {
+            'entite': entite, 'entite_id': entite_id, 'terme': mot,
+            'date_creation': maintenant, 'date_modification': maintenant
+        }
+        for mot in mots
+    ]
+
+# --- Écouteurs SQLAlchemy : l'index est tenu à jour dans la transaction du flush ---
+
+def _indexer(connection, target):
+    entite = CHAMPS[type(target)][0]
+    lignes = _lignes(entite, target.id, termes(type(target), lambda colonne: getattr(target, colonne)))
+    if lignes:
+        connection.execute(TermeRecherche.__table__.insert(), lignes)
+
+def _desindexer(connection, target):
+    table = TermeRecherche.__table__
+    connection.execute(
+        table.delete().where(
+            (table.c.entite == CHAMPS[type(target)][0]) & (table.c.entite_id == target.id)
+        )
+    )
+
+def _apres_insertion(mapper, connection, target):
+    _indexer(connection, target)
+
+def _apres_modification(mapper, connection, target):
+    etat = inspect(target)
+    if not any(etat.attrs[colonne].history.has_changes() for colonne in CHAMPS[type(target)][1]):
+        return
+    _desindexer(connection, target)
+    _indexer(connection, target)
+
+def _apres_suppression(mapper, connection, target):
+    _desindexer(connection, target)
+
+class ServiceRecherche:
+    """Service de maintenance de l'index de recherche (table index_recherche)"""
+    
+    @staticmethod
+    def enregistrer_ecouteurs() -> None:
+        """Branche la mise à jour de l'index sur les événements des modèles indexés"""
+        for modele in CHAMPS:
+            if event.contains(modele, 'after_insert', _apres_insertion):
+                continue
+            event.listen(modele, 'after_insert', _apres_insertion)
+            event.listen(modele, 'after_update', _apres_modification)
+            event.listen(modele, 'after_delete', _apres_suppression)
+    
+    @staticmethod
+    def indexer_lignes(modele, lignes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Lignes d'index pour des dictionnaires déjà insérés (avec 'id'), par ex. après un import en masse"""
+        entite = CHAMPS[modele][0]
+        resultat = []
+        for ligne in lignes:
+            resultat.extend(_lignes(entite, ligne['id'], termes(modele, ligne.get)))
+        return resultat
+    
+    @staticmethod
+    def reconstruire(taille_lot: int = 1000) -> int:
+        """Recalcule entièrement l'index à partir des tables sources"""
+        TermeRecherche.query.delete()
+        total = 0
+        for modele, (entite, colonnes) in CHAMPS.items():
+            # Pagination par id avec des requêtes ordinaires (résultat lu en entier) : pas de curseur
+            # côté serveur, dont pymysql abandonnerait la suite à la première insertion sur la connexion
+            dernier_id = 0
+            while True:
+                lignes = db.session.query(modele.id, *[getattr(modele, c) for c in colonnes]) \
+                    .filter(modele.id > dernier_id).order_by(modele.id).limit(taille_lot).all()
+                if not lignes:
+                    break
+                lot = []
+                for ligne in lignes:
+                    valeurs = dict(zip(['id'] + colonnes, ligne))
+                    lot.extend(_lignes(entite, valeurs['id'], termes(modele, valeurs.get)))
+                if lot:
+                    db.session.bulk_insert_mappings(TermeRecherche, lot)
+                    total += len(lot)
+                dernier_id = lignes[-1][0]
+        db.session.commit()
+        logger.info(f"Index de recherche reconstruit: {total} termes")
+        return total
@@ -0,0 +1,277 @@
+from collections import Counter
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import case, event, func, inspect
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions.base_donnees import db
+from modeles.patient import Patient
+from modeles.dispositif_medical import DispositifMedical
+from modeles.intervention import Intervention
+from modeles.stat_journaliere import StatJournaliere
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Jour utilisé pour les lignes sans date (données historiques incomplètes)
+JOUR_INCONNU = date(1970, 1, 1)
+
+# Tranches d'âge (âge exact au jour près) : (libellé, âge maximal inclus ou None)
+TRANCHES_AGE = [('0-18', 18), ('19-35', 35), ('36-55', 55), ('56-70', 70), ('70+', None)]
+
+# Modèle -> (colonne qui donne le jour, {dimension: colonne de la valeur, None pour le total})
+# Une valeur presque unique par ligne (date de naissance, désignation...) ferait du cumul une copie
+# de la table : elle est laissée à une requête d'agrégat sur la table source
+DIMENSIONS = {
+    Patient: ('date_creation', {
+        'patient': None,
+        'patient.ville': 'ville',
+        'patient.prescripteur_id': 'prescripteur_id',
+    }),
+    DispositifMedical: ('date_creation', {
+        'dispositif': None,
+        'dispositif.statut': 'statut',
+        'dispositif.type_acquisition': 'type_acquisition',
+    }),
+    Intervention: ('date_planifiee', {
+        'intervention': None,
+        'intervention.statut': 'statut',
+        'intervention.traitement': 'traitement',
+        'intervention.type_intervention': 'type_intervention',
+    }),
+}
+
+def _colonnes(modele) -> List[str]:
+    colonne_jour, dimensions = DIMENSIONS[modele]
+    return [colonne_jour] + sorted({colonne for colonne in dimensions.values() if colonne})
+
+Cle = Tuple[date, str, str]
+
+def _jour(valeur) -> date:
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    if isinstance(valeur, date):
+        return valeur
+    return JOUR_INCONNU
+
+def _valeur(valeur) -> str:
+    if valeur is None:
+        return ''
+    if isinstance(valeur, (date, datetime)):
+        return valeur.isoformat()
+    return str(valeur)[:100]
+
+def contributions(modele, lire: Callable[[str], Any]) -> List[Cle]:
+    """Liste des clés (jour, dimension, valeur) auxquelles une ligne contribue"""
+    colonne_jour, dimensions = DIMENSIONS[modele]
+    jour = _jour(lire(colonne_jour))
+    cles = []
+    for dimension, colonne in dimensions.items():
+        valeur = _valeur(lire(colonne)) if colonne else ''
+        cles.append((jour, dimension, valeur))
+    return cles
+
+def appliquer_deltas(connection, deltas: Dict[Cle, int]) -> None:
+    """Ajoute les deltas aux compteurs, en créant les lignes manquantes (upsert)"""
+    table = StatJournaliere.__table__
+    dialecte = connection.dialect.name
+    maintenant = datetime.utcnow()
+
+    for (jour, dimension, valeur), delta in deltas.items():
+        if not delta:
+            continue
+        ligne = {
+            'jour': jour, 'dimension': dimension, 'valeur': valeur, 'nombre': delta,
+            'date_creation': maintenant, 'date_modification': maintenant
+        }
+        if dialecte == 'mysql':
+            stmt = mysql_insert(table).values(**ligne)
+            stmt = stmt.on_duplicate_key_update(
+                nombre=table.c.nombre + delta, date_modification=maintenant
+            )
+            connection.execute(stmt)
+        elif dialecte == 'sqlite':
+            stmt = sqlite_insert(table).values(**ligne).on_conflict_do_update(
+                index_elements=['jour', 'dimension', 'valeur'],
+                set_={'nombre': table.c.nombre + delta, 'date_modification': maintenant}
+            )
+            connection.execute(stmt)
+        else:
+            resultat = connection.execute(
+                table.update().where(
+                    (table.c.jour == jour) &
+                    (table.c.dimension == dimension) &
+                    (table.c.valeur == valeur)
+                ).values(nombre=table.c.nombre + delta, date_modification=maintenant)
+            )
+            if resultat.rowcount == 0:
+                connection.execute(table.insert().values(**ligne))
+
+# --- Écouteurs SQLAlchemy : mise à jour incrémentale dans la transaction du flush ---
+
+def _apres_insertion(mapper, connection, target):
+    cles = contributions(type(target), lambda colonne: getattr(target, colonne))
+    appliquer_deltas(connection, Counter(cles))
+
+def _apres_modification(mapper, connection, target):
+    etat = inspect(target)
+
+    def ancienne_valeur(colonne):
+        historique = etat.attrs[colonne].history
+        if historique.deleted:
+            return historique.deleted[0]
+        return getattr(target, colonne)
+
+    deltas = Counter(contributions(type(target), lambda colonne: getattr(target, colonne)))
+    deltas.subtract(contributions(type(target), ancienne_valeur))
+    appliquer_deltas(connection, deltas)
+
+def _avant_suppression(mapper, connection, target):
+    # Lire les valeurs tant que la ligne existe encore (l'objet peut être expiré)
+    target._stats_contributions = contributions(type(target), lambda colonne: getattr(target, colonne))
+
+def _apres_suppression(mapper, connection, target):
+    cles = getattr(target, '_stats_contributions', None) or []
+    appliquer_deltas(connection, {cle: -nombre for cle, nombre in Counter(cles).items()})
+
+def _ignorer(target, valeur, ancienne_valeur, initiateur):
+    return valeur
+
+def _anniversaire(jour: date, annees: int) -> date:
+    """Date de naissance des personnes qui ont exactement `annees` ans le jour donné (29 février -> 28)"""
+    try:
+        return jour.replace(year=jour.year - annees)
+    except ValueError:
+        return jour.replace(year=jour.year - annees, day=28)
+
+def _filtrer(query, dimension: str, depuis: Optional[date], jusqua: Optional[date]):
+    query = query.filter(StatJournaliere.dimension == dimension)
+    if depuis:
+        query = query.filter(StatJournaliere.jour >= _jour(depuis))
+    if jusqua:
+        query = query.filter(StatJournaliere.jour <= _jour(jusqua))
+    return query
+
+class ServiceStatistiques:
+    """Service de cumul journalier des statistiques (table stats_journalieres)"""
+    
+    @staticmethod
+    def enregistrer_ecouteurs() -> None:
+        """Branche le cumul incrémental sur les événements des modèles suivis"""
+        for modele in DIMENSIONS:
+            if event.contains(modele, 'after_insert', _apres_insertion):
+                continue
+            event.listen(modele, 'after_insert', _apres_insertion)
+            event.listen(modele, 'after_update', _apres_modification)
+            event.listen(modele, 'before_delete', _avant_suppression)
+            event.listen(modele, 'after_delete', _apres_suppression)
+
+            # active_history : l'ancienne valeur est chargée même si l'attribut était expiré,
+            # sinon le décrément de l'ancienne clé serait perdu
+            for colonne in _colonnes(modele):
+                event.listen(getattr(modele, colonne), 'set', _ignorer, retval=True, active_history=True)
+    
+    @staticmethod
+    def reconstruire(taille_lot: int = 1000) -> int:
+        """Recalcule entièrement la table de cumul à partir des tables sources"""
+        compteurs = Counter()
+        for modele in DIMENSIONS:
+            colonnes = _colonnes(modele)
+            query = db.session.query(*[getattr(modele, c) for c in colonnes]).yield_per(taille_lot)
+            for ligne in query:
+                valeurs = dict(zip(colonnes, ligne))
+                compteurs.update(contributions(modele, valeurs.get))
+
+        StatJournaliere.query.delete()
+        maintenant = datetime.utcnow()
+        db.session.bulk_insert_mappings(StatJournaliere, [
+            {
+                'jour': jour, 'dimension': dimension, 'valeur': valeur, 'nombre': nombre,
+                'date_creation': maintenant, 'date_modification': maintenant
+            }
+            for (jour, dimension, valeur), nombre in compteurs.items()
+        ])
+        db.session.commit()
+        logger.info(f"Statistiques journalières reconstruites: {len(compteurs)} lignes")
+        return len(compteurs)
+    
+    @staticmethod
+    def compter(dimension: str, depuis: Optional[date] = None, jusqua: Optional[date] = None) -> Dict[Optional[str], int]:
+        """Répartition d'une dimension {valeur: nombre}, '' étant rendu comme None"""
+        somme = func.sum(StatJournaliere.nombre)
+        query = _filtrer(db.session.query(StatJournaliere.valeur, somme), dimension, depuis, jusqua)
+        lignes = query.group_by(StatJournaliere.valeur).having(somme > 0).all()
+        return {(valeur or None): int(nombre) for valeur, nombre in lignes}
+    
+    @staticmethod
+    def total(dimension: str, depuis: Optional[date] = None, jusqua: Optional[date] = None) -> int:
+        """Total d'une dimension sur la période"""
+        query = _filtrer(db.session.query(func.sum(StatJournaliere.nombre)), dimension, depuis, jusqua)
+        return int(query.scalar() or 0)
+    
+    @staticmethod
+    def compter_par_mois(dimension: str, depuis: Optional[date] = None) -> Dict[Tuple[int, int], int]:
+        """Total par (année, mois) calculé à partir des lignes journalières"""
+        query = _filtrer(
+            db.session.query(StatJournaliere.jour, func.sum(StatJournaliere.nombre)),
+            dimension, depuis, None
+        )
+        resultat = Counter()
+        for jour, nombre in query.group_by(StatJournaliere.jour).all():
+            resultat[(jour.year, jour.month)] += int(nombre)
+        return dict(resultat)
+    
+    @staticmethod
+    def tranches_age(aujourd_hui: Optional[date] = None) -> Dict[str, int]:
+        """Patients par tranche d'âge exact (date de naissance complète), en une requête d'agrégat"""
+        aujourd_hui = aujourd_hui or date.today()
+        # Âge <= maximum tant que le (maximum + 1)-ième anniversaire n'est pas passé
+        tranche = case(
+            *[
+                (Patient.date_naissance > _anniversaire(aujourd_hui, maximum + 1), libelle)
+                for libelle, maximum in TRANCHES_AGE if maximum is not None
+            ],
+            else_=TRANCHES_AGE[-1][0]
+        )
+        lignes = db.session.query(tranche, func.count(Patient.id)).filter(
+            Patient.date_naissance.isnot(None)
+        ).group_by(tranche).all()
+        nombres = dict(lignes)
+        return {libelle: int(nombres.get(libelle, 0)) for libelle, _ in TRANCHES_AGE}
+    
+    @staticmethod
+    def lisible_dans_cumul(date_debut=None, date_fin=None) -> bool:
+        """Vrai si la période correspond à des jours entiers, donc lisible dans le cumul journalier"""
+        if isinstance(date_debut, datetime) and date_debut.time() != time.min:
+            return False
+        if isinstance(date_fin, datetime) and date_fin.time() != time.max:
+            return False
+        return True
+    
+    @staticmethod
+    def statistiques_interventions(date_debut=None, date_fin=None) -> Dict[str, Any]:
+        """Statistiques des interventions (par statut, traitement, type) sur une période"""
+        if ServiceStatistiques.lisible_dans_cumul(date_debut, date_fin):
+            return {
+                'total': ServiceStatistiques.total('intervention', date_debut, date_fin),
+                'par_statut': ServiceStatistiques.compter('intervention.statut', date_debut, date_fin),
+                'par_traitement': ServiceStatistiques.compter('intervention.traitement', date_debut, date_fin),
+                'par_type': ServiceStatistiques.compter('intervention.type_intervention', date_debut, date_fin)
+            }
+
+        # Période à l'heure près : agrégation directe sur la table
+        def repartition(colonne):
+            query = db.session.query(colonne, func.count(Intervention.id))
+            if date_debut:
+                query = query.filter(Intervention.date_planifiee >= date_debut)
+            if date_fin:
+                query = query.filter(Intervention.date_planifiee <= date_fin)
+            return {valeur: nombre for valeur, nombre in query.group_by(colonne).all()}
+
+        par_statut = repartition(Intervention.statut)
+        return {
+            'total': sum(par_statut.values()),
+            'par_statut': par_statut,
+            'par_traitement': repartition(Intervention.traitement),
+            'par_type': repartition(Intervention.type_intervention)
+        }
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.orm import joinedload
+from extensions.base_donnees import db
+from modeles.intervention import Intervention
+from modeles.patient import Patient
+from modeles.dispositif_medical import DispositifMedical
+from modeles.suppression import Suppression
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Modèle -> nom de l'entité dans les traces de suppression
+ENTITES = {
+    Intervention: 'intervention',
+    Patient: 'patient',
+    DispositifMedical: 'dispositif',
+}
+
+# Recouvrement entre deux synchronisations : une transaction qui a daté ses lignes juste
+# avant la lecture mais validé juste après reste visible au passage suivant
+MARGE_SYNC = timedelta(seconds=5)
+
+def _tracer(connection, entite: str, entite_id: int, technicien_id: Optional[int] = None) -> None:
+    maintenant = datetime.utcnow()
+    connection.execute(Suppression.__table__.insert().values(
+        entite=entite,
+        entite_id=entite_id,
+        technicien_id=technicien_id,
+        date_creation=maintenant,
+        date_modification=maintenant
+    ))
+
+# --- Écouteurs SQLAlchemy : traces écrites dans la transaction de la suppression ---
+
+def _apres_suppression(mapper, connection, target):
+    technicien_id = target.technicien_id if isinstance(target, Intervention) else None
+    _tracer(connection, ENTITES[type(target)], target.id, technicien_id)
+
+def _ancien_technicien(target) -> Optional[int]:
+    historique = inspect(target).attrs.technicien_id.history
+    if historique.deleted and historique.deleted[0] not in (None, target.technicien_id):
+        return historique.deleted[0]
+    return None
+
+def _apres_modification(mapper, connection, target):
+    # Une intervention réaffectée disparaît du périmètre de l'ancien technicien
+    ancien = _ancien_technicien(target)
+    if ancien:
+        _tracer(connection, 'intervention', target.id, ancien)
+
+def _apres_modification_patient(mapper, connection, target):
+    # Un patient réattribué disparaît du périmètre de l'ancien technicien,
+    # sauf s'il y figure encore par une de ses interventions
+    ancien = _ancien_technicien(target)
+    if not ancien:
+        return
+    table = Intervention.__table__
+    encore_lie = connection.execute(
+        select(table.c.id).where(
+            (table.c.patient_id == target.id) & (table.c.technicien_id == ancien)
+        ).limit(1)
+    ).first()
+    if not encore_lie:
+        _tracer(connection, 'patient', target.id, ancien)
+
+def _ignorer(target, valeur, ancienne_valeur, initiateur):
+    return valeur
+
+class ServiceSync:
+    """Service de synchronisation différentielle pour le client mobile des techniciens"""
+    
+    @staticmethod
+    def enregistrer_ecouteurs() -> None:
+        """Branche l'écriture des traces de suppression"""
+        if event.contains(Intervention, 'after_update', _apres_modification):
+            return
+        for modele in ENTITES:
+            event.listen(modele, 'after_delete', _apres_suppression)
+        event.listen(Intervention, 'after_update', _apres_modification)
+        event.listen(Intervention.technicien_id, 'set', _ignorer, retval=True, active_history=True)
+        event.listen(Patient, 'after_update', _apres_modification_patient)
+        event.listen(Patient.technicien_id, 'set', _ignorer, retval=True, active_history=True)
+    
+    @staticmethod
+    def delta(depuis: Optional[datetime] = None, technicien_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Lignes modifiées depuis le repère (tout le périmètre si depuis est None) et
+        identifiants supprimés. Un technicien ne reçoit que ses interventions, et les
+        patients et dispositifs qui y figurent ou qui lui sont attribués.
+        """
+        horodatage = datetime.utcnow() - MARGE_SYNC
+        
+        query = Intervention.query.options(joinedload(Intervention.reglage))
+        if technicien_id:
+            query = query.filter(Intervention.technicien_id == technicien_id)
+        if depuis:
+            query = query.filter(Intervention.date_modification > depuis)
+        interventions = query.order_by(Intervention.id).all()
+        
+        query = Patient.query.options(joinedload(Patient.prescripteur))
+        if technicien_id:
+            mes_patients = db.session.query(Intervention.patient_id).filter(
+                Intervention.technicien_id == technicien_id
+            )
+            query = query.filter(or_(Patient.technicien_id == technicien_id, Patient.id.in_(mes_patients)))
+        if depuis:
+            recents = Patient.date_modification > depuis
+            # Patient entré dans le périmètre par une intervention nouvellement affectée
+            ids = {i.patient_id for i in interventions}
+            query = query.filter(or_(recents, Patient.id.in_(ids)) if technicien_id and ids else recents)
+        patients = query.order_by(Patient.id).all()
+        
+        query = DispositifMedical.query
+        if technicien_id:
+            mes_dispositifs = db.session.query(Intervention.dispositif_id).filter(
+                Intervention.technicien_id == technicien_id
+            )
+            query = query.filter(DispositifMedical.id.in_(mes_dispositifs))
+        if depuis:
+            recents = DispositifMedical.date_modification > depuis
+            ids = {i.dispositif_id for i in interventions}
+            query = query.filter(or_(recents, DispositifMedical.id.in_(ids)) if technicien_id and ids else recents)
+        dispositifs = query.order_by(DispositifMedical.id).all()
+        
+        suppressions = {entite: [] for entite in ENTITES.values()}
+        if depuis:
+            query = db.session.query(Suppression.entite, Suppression.entite_id).filter(
+                Suppression.date_creation > depuis
+            )
+            if technicien_id:
+                query = query.filter(or_(
+                    Suppression.technicien_id.is_(None),
+                    Suppression.technicien_id == technicien_id
+                ))
+            for entite, entite_id in query.order_by(Suppression.id):
+                suppressions[entite].append(entite_id)
+        
+        return {
+            'horodatage': horodatage.isoformat(),
+            'complet': depuis is None,
+            'interventions': [i.to_dict() for i in interventions],
+            'patients': [p.to_dict() for p in patients],
+            'dispositifs': [d.to_dict() for d in dispositifs],
+            'suppressions': suppressions
+        }
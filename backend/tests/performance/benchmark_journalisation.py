@@ -0,0 +1,107 @@
+# tests/performance/benchmark_journalisation.py
+"""
+Micro-benchmark du coût de la journalisation sur le thread de la requête.
+
+    cd backend && python -m tests.performance.benchmark_journalisation --requetes 2000
+
+Rejoue les événements d'un GET /api/interventions de --lignes lignes :
+- avant : basicConfig(DEBUG) vers un flux, f-strings évaluées pour chaque ligne et
+  RotatingFileHandler synchrone (maxBytes=10240) sur le logger de l'application ;
+- après : extensions.journalisation (file + thread d'écriture JSON), au niveau INFO
+  de production puis au niveau DEBUG avec échantillonnage.
+Affiche le temps par requête (moyenne, médiane, p95) vu par le thread appelant.
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from types import SimpleNamespace
+
+from config import Config
+from extensions import journalisation
+from extensions.journalisation import ECHANTILLON
+
+def _reinitialiser():
+    racine = logging.getLogger()
+    for handler in list(racine.handlers):
+        racine.removeHandler(handler)
+    for nom in ('routes.interventions', 'app'):
+        logger = logging.getLogger(nom)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        logger.setLevel(logging.NOTSET)
+
+def requete_avant(logger, app_logger, lignes):
+    logger.debug(f"Query parameters: recherche={''}, technicien_id={None}, statut={None}, type={None}")
+    for id in range(lignes):
+        logger.debug(f"Patient data added for intervention {id}")
+        logger.debug(f"Device data added for intervention {id}")
+        logger.debug(f"Technician data added for intervention {id}")
+        logger.debug(f"Reglage data added for intervention {id}")
+        logger.debug(f"Successfully processed intervention {id}")
+    app_logger.info(f"GET /api/interventions {lignes} lignes")
+
+def requete_apres(logger, app_logger, lignes):
+    logger.debug("Query parameters: recherche=%s, technicien_id=%s, statut=%s, type=%s", '', None, None, None)
+    for id in range(lignes):
+        logger.debug("Patient data added for intervention %s", id, extra=ECHANTILLON)
+        logger.debug("Device data added for intervention %s", id, extra=ECHANTILLON)
+        logger.debug("Technician data added for intervention %s", id, extra=ECHANTILLON)
+        logger.debug("Reglage data added for intervention %s", id, extra=ECHANTILLON)
+        logger.debug("Successfully processed intervention %s", id, extra=ECHANTILLON)
+    app_logger.info("GET /api/interventions %s lignes", lignes)
+
+def configurer_avant(dossier):
+    _reinitialiser()
+    flux = open(os.path.join(dossier, 'stderr.log'), 'w')
+    logging.basicConfig(level=logging.DEBUG, stream=flux, force=True)
+    app_logger = logging.getLogger('app')
+    fichier = RotatingFileHandler(os.path.join(dossier, 'avant.log'), maxBytes=10240, backupCount=10)
+    fichier.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'))
+    app_logger.addHandler(fichier)
+    app_logger.setLevel(logging.INFO)
+    return requete_avant
+
+def configurer_apres(dossier, niveau):
+    _reinitialiser()
+    config = {cle: getattr(Config, cle) for cle in dir(Config) if cle.startswith('LOG_')}
+    config.update(LOG_FICHIER=os.path.join(dossier, f'apres_{niveau}.log'), LOG_CONSOLE=False, LOG_NIVEAU=niveau)
+    journalisation.init_app(SimpleNamespace(config=config))
+    return requete_apres
+
+def mesurer(requete, requetes, lignes):
+    logger = logging.getLogger('routes.interventions')
+    app_logger = logging.getLogger('app')
+    requete(logger, app_logger, lignes)
+    durees = []
+    for _ in range(requetes):
+        debut = time.perf_counter()
+        requete(logger, app_logger, lignes)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+def afficher(libelle, durees):
+    durees_us = sorted(d * 1e6 for d in durees)
+    print(f"{libelle:<28} moyenne {statistics.mean(durees_us):8.1f} µs, "
+          f"médiane {statistics.median(durees_us):8.1f} µs, "
+          f"p95 {durees_us[int(len(durees_us) * 0.95) - 1]:8.1f} µs")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requetes', type=int, default=2000, help='Nombre de requêtes simulées')
+    parser.add_argument('--lignes', type=int, default=20, help='Lignes par page de la liste')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        afficher('avant (DEBUG synchrone)', mesurer(configurer_avant(dossier), args.requetes, args.lignes))
+        afficher('après (INFO, file)', mesurer(configurer_apres(dossier, 'INFO'), args.requetes, args.lignes))
+        afficher('après (DEBUG échantillonné)', mesurer(configurer_apres(dossier, 'DEBUG'), args.requetes, args.lignes))
+        journalisation._arreter()
+        _reinitialiser()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# tests/performance/benchmark_pdf.py
+"""
+Micro-benchmark du rendu des fiches contrôle PDF (sans base de données).
+
+    cd backend && python -m tests.performance.benchmark_pdf --nombre 1000
+
+Affiche le temps par document (moyenne, médiane, p95) et le pic mémoire du processus ;
+--tracemalloc ajoute le pic des allocations Python (le rendu est alors nettement plus lent).
+"""
+import argparse
+import resource
+import statistics
+import time
+import tracemalloc
+from datetime import date
+from types import SimpleNamespace
+
+from utils.pdf_generator import generate_intervention_pdf
+
+def intervention_exemple(numero):
+    """Instantané représentatif d'une intervention PPC terminée"""
+    return SimpleNamespace(
+        id=numero,
+        traitement='PPC',
+        type_intervention='Installation',
+        parametres={'pression': 10},
+        type_concentrateur=None,
+        mode_ventilation='Auto',
+        type_masque='Nasal',
+        consommables_utilises={'Filtre': True, 'Tuyau': True, 'Masque': False},
+        verification_securite={'Prise électrique': True, 'Alarmes': True, 'Câblage': True},
+        tests_effectues={'Test fuite': True, 'Test pression': 1},
+        remarques=f'Intervention {numero} réalisée sans incident.',
+        patient=SimpleNamespace(
+            nom=f'Patient{numero}', prenom='Test', date_naissance=date(1960, 1, 1),
+            adresse='12 rue des Lilas', telephone='0612345678', mutuelle='CNSS'
+        ),
+        technicien=SimpleNamespace(nom='Technicien', prenom='Test'),
+        dispositif=SimpleNamespace(designation='PPC ResMed', reference='AS10', numero_serie=f'SN{numero:06d}'),
+        reglage=SimpleNamespace(pmax=12.0, pmin=6.0, pramp=4.0, hu=3.0, re=1.0),
+    )
+
+def mesurer(nombre, suivre_allocations=False):
+    interventions = [intervention_exemple(i) for i in range(nombre)]
+    # Premier rendu hors mesure : imports et polices
+    generate_intervention_pdf(interventions[0])
+
+    durees = []
+    if suivre_allocations:
+        tracemalloc.start()
+    for intervention in interventions:
+        debut = time.perf_counter()
+        generate_intervention_pdf(intervention)
+        durees.append(time.perf_counter() - debut)
+    pic = None
+    if suivre_allocations:
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return durees, pic
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nombre', type=int, default=1000, help='Nombre de fiches à rendre')
+    parser.add_argument('--tracemalloc', action='store_true', help='Mesurer aussi le pic des allocations Python')
+    args = parser.parse_args()
+
+    durees, pic = mesurer(args.nombre, args.tracemalloc)
+    durees_ms = sorted(d * 1000 for d in durees)
+    print(f"{args.nombre} fiches rendues en {sum(durees):.2f} s")
+    print(f"par document : moyenne {statistics.mean(durees_ms):.2f} ms, "
+          f"médiane {statistics.median(durees_ms):.2f} ms, "
+          f"p95 {durees_ms[int(len(durees_ms) * 0.95) - 1]:.2f} ms")
+    # ru_maxrss est en Kio sous Linux
+    print(f"pic mémoire du processus (RSS) : {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} Mio")
+    if pic is not None:
+        print(f"pic des allocations Python (tracemalloc) : {pic / 1024:.0f} Kio")
+
+if __name__ == '__main__':
+    main()
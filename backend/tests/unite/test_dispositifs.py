@@ -0,0 +1,81 @@
+# tests/unite/test_dispositifs.py
+import unittest
+from sqlalchemy import event
+from app import creer_app
+from extensions.base_donnees import db
+from modeles.patient import Patient
+from modeles.dispositif_medical import DispositifMedical
+
+class TestRequetesDispositifs(unittest.TestCase):
+    """Tests de non-régression sur le nombre de requêtes SQL des routes dispositifs"""
+
+    def setUp(self):
+        """Configuration avant chaque test"""
+        self.app = creer_app('test')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        for i in range(30):
+            patient = Patient(nom=f'Nom{i}', prenom=f'Prenom{i}', code_patient=f'PT{i:04d}')
+            db.session.add(patient)
+            db.session.flush()
+            db.session.add(DispositifMedical(
+                patient_id=patient.id if i % 3 else None,
+                designation=f'Concentrateur {i}',
+                reference=f'REF{i}',
+                numero_serie=f'SN{i:04d}',
+                type_acquisition='location'
+            ))
+        db.session.commit()
+        db.session.remove()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def compter_requetes(self, fn):
+        """Exécute fn et retourne le nombre d'instructions SQL émises"""
+        requetes = []
+
+        def enregistrer(conn, cursor, statement, parameters, context, executemany):
+            requetes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', enregistrer)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', enregistrer)
+            db.session.remove()
+        return len(requetes)
+
+    def test_lister_dispositifs_nombre_constant_de_requetes(self):
+        """Le nombre de requêtes ne dépend pas de la taille de la page"""
+        def lister(per_page):
+            reponse = self.client.get(f'/api/dispositifs?per_page={per_page}')
+            self.assertEqual(reponse.status_code, 200)
+            items = reponse.get_json()['data']['items']
+            self.assertEqual(len(items), per_page)
+            self.assertTrue(any('patient' in item for item in items))
+
+        petite_page = self.compter_requetes(lambda: lister(2))
+        grande_page = self.compter_requetes(lambda: lister(30))
+        self.assertEqual(petite_page, grande_page)
+
+    def test_obtenir_dispositif_une_seule_requete(self):
+        """Le dispositif et son patient sont chargés ensemble"""
+        dispositif_id = DispositifMedical.query.filter(DispositifMedical.patient_id.isnot(None)).first().id
+        db.session.remove()
+
+        def obtenir():
+            reponse = self.client.get(f'/api/dispositifs/{dispositif_id}')
+            self.assertEqual(reponse.status_code, 200)
+            self.assertIn('patient', reponse.get_json()['data'])
+
+        self.assertEqual(self.compter_requetes(obtenir), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+# tests/unite/test_plans_requetes.py
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import creer_app
+from extensions.base_donnees import db
+from extensions.requetes_lentes import expliquer
+from modeles.patient import Patient
+from modeles.dispositif_medical import DispositifMedical
+from modeles.utilisateur import Utilisateur
+from modeles.intervention import Intervention
+from depots.intervention_depot import InterventionDepot
+
+NOMBRE_INTERVENTIONS = 2000
+DEBUT = datetime(2024, 1, 1, 8)
+
+def balayages_complets(plan, dialecte, table='interventions'):
+    """Lignes du plan qui lisent toute la table (hors parcours d'un index)"""
+    if dialecte == 'sqlite':
+        # SCAN interventions [USING (COVERING) INDEX ...] ; SEARCH ... USING INDEX est un accès indexé
+        return [ligne for ligne in plan if ligne.get('detail', '').startswith(f'SCAN {table}')]
+    # MySQL : type ALL (table entière) ou index (index entier)
+    return [ligne for ligne in plan if ligne.get('table') == table and ligne.get('type') in ('ALL', 'index')]
+
+class TestPlansRequetesInterventions(unittest.TestCase):
+    """Tests de non-régression : les requêtes fréquentes sur les interventions passent par un index"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Base alimentée une seule fois pour toute la classe (les tests ne font que lire)"""
+        cls.app = creer_app('test')
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        cls.dialecte = db.engine.dialect.name
+        if cls.dialecte not in ('sqlite', 'mysql'):
+            cls.app_context.pop()
+            raise unittest.SkipTest(f"EXPLAIN non pris en charge pour {cls.dialecte}")
+        db.create_all()
+
+        techniciens = []
+        for i in range(10):
+            technicien = Utilisateur(nom_utilisateur=f'tech{i}', email=f'tech{i}@test.com', role='technicien')
+            technicien.mot_de_passe = 'test'
+            techniciens.append(technicien)
+        patients = [Patient(nom=f'Nom{i}', prenom=f'Prenom{i}', code_patient=f'PT{i:04d}') for i in range(50)]
+        db.session.add_all(techniciens + patients)
+        db.session.flush()
+        dispositifs = [
+            DispositifMedical(patient_id=patient.id, designation='Concentrateur', reference=f'REF{i}',
+                              numero_serie=f'SN{i:04d}', type_acquisition='location')
+            for i, patient in enumerate(patients)
+        ]
+        db.session.add_all(dispositifs)
+        db.session.flush()
+
+        # Insertion directe (sans les écouteurs du modèle) ; répartition proche de la production :
+        # la plupart des interventions sont terminées, étalées sur trois ans
+        statuts = ['terminee'] * 16 + ['planifiee', 'en_cours', 'annulee', 'reportee']
+        maintenant = datetime.utcnow()
+        db.session.execute(Intervention.__table__.insert(), [
+            {
+                'patient_id': patients[i % 50].id,
+                'dispositif_id': dispositifs[i % 50].id,
+                'technicien_id': techniciens[i % 10].id,
+                'type_intervention': 'Entretien',
+                'traitement': 'PPC',
+                'date_planifiee': DEBUT + timedelta(hours=13 * i),
+                'statut': statuts[i % len(statuts)],
+                'date_creation': maintenant,
+                'date_modification': maintenant
+            }
+            for i in range(NOMBRE_INTERVENTIONS)
+        ])
+        db.session.commit()
+        if cls.dialecte == 'mysql':
+            db.session.execute(db.text('ANALYZE TABLE interventions'))
+        cls.technicien_id = techniciens[3].id
+        cls.patient_id = patients[7].id
+        cls.dispositif_id = dispositifs[7].id
+
+    @classmethod
+    def tearDownClass(cls):
+        """Nettoyage après les tests de la classe"""
+        db.session.remove()
+        db.drop_all()
+        cls.app_context.pop()
+
+    def verifier_plans(self, fn):
+        """Exécute fn et vérifie le plan de chaque SELECT émis sur la table interventions"""
+        instructions = []
+
+        def enregistrer(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and 'FROM interventions' in statement:
+                instructions.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', enregistrer)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', enregistrer)
+        self.assertTrue(instructions, "Aucune requête sur interventions")
+
+        connexion = db.session.connection()
+        for instruction, parametres in instructions:
+            plan = expliquer(connexion, instruction, parametres)
+            self.assertFalse(
+                balayages_complets(plan, self.dialecte),
+                f"Parcours complet de interventions:\n{instruction}\n{plan}"
+            )
+        db.session.remove()
+
+    def test_par_technicien(self):
+        self.verifier_plans(lambda: InterventionDepot.obtenir_par_technicien(self.technicien_id))
+
+    def test_par_patient(self):
+        self.verifier_plans(lambda: InterventionDepot.obtenir_par_patient(self.patient_id))
+
+    def test_par_dispositif(self):
+        self.verifier_plans(lambda: InterventionDepot.obtenir_par_dispositif(self.dispositif_id))
+
+    def test_par_statut(self):
+        self.verifier_plans(lambda: InterventionDepot.obtenir_par_statut('planifiee'))
+        self.verifier_plans(InterventionDepot.obtenir_interventions_en_cours)
+
+    def test_par_periode(self):
+        debut = DEBUT + timedelta(days=300)
+        self.verifier_plans(lambda: InterventionDepot.obtenir_par_periode(debut, debut + timedelta(days=7)))
+
+    def test_avec_filtres(self):
+        debut = DEBUT + timedelta(days=300)
+        fin = debut + timedelta(days=30)
+        for filtres in (
+            {'technicien_id': self.technicien_id},
+            {'patient_id': self.patient_id},
+            {'dispositif_id': self.dispositif_id},
+            {'statut': 'planifiee'},
+            {'date_debut': debut, 'date_fin': fin},
+            {'statut': 'planifiee', 'date_debut': debut, 'date_fin': fin},
+            {'technicien_id': self.technicien_id, 'statut': 'terminee', 'date_debut': debut, 'date_fin': fin},
+        ):
+            with self.subTest(**{cle: str(valeur) for cle, valeur in filtres.items()}):
+                self.verifier_plans(lambda: InterventionDepot.obtenir_interventions_avec_filtres(**filtres))
+
+    def test_agenda(self):
+        debut = DEBUT + timedelta(days=300)
+        fin = debut + timedelta(days=1)
+        self.verifier_plans(lambda: InterventionDepot.obtenir_agenda(debut, fin))
+        self.verifier_plans(lambda: InterventionDepot.obtenir_agenda(debut, fin, self.technicien_id, ['planifiee']))
+
+if __name__ == '__main__':
+    unittest.main()
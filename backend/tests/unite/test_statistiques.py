@@ -0,0 +1,43 @@
+# tests/unite/test_statistiques.py
+import unittest
+from datetime import date
+from app import creer_app
+from extensions.base_donnees import db
+from modeles.patient import Patient
+from services.service_statistiques import ServiceStatistiques
+
+class TestTranchesAge(unittest.TestCase):
+    """Tests des tranches d'âge des statistiques patients (âge exact au jour près)"""
+
+    def setUp(self):
+        """Configuration avant chaque test"""
+        self.app = creer_app('test')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_anniversaire_pas_encore_passe(self):
+        """Un patient dont l'anniversaire n'est pas encore passé garde l'âge de l'année précédente"""
+        naissances = [
+            date(2007, 10, 18),  # 18 ans la veille de ses 19 ans
+            date(2007, 10, 17),  # 19 ans le jour même
+            date(1955, 10, 18),  # 70 ans la veille de ses 71 ans
+            date(1955, 10, 17),  # 71 ans
+            None,
+        ]
+        for i, naissance in enumerate(naissances):
+            db.session.add(Patient(nom=f'Nom{i}', prenom=f'Prenom{i}', code_patient=f'PT{i:04d}',
+                                   date_naissance=naissance))
+        db.session.commit()
+
+        tranches = ServiceStatistiques.tranches_age(date(2026, 10, 17))
+        self.assertEqual(tranches, {'0-18': 1, '19-35': 1, '36-55': 0, '56-70': 1, '70+': 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+from collections import OrderedDict, namedtuple
+import threading
+import time
+
+# Ce que les décorateurs d'autorisation ont besoin de savoir d'un utilisateur
+Identite = namedtuple('Identite', ['role', 'est_actif'])
+
+class CacheIdentites:
+    """
+    Cache par processus id utilisateur -> Identite, avec durée de vie et taille bornée.
+    
+    Les entrées sont invalidées quand l'utilisateur est modifié ou supprimé dans ce
+    processus ; dans les autres, elles expirent au bout de ttl secondes.
+    """
+    
+    def __init__(self, ttl=60, taille_max=10000):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()  # id -> (expiration, Identite), plus ancienne en tête
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+    
+    def obtenir(self, utilisateur_id, charger):
+        """Identite de l'utilisateur, chargée par charger(id) (None si inconnu) en cas d'absence"""
+        maintenant = time.monotonic()
+        with self._verrou:
+            entree = self._entrees.get(utilisateur_id)
+            if entree is not None and entree[0] > maintenant:
+                self.succes += 1
+                return entree[1]
+            self.echecs += 1
+        
+        identite = charger(utilisateur_id)
+        if identite is not None:
+            with self._verrou:
+                self._entrees.pop(utilisateur_id, None)
+                self._entrees[utilisateur_id] = (maintenant + self.ttl, identite)
+                while len(self._entrees) > self.taille_max:
+                    self._entrees.popitem(last=False)
+        return identite
+    
+    def invalider(self, utilisateur_id):
+        with self._verrou:
+            self._entrees.pop(utilisateur_id, None)
+    
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+    
+    def statistiques(self):
+        """Compteurs depuis le démarrage ; chaque succès est une requête SQL évitée"""
+        with self._verrou:
+            return {
+                'entrees': len(self._entrees),
+                'succes': self.succes,
+                'echecs': self.echecs,
+                'requetes_evitees': self.succes,
+                'ttl': self.ttl
+            }
+
+cache_identites = CacheIdentites()
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+def empreinte_jeton(secret, jti):
+    """Clé de cache d'un token : son jti, propre au secret de signature (une application, un cache)"""
+    return hashlib.sha256(f'{secret}\x00{jti}'.encode('utf-8')).hexdigest()
+
+class CacheJetons:
+    """LRU borné empreinte du token -> verdict de révocation vérifié en base,
+    chaque entrée valable jusqu'à l'expiration du token"""
+    
+    def __init__(self, taille_max=10000):
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()  # empreinte -> (exp, revoque), plus récemment utilisée en fin
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+    
+    def obtenir(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self.echecs += 1
+                return None
+            if entree[0] is not None and entree[0] <= time.time():
+                del self._entrees[cle]
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1]
+    
+    def ajouter(self, cle, exp, revoque):
+        with self._verrou:
+            self._entrees[cle] = (exp, revoque)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+    
+    def retirer(self, cle):
+        with self._verrou:
+            self._entrees.pop(cle, None)
+    
+    def statistiques(self):
+        with self._verrou:
+            return {'entrees': len(self._entrees), 'succes': self.succes, 'echecs': self.echecs}
+
+cache_jetons = CacheJetons()
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from flask import current_app
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _dossier():
+    return current_app.config['DOSSIER_CACHE_PDF']
+
+def cle_intervention(intervention, version_modele, vignettes=()):
+    """Clé de contenu du PDF : change dès que l'intervention ou une donnée affichée est modifiée,
+    qu'une photo est ajoutée ou retirée (les chemins des vignettes contiennent leur empreinte),
+    ou que le jour change (date d'édition imprimée dans l'en-tête)"""
+    elements = [version_modele, intervention.id, intervention.date_modification, datetime.now().date()]
+    for relation in ('patient', 'dispositif', 'technicien', 'reglage'):
+        objet = getattr(intervention, relation, None)
+        elements.append(getattr(objet, 'date_modification', None) if objet is not None else None)
+    elements.extend(os.path.basename(chemin) for chemin in vignettes)
+    brut = '|'.join('' if e is None else (e.isoformat() if hasattr(e, 'isoformat') else str(e)) for e in elements)
+    return hashlib.sha256(brut.encode('utf-8')).hexdigest()[:32]
+
+def chemin(cle):
+    return os.path.join(_dossier(), f'{cle}.pdf')
+
+def reference(cle):
+    """Valeur enregistrée dans rapport_pdf_url : le nom du fichier, relatif au dossier du cache"""
+    return f'{cle}.pdf'
+
+def resoudre(valeur):
+    """Chemin du fichier du cache désigné par valeur (nom relatif, ou chemin absolu des anciennes
+    versions), ou None si valeur est vide ou désigne autre chose (URL externe)"""
+    if not valeur:
+        return None
+    if os.path.basename(valeur) == valeur:
+        return chemin(valeur[:-len('.pdf')]) if valeur.endswith('.pdf') else None
+    if os.path.dirname(os.path.abspath(valeur)) == os.path.abspath(_dossier()):
+        return valeur
+    return None
+
+def est_chemin_cache(valeur):
+    """Vrai si valeur désigne un fichier du cache (et non une URL externe)"""
+    return resoudre(valeur) is not None
+
+def lire(cle):
+    """Chemin du PDF en cache ou None ; un accès rafraîchit sa date pour l'éviction LRU"""
+    fichier = chemin(cle)
+    try:
+        os.utime(fichier)
+    except FileNotFoundError:
+        return None
+    return fichier
+
+def ecrire(cle, contenu):
+    """Enregistre un PDF (écriture atomique) puis applique la limite de taille du cache"""
+    dossier = _dossier()
+    os.makedirs(dossier, exist_ok=True)
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+    with os.fdopen(descripteur, 'wb') as fichier_temporaire:
+        fichier_temporaire.write(contenu)
+    fichier = chemin(cle)
+    os.replace(temporaire, fichier)
+    evincer(current_app.config.get('CACHE_PDF_TAILLE_MAX', 0), conserver=fichier)
+    return fichier
+
+def supprimer(fichier):
+    """Retire un fichier du cache s'il existe"""
+    try:
+        os.remove(fichier)
+    except FileNotFoundError:
+        pass
+
+def evincer(taille_max, conserver=None):
+    """Supprime les PDF les moins récemment utilisés jusqu'à repasser sous taille_max octets,
+    sans jamais retirer conserver (le fichier qui vient d'être écrit)"""
+    if not taille_max:
+        return
+    entrees = []
+    total = 0
+    with os.scandir(_dossier()) as iterateur:
+        for entree in iterateur:
+            if entree.is_file() and entree.name.endswith('.pdf'):
+                statistiques = entree.stat()
+                entrees.append((statistiques.st_mtime, statistiques.st_size, entree.path))
+                total += statistiques.st_size
+    if total <= taille_max:
+        return
+    for _, taille, fichier in sorted(entrees):
+        if fichier == conserver:
+            continue
+        supprimer(fichier)
+        total -= taille
+        if total <= taille_max:
+            break
+    logger.info(f"Cache PDF réduit à {total} octets")
@@ -1,16 +1,36 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from extensions.base_donnees import db
 from modeles.utilisateur import Utilisateur
+from utils.cache_identite import Identite, cache_identites
+
+def _charger_identite(utilisateur_id):
+    ligne = db.session.query(Utilisateur.role, Utilisateur.est_actif).filter(
+        Utilisateur.id == utilisateur_id
+    ).first()
+    return Identite(ligne.role, ligne.est_actif) if ligne else None
+
+def identite_courante():
+    """Identite de l'utilisateur du token (None s'il n'existe plus), lue une fois par requête"""
+    if 'identite' not in g:
+        utilisateur_id = get_jwt_identity()
+        g.identite = cache_identites.obtenir(int(utilisateur_id), _charger_identite) if utilisateur_id else None
+    return g.identite
+
+def _role_autorise(role_requis):
+    """Le rôle vient des claims signés du token ; le cache ne sert qu'aux tokens sans rôle
+    et à refuser un compte désactivé ou supprimé depuis l'émission du token"""
+    identite = identite_courante()
+    if identite is None or identite.est_actif is False:
+        return False
+    return (get_jwt().get('role') or identite.role) == role_requis
 
 def admin_requis(fn):
     """Décorateur pour vérifier si l'utilisateur est un administrateur"""
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        utilisateur_id = get_jwt_identity()
-        utilisateur = Utilisateur.query.get(utilisateur_id)
-        
-        if not utilisateur or utilisateur.role != 'admin':
+        if not _role_autorise('admin'):
             return jsonify({'message': 'Accès non autorisé'}), 403
         
         return fn(*args, **kwargs)
@@ -21,12 +41,9 @@ def technicien_requis(fn):
     """Décorateur pour vérifier si l'utilisateur est un technicien"""
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        utilisateur_id = get_jwt_identity()
-        utilisateur = Utilisateur.query.get(utilisateur_id)
-        
-        if not utilisateur or utilisateur.role != 'technicien':
+        if not _role_autorise('technicien'):
             return jsonify({'message': 'Accès non autorisé'}), 403
         
         return fn(*args, **kwargs)
     
-    return wrapper
\ No newline at end of file
+    return wrapper
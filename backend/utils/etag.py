@@ -0,0 +1,43 @@
+import hashlib
+from flask import make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+
+def empreinte_ensemble(query, colonne_id, *colonnes_date):
+    """(nombre de lignes, MAX(id), MAX(date_modification)...) de l'ensemble filtré, en une requête d'agrégat,
+    avant toute sérialisation ; avec les paramètres de la requête (page, filtres), repris par calculer_etag"""
+    return tuple(query.order_by(None).with_entities(
+        func.count(colonne_id), func.max(colonne_id), *[func.max(colonne) for colonne in colonnes_date]
+    ).one())
+
+def calculer_etag(*morceaux):
+    """
+    Valeur d'un ETag faible pour la requête courante : les morceaux (empreinte des données)
+    plus les paramètres de la requête et l'utilisateur, dont dépend aussi la réponse.
+    """
+    try:
+        identite = get_jwt_identity()
+    except RuntimeError:
+        identite = None  # Route sans @jwt_required
+    source = repr((
+        request.path,
+        sorted(request.args.items(multi=True)),
+        identite,
+        [m.isoformat() if hasattr(m, 'isoformat') else m for m in morceaux]
+    ))
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+def est_inchangee(etag):
+    """Vrai si le client a déjà cette version (If-None-Match)"""
+    return bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+
+def reponse_inchangee(etag):
+    """Réponse 304 sans corps"""
+    return avec_etag(('', 304), etag)
+
+def avec_etag(reponse, etag):
+    """Ajoute l'ETag faible à la réponse ; le client doit revalider à chaque utilisation"""
+    reponse = make_response(reponse)
+    reponse.set_etag(etag, weak=True)
+    reponse.headers['Cache-Control'] = 'private, no-cache'
+    return reponse
@@ -0,0 +1,34 @@
+import hashlib
+import math
+
+class FiltreBloom:
+    """
+    Filtre de Bloom : test d'appartenance en mémoire sans faux négatif.
+    Une réponse positive doit être confirmée (taux de faux positifs ~ taux_erreur
+    tant que le nombre d'éléments reste sous la capacité).
+    """
+    
+    def __init__(self, capacite=100000, taux_erreur=0.001):
+        self.capacite = capacite
+        self.taille = max(8, int(-capacite * math.log(taux_erreur) / (math.log(2) ** 2)))
+        self.nombre_hachages = max(1, round(self.taille / capacite * math.log(2)))
+        self.bits = bytearray((self.taille + 7) // 8)
+        self.nombre = 0
+    
+    def _positions(self, element):
+        # Double hachage (Kirsch-Mitzenmacher) à partir d'un seul condensat
+        condensat = hashlib.blake2b(element.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(condensat[:8], 'little')
+        h2 = int.from_bytes(condensat[8:], 'little') | 1
+        return [(h1 + i * h2) % self.taille for i in range(self.nombre_hachages)]
+    
+    def ajouter(self, element):
+        for position in self._positions(element):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.nombre += 1
+    
+    def __contains__(self, element):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(element))
+    
+    def est_plein(self):
+        return self.nombre >= self.capacite
@@ -0,0 +1,85 @@
+import base64
+import binascii
+import io
+import re
+from PIL import Image, ImageOps
+
+_DATA_URL = re.compile(r'^data:(?P<type>[\w.+-]+/[\w.+-]+)?(?:;[\w-]+=[^;,]*)*;base64,', re.IGNORECASE)
+
+FORMATS = {
+    'PNG': ('image/png', {'optimize': True}),
+    'WEBP': ('image/webp', {'lossless': True, 'quality': 100, 'method': 6}),
+}
+
+def decoder_data_url(texte):
+    """Octets et type de contenu d'une image en base64 (data URL ou base64 brut) ; lève ValueError"""
+    correspondance = _DATA_URL.match(texte)
+    type_contenu = None
+    if correspondance:
+        type_contenu = correspondance.group('type')
+        texte = texte[correspondance.end():]
+    try:
+        return base64.b64decode(texte, validate=False), type_contenu
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("Image base64 invalide") from e
+
+def encoder_data_url(contenu, type_contenu):
+    return f"data:{type_contenu};base64,{base64.b64encode(contenu).decode('ascii')}"
+
+def compresser_signature(contenu, format_sortie='PNG', largeur_max=600, niveaux=4):
+    """
+    Signature compacte : fond blanc, marges retirées, largeur bornée et niveaux de gris
+    réduits à une petite palette (traits lissés conservés).
+    Retourne (octets, type_contenu, largeur, hauteur) ; lève ValueError si l'image est illisible.
+    """
+    try:
+        image = Image.open(io.BytesIO(contenu))
+        image.load()
+    except Exception as e:
+        raise ValueError("Signature illisible") from e
+    
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        fond = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(fond, image)
+    image = image.convert('L')
+    
+    cadre = ImageOps.invert(image).getbbox()
+    if cadre:
+        marge = 4
+        image = image.crop((
+            max(0, cadre[0] - marge), max(0, cadre[1] - marge),
+            min(image.width, cadre[2] + marge), min(image.height, cadre[3] + marge)
+        ))
+    if image.width > largeur_max:
+        image = image.resize((largeur_max, max(1, round(image.height * largeur_max / image.width))), Image.LANCZOS)
+    
+    type_contenu, options = FORMATS[format_sortie]
+    image = image.quantize(colors=niveaux)
+    sortie = io.BytesIO()
+    image.save(sortie, format=format_sortie, **options)
+    return sortie.getvalue(), type_contenu, image.width, image.height
+
+def creer_vignette(flux, taille=320, qualite=80):
+    """
+    Vignette JPEG tenant dans un carré de taille pixels (proportions et orientation EXIF conservées).
+    Les JPEG sont décodés directement à échelle réduite (draft) : l'original n'est jamais décodé en entier.
+    Retourne (octets, type_contenu, largeur, hauteur) ; lève ValueError si l'image est illisible.
+    """
+    try:
+        image = Image.open(flux)
+        image.draft('RGB', (taille, taille))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((taille, taille), Image.LANCZOS)
+    except Exception as e:
+        raise ValueError("Image illisible") from e
+    
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        fond = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(fond, image)
+    image = image.convert('RGB')
+    
+    sortie = io.BytesIO()
+    image.save(sortie, format='JPEG', quality=qualite, optimize=True)
+    return sortie.getvalue(), 'image/jpeg', image.width, image.height
@@ -3,7 +3,6 @@ from functools import wraps
 import logging
 
 # Configuration du logger
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 def debug_jwt_middleware():
@@ -0,0 +1,70 @@
+import csv
+import io
+import zipfile
+from typing import Dict, Iterator, Optional, Tuple
+
+Ligne = Tuple[int, Dict[str, Optional[str]]]
+
+def _cellule(valeur) -> Optional[str]:
+    """Normalise une cellule : texte sans espaces autour, None si vide"""
+    if valeur is None:
+        return None
+    if hasattr(valeur, 'isoformat'):
+        valeur = valeur.isoformat()[:10]
+    valeur = str(valeur).strip()
+    return valeur or None
+
+def _entete(colonnes):
+    return [(_cellule(c) or '').lower() for c in colonnes]
+
+def lire_csv(flux) -> Iterator[Ligne]:
+    """Lit un CSV ligne par ligne (séparateur ',' ou ';' détecté sur l'en-tête),
+    en donnant pour chaque ligne son numéro dans le fichier"""
+    texte = io.TextIOWrapper(flux, encoding='utf-8-sig', newline='')
+    premiere_ligne = texte.readline()
+    separateur = ';' if premiere_ligne.count(';') > premiere_ligne.count(',') else ','
+    colonnes = _entete(next(csv.reader([premiere_ligne], delimiter=separateur), []))
+    lecteur = csv.reader(texte, delimiter=separateur)
+    for valeurs in lecteur:
+        if not any(v.strip() for v in valeurs):
+            continue
+        # L'en-tête a été lu à part : line_num compte à partir de la ligne 2
+        yield lecteur.line_num + 1, {colonne: _cellule(valeur) for colonne, valeur in zip(colonnes, valeurs) if colonne}
+
+def lire_xlsx(flux) -> Iterator[Ligne]:
+    """Lit la première feuille d'un classeur XLSX en mode lecture seule (ligne par ligne)"""
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ValueError("Le format XLSX nécessite le paquet openpyxl")
+
+    try:
+        classeur = load_workbook(flux, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+        # Archive illisible ou sans classeur (fichier renommé, tronqué...) : même réponse 400 que le CSV
+        raise ValueError(f"Fichier XLSX invalide ou corrompu: {e}")
+
+    def lignes_classeur():
+        try:
+            lignes = classeur.worksheets[0].iter_rows(values_only=True)
+            colonnes = _entete(next(lignes, []))
+            for numero, valeurs in enumerate(lignes, start=2):
+                if not any(_cellule(v) for v in valeurs):
+                    continue
+                yield numero, {colonne: _cellule(valeur) for colonne, valeur in zip(colonnes, valeurs) if colonne}
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Fichier XLSX corrompu: {e}")
+        finally:
+            classeur.close()
+
+    return lignes_classeur()
+
+def lire_lignes(fichier) -> Iterator[Ligne]:
+    """Choisit le lecteur selon l'extension du fichier envoyé ; lève ValueError si non supportée"""
+    nom = (fichier.filename or '').lower()
+    if nom.endswith('.csv'):
+        return lire_csv(fichier.stream)
+    if nom.endswith('.xlsx'):
+        return lire_xlsx(fichier.stream)
+    raise ValueError("Format non supporté, utilisez un fichier .csv ou .xlsx")
@@ -0,0 +1,140 @@
+from bisect import bisect_left
+import threading
+
+# Bornes des histogrammes (Prometheus ajoute +Inf)
+BORNES_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BORNES_TAILLE = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BORNES_SQL = (0, 1, 2, 5, 10, 20, 50, 100)
+
+AIDE_COMPTEURS = {
+    'oxycare_pool_emprunts_total': 'Connexions empruntées au pool',
+    'oxycare_pool_restitutions_total': 'Connexions rendues au pool',
+    'oxycare_pool_connexions_creees_total': 'Connexions ouvertes vers la base',
+}
+
+class Histogramme:
+    """Comptes par tranche, somme et nombre d'observations"""
+    
+    __slots__ = ('bornes', 'comptes', 'somme', 'nombre')
+    
+    def __init__(self, bornes):
+        self.bornes = bornes
+        self.comptes = [0] * (len(bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+    
+    def observer(self, valeur):
+        self.comptes[bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+        self.nombre += 1
+
+def _echapper(valeur):
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _etiquettes(noms, valeurs, supplement=None):
+    paires = [f'{nom}="{_echapper(valeur)}"' for nom, valeur in zip(noms, valeurs)]
+    if supplement:
+        paires.append(supplement)
+    return '{' + ','.join(paires) + '}' if paires else ''
+
+def _nombre(valeur):
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+class RegistreMetriques:
+    """
+    Agrégation en mémoire des métriques HTTP, SQL et du pool de connexions, au format texte Prometheus.
+    
+    Les compteurs sont propres au processus : avec plusieurs workers, chaque worker expose les siens.
+    """
+    
+    ETIQUETTES_ROUTE = ('blueprint', 'route', 'methode')
+    
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._requetes = {}  # (blueprint, route, methode, statut) -> nombre
+        self._histogrammes = {}  # (nom, blueprint, route, methode) -> Histogramme
+        self._compteurs = {}  # nom -> valeur (pool de connexions)
+    
+    def _histogramme(self, nom, bornes, route):
+        cle = (nom,) + route
+        histogramme = self._histogrammes.get(cle)
+        if histogramme is None:
+            histogramme = self._histogrammes[cle] = Histogramme(bornes)
+        return histogramme
+    
+    def observer_requete(self, blueprint, route, methode, statut, duree, taille, sql_nombre, sql_duree):
+        """Enregistre une requête terminée (taille None pour une réponse en flux)"""
+        cle_route = (blueprint, route, methode)
+        with self._verrou:
+            cle = cle_route + (statut,)
+            self._requetes[cle] = self._requetes.get(cle, 0) + 1
+            self._histogramme('duree', BORNES_DUREE, cle_route).observer(duree)
+            if taille is not None:
+                self._histogramme('taille', BORNES_TAILLE, cle_route).observer(taille)
+            self._histogramme('sql', BORNES_SQL, cle_route).observer(sql_nombre)
+            self._histogramme('sql_duree', BORNES_DUREE, cle_route).observer(sql_duree)
+    
+    def incrementer(self, nom, valeur=1):
+        with self._verrou:
+            self._compteurs[nom] = self._compteurs.get(nom, 0) + valeur
+    
+    def vider(self):
+        with self._verrou:
+            self._requetes.clear()
+            self._histogrammes.clear()
+            self._compteurs.clear()
+    
+    def exporter(self, jauges=()):
+        """
+        Texte d'exposition Prometheus (version 0.0.4).
+        jauges : (nom, aide, type, valeur) calculées au moment de la lecture.
+        """
+        with self._verrou:
+            requetes = sorted(self._requetes.items())
+            histogrammes = {
+                cle: (tuple(h.comptes), h.somme, h.nombre, h.bornes)
+                for cle, h in self._histogrammes.items()
+            }
+            compteurs = dict(self._compteurs)
+        
+        lignes = [
+            '# HELP oxycare_http_requetes_total Requêtes HTTP traitées',
+            '# TYPE oxycare_http_requetes_total counter'
+        ]
+        noms = self.ETIQUETTES_ROUTE + ('statut',)
+        for cle, nombre in requetes:
+            lignes.append(f'oxycare_http_requetes_total{_etiquettes(noms, cle)} {nombre}')
+        
+        for nom, metrique, aide in (
+            ('duree', 'oxycare_http_duree_secondes', 'Durée de traitement des requêtes HTTP'),
+            ('taille', 'oxycare_http_reponse_octets', 'Taille des réponses HTTP (hors flux)'),
+            ('sql', 'oxycare_http_sql_requetes', 'Instructions SQL exécutées par requête HTTP'),
+            ('sql_duree', 'oxycare_http_sql_duree_secondes', 'Temps passé en base par requête HTTP'),
+        ):
+            lignes.append(f'# HELP {metrique} {aide}')
+            lignes.append(f'# TYPE {metrique} histogram')
+            for cle in sorted(c for c in histogrammes if c[0] == nom):
+                comptes, somme, total, bornes = histogrammes[cle]
+                route = cle[1:]
+                cumul = 0
+                for borne, compte in zip(bornes + ('+Inf',), comptes):
+                    cumul += compte
+                    le = f'le="{borne}"'
+                    lignes.append(f'{metrique}_bucket{_etiquettes(self.ETIQUETTES_ROUTE, route, le)} {cumul}')
+                lignes.append(f'{metrique}_sum{_etiquettes(self.ETIQUETTES_ROUTE, route)} {_nombre(somme)}')
+                lignes.append(f'{metrique}_count{_etiquettes(self.ETIQUETTES_ROUTE, route)} {total}')
+        
+        for nom, valeur in sorted(compteurs.items()):
+            if nom in AIDE_COMPTEURS:
+                lignes.append(f'# HELP {nom} {AIDE_COMPTEURS[nom]}')
+            lignes.append(f'# TYPE {nom} counter')
+            lignes.append(f'{nom} {_nombre(valeur)}')
+        
+        for nom, aide, type_metrique, valeur in jauges:
+            lignes.append(f'# HELP {nom} {aide}')
+            lignes.append(f'# TYPE {nom} {type_metrique}')
+            lignes.append(f'{nom} {_nombre(valeur)}')
+        
+        return '\n'.join(lignes) + '\n'
+
+metriques = RegistreMetriques()
@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+def encoder_curseur(date_planifiee, id, sens='suivant'):
+    """Encode une position (date_planifiee, id) en curseur opaque"""
+    charge = {
+        'd': date_planifiee.isoformat() if date_planifiee else None,
+        'i': id,
+        's': sens
+    }
+    brut = json.dumps(charge, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(brut).decode('ascii').rstrip('=')
+
+def decoder_curseur(curseur):
+    """Décode un curseur opaque, lève ValueError s'il est invalide"""
+    try:
+        rembourrage = '=' * (-len(curseur) % 4)
+        charge = json.loads(base64.urlsafe_b64decode(curseur + rembourrage).decode('utf-8'))
+        date_planifiee = datetime.fromisoformat(charge['d'])
+        id = int(charge['i'])
+        sens = charge.get('s', 'suivant')
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Curseur invalide: {curseur}") from e
+
+    if sens not in ('suivant', 'precedent'):
+        raise ValueError(f"Sens de curseur invalide: {sens}")
+    return date_planifiee, id, sens
+
+def paginer_par_curseur(query, colonne_date, colonne_id, curseur, par_page):
+    """
+    Pagination par clé (keyset) sur (colonne_date DESC, colonne_id DESC).
+
+    Ne calcule pas de COUNT(*) : on lit par_page + 1 lignes pour savoir
+    s'il existe une page suivante. Retourne (elements, curseur_suivant, curseur_precedent).
+    """
+    sens = 'suivant'
+    if curseur:
+        date_ref, id_ref, sens = decoder_curseur(curseur)
+        if sens == 'suivant':
+            query = query.filter(or_(
+                colonne_date < date_ref,
+                and_(colonne_date == date_ref, colonne_id < id_ref)
+            ))
+        else:
+            query = query.filter(or_(
+                colonne_date > date_ref,
+                and_(colonne_date == date_ref, colonne_id > id_ref)
+            ))
+
+    if sens == 'suivant':
+        query = query.order_by(colonne_date.desc(), colonne_id.desc())
+    else:
+        query = query.order_by(colonne_date.asc(), colonne_id.asc())
+
+    elements = query.limit(par_page + 1).all()
+    a_plus = len(elements) > par_page
+    elements = elements[:par_page]
+
+    if sens == 'precedent':
+        elements.reverse()
+        a_suivant, a_precedent = bool(curseur), a_plus
+    else:
+        a_suivant, a_precedent = a_plus, bool(curseur)
+
+    cle_date, cle_id = colonne_date.key, colonne_id.key
+    curseur_suivant = None
+    curseur_precedent = None
+    if elements and a_suivant:
+        dernier = elements[-1]
+        curseur_suivant = encoder_curseur(getattr(dernier, cle_date), getattr(dernier, cle_id), 'suivant')
+    if elements and a_precedent:
+        premier = elements[0]
+        curseur_precedent = encoder_curseur(getattr(premier, cle_date), getattr(premier, cle_id), 'precedent')
+
+    return elements, curseur_suivant, curseur_precedent
@@ -1,193 +1,296 @@
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
+from PIL import Image as ImagePIL
 from io import BytesIO
 from datetime import datetime
+from types import SimpleNamespace
 import os
+import threading
+
+# Flux d'images en binaire (Flate) plutôt qu'en ASCII85 : encodage plus rapide, PDF plus léger
+rl_config.useA85 = 0
+
+# À incrémenter à chaque changement de mise en page : invalide les PDF en cache
+VERSION_MODELE = '3'
+
+CHEMIN_LOGO = os.path.join(os.path.dirname(__file__), 'logo-respireair.png')
+LARGEUR_LOGO, HAUTEUR_LOGO = 40*mm, 15*mm
+# Résolution d'impression du logo : l'original (1144x495) est réduit une fois pour toutes
+DPI_LOGO = 300
+
+# Photos : vignettes JPEG (incluses telles quelles, sans décodage), 3 par ligne
+PHOTOS_MAX = 6
+PHOTOS_PAR_LIGNE = 3
+LARGEUR_PHOTO, HAUTEUR_PHOTO = 58*mm, 45*mm
+
+# Attributs lus par generate_intervention_pdf, copiés dans les instantanés
+CHAMPS_INSTANTANE = {
+    None: ['id', 'traitement', 'type_intervention', 'parametres', 'type_concentrateur', 'mode_ventilation',
+           'type_masque', 'consommables_utilises', 'verification_securite', 'tests_effectues', 'remarques'],
+    'patient': ['nom', 'prenom', 'date_naissance', 'adresse', 'telephone', 'mutuelle'],
+    'technicien': ['nom', 'prenom'],
+    'dispositif': ['designation', 'reference', 'numero_serie'],
+    'reglage': ['pmax', 'pmin', 'pramp', 'hu', 're'],
+}
 
 def checkbox(checked=False):
     return '☑' if checked else '☐'
 
-def generate_intervention_pdf(intervention):
-    """Génère une fiche contrôle PDF fidèle au modèle fourni"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=15*mm, leftMargin=15*mm, topMargin=15*mm, bottomMargin=10*mm)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # En-tête avec logo et infos fiche
-    header_data = [
-        [
-            # Logo (à adapter selon le chemin réel du logo)
-            Image(os.path.join(os.path.dirname(__file__), 'logo-respireair.png'), width=40*mm, height=15*mm),
-            Paragraph('<b>Fiche Contrôle</b>', styles['Title']),
-            Paragraph('''<para align=right><b>R02-F101-FI</b><br/>Version : 01<br/>Date : {date}<br/>Page : 1/1</para>'''.format(date=datetime.now().strftime('%d/%m/%Y')), styles['Normal'])
-        ]
-    ]
-    header = Table(header_data, colWidths=[55*mm, 70*mm, 40*mm])
-    header.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('ALIGN', (1,0), (1,0), 'CENTER'),
-        ('ALIGN', (2,0), (2,0), 'RIGHT'),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 6),
-    ]))
-    story.append(header)
-    story.append(Spacer(1, 6))
-
-    # Section : Informations sur le patient (afficher uniquement les champs renseignés)
-    story.append(Paragraph('<b>INFORMATION SUR LE PATIENT</b>', styles['Heading4']))
-    patient = intervention.patient
-    patient_info = []
-    if getattr(patient, 'nom', None):
-        patient_info.append([f"Nom : {patient.nom}"])
-    if getattr(patient, 'prenom', None):
-        patient_info.append([f"Prénom : {patient.prenom}"])
-    if getattr(patient, 'date_naissance', None):
-        patient_info.append([f"Date de naissance : {patient.date_naissance}"])
-    if getattr(patient, 'adresse', None):
-        patient_info.append([f"Adresse : {patient.adresse}"])
-    if getattr(patient, 'telephone', None):
-        patient_info.append([f"Téléphone : {patient.telephone}"])
-    if getattr(patient, 'mutuelle', None):
-        patient_info.append([f"Mutuelle : {patient.mutuelle}"])
-    if getattr(intervention, 'technicien', None) and getattr(intervention.technicien, 'nom', None):
-        patient_info.append([f"Technicien : {intervention.technicien.nom}"])
-    if patient_info:
-        t = Table(patient_info, colWidths=[180*mm])
-        t.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ]))
-        story.append(t)
-        story.append(Spacer(1, 6))
-
-    # Section : Information sur le traitement prescrit (texte uniquement)
-    if getattr(intervention, 'traitement', None) or getattr(intervention, 'type_intervention', None):
-        story.append(Paragraph('<b>INFORMATION SUR LE TRAITEMENT PRESCRIT</b>', styles['Heading4']))
-        traitement_info = []
-        if getattr(intervention, 'traitement', None):
-            traitement_info.append([f"Traitement prescrit : {intervention.traitement}"])
-        if getattr(intervention, 'type_intervention', None):
-            traitement_info.append([f"Type d'intervention : {intervention.type_intervention}"])
-        # Champs spécifiques selon le traitement
-        if getattr(intervention, 'traitement', None) == 'OXYGENOTHERAPIE':
-            if getattr(intervention, 'parametres', None):
-                debit = intervention.parametres.get('debit_oxygene')
-                if debit:
-                    traitement_info.append([f"Débit d'oxygène (L/min) : {debit}"])
-            if getattr(intervention, 'type_concentrateur', None):
-                traitement_info.append([f"Type de concentrateur : {intervention.type_concentrateur}"])
-        if getattr(intervention, 'traitement', None) in ['VENTILATION', 'PPC']:
-            if getattr(intervention, 'mode_ventilation', None):
-                traitement_info.append([f"Mode de ventilation : {intervention.mode_ventilation}"])
-            if getattr(intervention, 'type_masque', None):
-                traitement_info.append([f"Type de masque : {intervention.type_masque}"])
-        t = Table(traitement_info, colWidths=[180*mm])
-        t.setStyle(TableStyle([
+class FicheControleRenderer:
+    """
+    Rendu des fiches contrôle PDF fidèle au modèle fourni.
+
+    Les styles, le logo décodé et les éléments fixes (titre, titres de section,
+    ligne des signatures) sont préparés à la construction et réutilisés pour
+    chaque fiche. Une instance ne doit pas être partagée entre threads :
+    passer par obtenir_renderer().
+    """
+
+    def __init__(self, chemin_logo=CHEMIN_LOGO):
+        styles = getSampleStyleSheet()
+        self.style_titre = styles['Title']
+        self.style_normal = styles['Normal']
+        self.style_section = styles['Heading4']
+
+        self.style_grille = TableStyle([
             ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
             ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ]))
-        story.append(t)
-        story.append(Spacer(1, 6))
-
-    # Section : Information sur le dispositif (afficher uniquement si renseigné)
-    if getattr(intervention, 'dispositif', None):
-        story.append(Paragraph('<b>INFORMATION SUR LE DISPOSITIF</b>', styles['Heading4']))
-        dispositif = intervention.dispositif
-        dispositif_info = []
-        if getattr(dispositif, 'designation', None):
-            dispositif_info.append([f"Désignation : {dispositif.designation}"])
-        if getattr(dispositif, 'reference', None):
-            dispositif_info.append([f"Référence : {dispositif.reference}"])
-        if getattr(dispositif, 'numero_serie', None):
-            dispositif_info.append([f"Numéro de série : {dispositif.numero_serie}"])
-        t = Table(dispositif_info, colWidths=[180*mm])
-        t.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ])
+        self.style_entete = TableStyle([
             ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ('ALIGN', (1,0), (1,0), 'CENTER'),
+            ('ALIGN', (2,0), (2,0), 'RIGHT'),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 6),
+        ])
+
+        # Logo décodé et réduit à sa taille d'impression une seule fois
+        logo = ImagePIL.open(chemin_logo)
+        logo.load()
+        taille = (round(LARGEUR_LOGO / 72 * DPI_LOGO), round(HAUTEUR_LOGO / 72 * DPI_LOGO))
+        self.logo = BytesIO()
+        logo.resize(taille, ImagePIL.LANCZOS).save(self.logo, format='PNG')
+
+        self.titre = Paragraph('<b>Fiche Contrôle</b>', self.style_titre)
+        self.espace = Spacer(1, 6)
+        self.sections = {
+            nom: Paragraph(f'<b>{nom}</b>', self.style_section)
+            for nom in (
+                'INFORMATION SUR LE PATIENT', 'INFORMATION SUR LE TRAITEMENT PRESCRIT',
+                'INFORMATION SUR LE DISPOSITIF', 'CONSOMMABLES UTILISÉS',
+                'VÉRIFICATIONS ET TESTS EFFECTUÉS', 'REMARQUES', 'PHOTOS'
+            )
+        }
+
+        # Section : Signatures (toujours afficher la ligne, technicien à gauche, patient à droite)
+        self.signatures = Table([
+            ['Signature Technicien', 'Signature Patient']
+        ], colWidths=[90*mm, 90*mm])
+        self.signatures.setStyle(TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'BOTTOM'),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
         ]))
-        story.append(t)
-        story.append(Spacer(1, 6))
-
-    # Section : Réglages (afficher uniquement si renseigné)
-    if getattr(intervention, 'reglage', None):
-        reglage = intervention.reglage
-        reglage_info = []
-        if getattr(reglage, 'pmax', None):
-            reglage_info.append([f"Pmax : {reglage.pmax}"])
-        if getattr(reglage, 'pmin', None):
-            reglage_info.append([f"Pmin : {reglage.pmin}"])
-        if getattr(reglage, 'pramp', None):
-            reglage_info.append([f"P ramp : {reglage.pramp}"])
-        if getattr(reglage, 'hu', None):
-            reglage_info.append([f"HU : {reglage.hu}"])
-        if getattr(reglage, 're', None):
-            reglage_info.append([f"RE : {reglage.re}"])
-        if reglage_info:
-            t = Table(reglage_info, colWidths=[180*mm])
-            t.setStyle(TableStyle([
-                ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ]))
-            story.append(t)
-            story.append(Spacer(1, 6))
-
-    # Section : Consommables utilisés (afficher uniquement ceux utilisés)
-    if getattr(intervention, 'consommables_utilises', None):
-        consommables = intervention.consommables_utilises
-        consommables_utilises = [k for k, v in consommables.items() if v]
-        if consommables_utilises:
-            story.append(Paragraph('<b>CONSOMMABLES UTILISÉS</b>', styles['Heading4']))
-            consommables_info = [[c] for c in consommables_utilises]
-            t = Table(consommables_info, colWidths=[180*mm])
-            t.setStyle(TableStyle([
-                ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ]))
-            story.append(t)
-            story.append(Spacer(1, 6))
-
-    # Section : Vérifications de sécurité et Tests effectués (côte à côte)
-    verifs = []
-    tests = []
-    if getattr(intervention, 'verification_securite', None):
-        verifs = [k for k, v in intervention.verification_securite.items() if v is True or v == 1]
-    if getattr(intervention, 'tests_effectues', None):
-        tests = [k for k, v in intervention.tests_effectues.items() if v is True or v == 1]
-    if verifs or tests:
-        story.append(Paragraph('<b>VÉRIFICATIONS ET TESTS EFFECTUÉS</b>', styles['Heading4']))
-        max_len = max(len(verifs), len(tests))
-        rows = []
-        for i in range(max_len):
-            left = verifs[i] if i < len(verifs) else ''
-            right = tests[i] if i < len(tests) else ''
-            rows.append([left, right])
-        t = Table(rows, colWidths=[90*mm, 90*mm])
+
+        self._jour_entete = None
+        self._entete = None
+
+    def entete(self):
+        """En-tête avec logo et infos fiche, reconstruit seulement quand la date change"""
+        jour = datetime.now().strftime('%d/%m/%Y')
+        if jour != self._jour_entete:
+            header_data = [
+                [
+                    Image(BytesIO(self.logo.getvalue()), width=LARGEUR_LOGO, height=HAUTEUR_LOGO),
+                    self.titre,
+                    Paragraph('''<para align=right><b>R02-F101-FI</b><br/>Version : 01<br/>Date : {date}<br/>Page : 1/1</para>'''.format(date=jour), self.style_normal)
+                ]
+            ]
+            self._entete = Table(header_data, colWidths=[55*mm, 70*mm, 40*mm])
+            self._entete.setStyle(self.style_entete)
+            self._jour_entete = jour
+        return self._entete
+
+    def _grille(self, lignes, largeurs=(180*mm,)):
+        t = Table(lignes, colWidths=list(largeurs))
+        t.setStyle(self.style_grille)
+        return t
+
+    def _photos(self, vignettes):
+        cellules = [
+            Image(chemin, width=LARGEUR_PHOTO, height=HAUTEUR_PHOTO, kind='proportional')
+            for chemin in vignettes[:PHOTOS_MAX]
+        ]
+        lignes = [cellules[i:i + PHOTOS_PAR_LIGNE] for i in range(0, len(cellules), PHOTOS_PAR_LIGNE)]
+        lignes[-1] += [''] * (PHOTOS_PAR_LIGNE - len(lignes[-1]))
+        t = Table(lignes, colWidths=[60*mm] * PHOTOS_PAR_LIGNE)
         t.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
             ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
         ]))
-        story.append(t)
-        story.append(Spacer(1, 6))
-
-    # Section : Remarques (si renseigné)
-    if getattr(intervention, 'remarques', None):
-        story.append(Paragraph('<b>REMARQUES</b>', styles['Heading4']))
-        story.append(Paragraph(intervention.remarques, styles['Normal']))
-        story.append(Spacer(1, 6))
-
-    # Section : Signatures (toujours afficher la ligne, technicien à gauche, patient à droite)
-    t = Table([
-        ['Signature Technicien', 'Signature Patient']
-    ], colWidths=[90*mm, 90*mm])
-    t.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'BOTTOM'),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-    ]))
-    story.append(t)
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer 
\ No newline at end of file
+        return t
+
+    def rendre(self, intervention, vignettes=None):
+        """Génère la fiche contrôle d'une intervention (objet ORM ou instantané) et retourne un BytesIO.
+        vignettes : chemins des vignettes des photos (par défaut celles de l'instantané)"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=15*mm, leftMargin=15*mm, topMargin=15*mm, bottomMargin=10*mm)
+        story = [self.entete(), self.espace]
+
+        # Section : Informations sur le patient (afficher uniquement les champs renseignés)
+        story.append(self.sections['INFORMATION SUR LE PATIENT'])
+        patient = intervention.patient
+        patient_info = []
+        if getattr(patient, 'nom', None):
+            patient_info.append([f"Nom : {patient.nom}"])
+        if getattr(patient, 'prenom', None):
+            patient_info.append([f"Prénom : {patient.prenom}"])
+        if getattr(patient, 'date_naissance', None):
+            patient_info.append([f"Date de naissance : {patient.date_naissance}"])
+        if getattr(patient, 'adresse', None):
+            patient_info.append([f"Adresse : {patient.adresse}"])
+        if getattr(patient, 'telephone', None):
+            patient_info.append([f"Téléphone : {patient.telephone}"])
+        if getattr(patient, 'mutuelle', None):
+            patient_info.append([f"Mutuelle : {patient.mutuelle}"])
+        if getattr(intervention, 'technicien', None) and getattr(intervention.technicien, 'nom', None):
+            patient_info.append([f"Technicien : {intervention.technicien.nom}"])
+        if patient_info:
+            story.append(self._grille(patient_info))
+            story.append(self.espace)
+
+        # Section : Information sur le traitement prescrit (texte uniquement)
+        if getattr(intervention, 'traitement', None) or getattr(intervention, 'type_intervention', None):
+            story.append(self.sections['INFORMATION SUR LE TRAITEMENT PRESCRIT'])
+            traitement_info = []
+            if getattr(intervention, 'traitement', None):
+                traitement_info.append([f"Traitement prescrit : {intervention.traitement}"])
+            if getattr(intervention, 'type_intervention', None):
+                traitement_info.append([f"Type d'intervention : {intervention.type_intervention}"])
+            # Champs spécifiques selon le traitement
+            if getattr(intervention, 'traitement', None) == 'OXYGENOTHERAPIE':
+                if getattr(intervention, 'parametres', None):
+                    debit = intervention.parametres.get('debit_oxygene')
+                    if debit:
+                        traitement_info.append([f"Débit d'oxygène (L/min) : {debit}"])
+                if getattr(intervention, 'type_concentrateur', None):
+                    traitement_info.append([f"Type de concentrateur : {intervention.type_concentrateur}"])
+            if getattr(intervention, 'traitement', None) in ['VENTILATION', 'PPC']:
+                if getattr(intervention, 'mode_ventilation', None):
+                    traitement_info.append([f"Mode de ventilation : {intervention.mode_ventilation}"])
+                if getattr(intervention, 'type_masque', None):
+                    traitement_info.append([f"Type de masque : {intervention.type_masque}"])
+            story.append(self._grille(traitement_info))
+            story.append(self.espace)
+
+        # Section : Information sur le dispositif (afficher uniquement si renseigné)
+        if getattr(intervention, 'dispositif', None):
+            story.append(self.sections['INFORMATION SUR LE DISPOSITIF'])
+            dispositif = intervention.dispositif
+            dispositif_info = []
+            if getattr(dispositif, 'designation', None):
+                dispositif_info.append([f"Désignation : {dispositif.designation}"])
+            if getattr(dispositif, 'reference', None):
+                dispositif_info.append([f"Référence : {dispositif.reference}"])
+            if getattr(dispositif, 'numero_serie', None):
+                dispositif_info.append([f"Numéro de série : {dispositif.numero_serie}"])
+            story.append(self._grille(dispositif_info))
+            story.append(self.espace)
+
+        # Section : Réglages (afficher uniquement si renseigné)
+        if getattr(intervention, 'reglage', None):
+            reglage = intervention.reglage
+            reglage_info = []
+            if getattr(reglage, 'pmax', None):
+                reglage_info.append([f"Pmax : {reglage.pmax}"])
+            if getattr(reglage, 'pmin', None):
+                reglage_info.append([f"Pmin : {reglage.pmin}"])
+            if getattr(reglage, 'pramp', None):
+                reglage_info.append([f"P ramp : {reglage.pramp}"])
+            if getattr(reglage, 'hu', None):
+                reglage_info.append([f"HU : {reglage.hu}"])
+            if getattr(reglage, 're', None):
+                reglage_info.append([f"RE : {reglage.re}"])
+            if reglage_info:
+                story.append(self._grille(reglage_info))
+                story.append(self.espace)
+
+        # Section : Consommables utilisés (afficher uniquement ceux utilisés)
+        if getattr(intervention, 'consommables_utilises', None):
+            consommables = intervention.consommables_utilises
+            consommables_utilises = [k for k, v in consommables.items() if v]
+            if consommables_utilises:
+                story.append(self.sections['CONSOMMABLES UTILISÉS'])
+                story.append(self._grille([[c] for c in consommables_utilises]))
+                story.append(self.espace)
+
+        # Section : Vérifications de sécurité et Tests effectués (côte à côte)
+        verifs = []
+        tests = []
+        if getattr(intervention, 'verification_securite', None):
+            verifs = [k for k, v in intervention.verification_securite.items() if v is True or v == 1]
+        if getattr(intervention, 'tests_effectues', None):
+            tests = [k for k, v in intervention.tests_effectues.items() if v is True or v == 1]
+        if verifs or tests:
+            story.append(self.sections['VÉRIFICATIONS ET TESTS EFFECTUÉS'])
+            max_len = max(len(verifs), len(tests))
+            rows = []
+            for i in range(max_len):
+                left = verifs[i] if i < len(verifs) else ''
+                right = tests[i] if i < len(tests) else ''
+                rows.append([left, right])
+            story.append(self._grille(rows, (90*mm, 90*mm)))
+            story.append(self.espace)
+
+        # Section : Remarques (si renseigné)
+        if getattr(intervention, 'remarques', None):
+            story.append(self.sections['REMARQUES'])
+            story.append(Paragraph(intervention.remarques, self.style_normal))
+            story.append(self.espace)
+
+        # Section : Photos (vignettes, jamais les originaux)
+        if vignettes is None:
+            vignettes = getattr(intervention, 'vignettes', None) or []
+        if vignettes:
+            story.append(self.sections['PHOTOS'])
+            story.append(self._photos(vignettes))
+            story.append(self.espace)
+
+        story.append(self.signatures)
+
+        doc.build(story)
+        buffer.seek(0)
+        return buffer
+
+_local = threading.local()
+
+def obtenir_renderer():
+    """Renderer du thread courant, créé au premier appel (un par processus pour les workers du pool)"""
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None:
+        renderer = _local.renderer = FicheControleRenderer()
+    return renderer
+
+def generate_intervention_pdf(intervention, vignettes=None):
+    """Génère une fiche contrôle PDF fidèle au modèle fourni"""
+    return obtenir_renderer().rendre(intervention, vignettes)
+
+def instantane_intervention(intervention, vignettes=None):
+    """Copie sans lien avec la session des données nécessaires au PDF (sérialisable vers un autre processus)"""
+    def copier(objet, champs):
+        if objet is None:
+            return None
+        return SimpleNamespace(**{champ: getattr(objet, champ, None) for champ in champs})
+
+    instantane = copier(intervention, CHAMPS_INSTANTANE[None])
+    for relation, champs in CHAMPS_INSTANTANE.items():
+        if relation:
+            setattr(instantane, relation, copier(getattr(intervention, relation, None), champs))
+    instantane.vignettes = list(vignettes or [])
+    return instantane
+
+def generer_pdf_instantane(instantane):
+    """Point d'entrée des processus de génération par lot : retourne (id, octets du PDF)"""
+    return instantane.id, generate_intervention_pdf(instantane).getvalue()
@@ -0,0 +1,75 @@
+from collections import deque
+from datetime import datetime, timezone
+import threading
+
+# Nombre maximal de caractères conservés par instruction
+LONGUEUR_INSTRUCTION_MAX = 4000
+
+def forme_parametre(valeur):
+    """Type d'un paramètre lié, sans sa valeur (données de santé) ; signale les LIKE '%...' non indexables"""
+    if valeur is None:
+        return 'NULL'
+    if isinstance(valeur, str):
+        forme = f'str({len(valeur)})'
+        return forme + " joker initial" if valeur.startswith('%') else forme
+    if isinstance(valeur, (bytes, bytearray)):
+        return f'bytes({len(valeur)})'
+    return type(valeur).__name__
+
+def forme_parametres(parametres):
+    if isinstance(parametres, dict):
+        return {cle: forme_parametre(valeur) for cle, valeur in parametres.items()}
+    if isinstance(parametres, (list, tuple)):
+        return [forme_parametre(valeur) for valeur in parametres]
+    return None
+
+class JournalRequetesLentes:
+    """Tampon circulaire des instructions SQL lentes (les plus anciennes sont écartées)"""
+    
+    def __init__(self, taille=200):
+        self._entrees = deque(maxlen=taille)
+        self._verrou = threading.Lock()
+        self.seuil = None  # secondes ; None : enregistrement désactivé
+        self.total = 0
+    
+    def redimensionner(self, taille):
+        with self._verrou:
+            self._entrees = deque(self._entrees, maxlen=taille)
+    
+    def ajouter(self, instruction, parametres, duree, route, plan):
+        entree = {
+            'date': datetime.now(timezone.utc).isoformat(),
+            'duree_ms': round(duree * 1000, 2),
+            'route': route,
+            'instruction': instruction[:LONGUEUR_INSTRUCTION_MAX],
+            'parametres': forme_parametres(parametres),
+            'plan': plan
+        }
+        with self._verrou:
+            self._entrees.append(entree)
+            self.total += 1
+    
+    def lister(self, limite=None, tri='date'):
+        """Entrées les plus récentes (ou les plus lentes avec tri='duree') en premier"""
+        with self._verrou:
+            entrees = list(self._entrees)
+        if tri == 'duree':
+            entrees.sort(key=lambda entree: entree['duree_ms'], reverse=True)
+        else:
+            entrees.reverse()
+        return entrees[:limite] if limite else entrees
+    
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+    
+    def statistiques(self):
+        with self._verrou:
+            return {
+                'seuil_ms': self.seuil * 1000 if self.seuil is not None else None,
+                'capacite': self._entrees.maxlen,
+                'entrees': len(self._entrees),
+                'total': self.total
+            }
+
+journal_requetes_lentes = JournalRequetesLentes()
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+TAILLE_BLOC = 64 * 1024
+
+class TailleDepassee(ValueError):
+    """Le contenu dépasse la taille autorisée"""
+
+class StockageBlobs:
+    """
+    Stockage adressé par contenu : un blob est désigné par le SHA-256 de ses octets,
+    un même contenu n'est donc stocké qu'une fois.
+    
+    Les implémentations fournissent enregistrer_flux, ouvrir, chemin, existe, supprimer et empreintes.
+    """
+    
+    def enregistrer_flux(self, flux, taille_max=None):
+        """Copie le flux par blocs en calculant son empreinte ; retourne (empreinte, taille)"""
+        raise NotImplementedError
+    
+    def enregistrer_octets(self, contenu, taille_max=None):
+        import io
+        return self.enregistrer_flux(io.BytesIO(contenu), taille_max)
+    
+    def ouvrir(self, empreinte):
+        raise NotImplementedError
+    
+    def chemin(self, empreinte):
+        """Chemin local du blob, ou None si le stockage n'est pas un système de fichiers"""
+        return None
+    
+    def existe(self, empreinte):
+        raise NotImplementedError
+    
+    def supprimer(self, empreinte):
+        raise NotImplementedError
+    
+    def empreintes(self):
+        """Itère sur les empreintes de tous les blobs stockés"""
+        raise NotImplementedError
+
+class StockageFichiers(StockageBlobs):
+    """Blobs dans un dossier local, répartis en sous-dossiers ab/cd/<empreinte>"""
+    
+    def __init__(self, racine):
+        self.racine = racine
+    
+    def chemin(self, empreinte):
+        return os.path.join(self.racine, empreinte[:2], empreinte[2:4], empreinte)
+    
+    def enregistrer_flux(self, flux, taille_max=None):
+        os.makedirs(self.racine, exist_ok=True)
+        condensat = hashlib.sha256()
+        taille = 0
+        descripteur, temporaire = tempfile.mkstemp(dir=self.racine, suffix='.tmp')
+        try:
+            with os.fdopen(descripteur, 'wb') as fichier:
+                while True:
+                    bloc = flux.read(TAILLE_BLOC)
+                    if not bloc:
+                        break
+                    taille += len(bloc)
+                    if taille_max is not None and taille > taille_max:
+                        raise TailleDepassee(f"Fichier trop volumineux (maximum {taille_max} octets)")
+                    condensat.update(bloc)
+                    fichier.write(bloc)
+            
+            empreinte = condensat.hexdigest()
+            destination = self.chemin(empreinte)
+            if os.path.exists(destination):
+                os.remove(temporaire)  # Contenu déjà stocké
+            else:
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.replace(temporaire, destination)
+            return empreinte, taille
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+            raise
+    
+    def ouvrir(self, empreinte):
+        return open(self.chemin(empreinte), 'rb')
+    
+    def existe(self, empreinte):
+        return os.path.exists(self.chemin(empreinte))
+    
+    def supprimer(self, empreinte):
+        try:
+            os.remove(self.chemin(empreinte))
+        except FileNotFoundError:
+            pass
+    
+    def empreintes(self):
+        for dossier, _, fichiers in os.walk(self.racine):
+            for nom in fichiers:
+                if len(nom) == 64 and not nom.endswith('.tmp'):
+                    yield nom
+
+# Nom de configuration (PIECES_JOINTES_STOCKAGE) -> classe
+STOCKAGES = {
+    'fichiers': StockageFichiers,
+}
+
+def creer_stockage(nom, **options):
+    if nom not in STOCKAGES:
+        raise ValueError(f"Stockage inconnu: {nom} ({', '.join(STOCKAGES)})")
+    return STOCKAGES[nom](**options)